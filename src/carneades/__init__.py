@@ -2,4 +2,4 @@
 Carneades argumentation package
 """
 
-__all__ = ['caes', 'tracecalls']
+__all__ = ['aif', 'caes', 'cli', 'oracle', 'sqlstore', 'store', 'tracecalls']
@@ -0,0 +1,10 @@
+"""
+Run the command-line evaluator of :mod:`carneades.cli`, as
+``python -m carneades``.
+"""
+
+import sys
+
+from carneades.cli import main
+
+sys.exit(main())
@@ -0,0 +1,334 @@
+# Carneades Argument Evaluation Structure
+#
+# Copyright (C) 2014 Ewan Klein
+# Author: Ewan Klein <ewan@inf.ed.ac.uk>
+#
+# For license information, see LICENSE
+
+"""
+Import and export of argument sets in the JSON encoding of the `Argument
+Interchange Format <http://www.arg.dundee.ac.uk/aif>`_ (AIF).
+
+An AIF graph has information nodes (I-nodes), which hold propositions, and
+scheme nodes, which connect them. An RA-node (rule application) is read as an
+:class:`~carneades.caes.Argument`, whose ID is the ID of the node, whose
+premises are the I-nodes with edges into the node, and whose conclusion is
+the I-node which the node has an edge to. A CA-node (conflict application)
+whose target is an I-node is read as an argument for the negation of the
+target; if its target is another scheme node, its sources become exceptions
+of the argument of that node. Other kinds of node are ignored.
+
+>>> import io
+>>> aif = io.StringIO('''{"nodes": [
+...     {"nodeID": "1", "text": "kill", "type": "I"},
+...     {"nodeID": "2", "text": "intent", "type": "I"},
+...     {"nodeID": "3", "text": "murder", "type": "I"},
+...     {"nodeID": "4", "text": "Default Inference", "type": "RA"},
+...     {"nodeID": "5", "text": "unreliable", "type": "I"},
+...     {"nodeID": "6", "text": "Default Conflict", "type": "CA"}],
+...   "edges": [
+...     {"edgeID": "1", "fromID": "1", "toID": "4"},
+...     {"edgeID": "2", "fromID": "2", "toID": "4"},
+...     {"edgeID": "3", "fromID": "4", "toID": "3"},
+...     {"edgeID": "4", "fromID": "5", "toID": "6"},
+...     {"edgeID": "5", "fromID": "6", "toID": "4"}]}''')
+>>> argset = read_aif(aif)
+>>> for arg in argset.arguments:
+...     print(arg.arg_id, arg)
+4 [intent, kill], ~[unreliable] => murder
+
+The file is read incrementally, so that only the nodes and edges which are
+needed to build the arguments are held in memory, rather than the whole JSON
+tree; the arguments are then added with
+:meth:`~carneades.caes.ArgumentSet.add_arguments`. :func:`write_aif` streams
+an argument set out in the same form.
+
+>>> out = io.StringIO()
+>>> write_aif(argset, out)
+>>> for arg in read_aif(io.StringIO(out.getvalue())).arguments:
+...     print(arg.arg_id, arg)
+4 [intent, kill], ~[unreliable] => murder
+"""
+
+from collections import OrderedDict
+import itertools
+import json
+import logging
+import os
+import sys
+
+# fix to ensure that package is loaded properly on system path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from carneades.caes import Argument, ArgumentSet, _parse
+
+
+CHUNK_SIZE = 1 << 16
+
+
+class _Reader(object):
+    """
+    Read JSON values one at a time from a file, holding no more of the file
+    in memory than the value currently being decoded.
+    """
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        # read at least as much again as is already buffered, so that a long
+        # value is not decoded over and over
+        chunk = self.f.read(max(self.chunk_size, len(self.buf) - self.pos))
+        if not chunk:
+            self.eof = True
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+
+    def peek(self):
+        """
+        The next character which is not whitespace, or '' at the end of the
+        file.
+        """
+        while True:
+            buf = self.buf
+            pos = self.pos
+            while pos < len(buf) and buf[pos] in ' \t\n\r':
+                pos += 1
+            self.pos = pos
+            if pos < len(buf) or self.eof:
+                return buf[pos:pos + 1]
+            self._fill()
+
+    def expect(self, chars):
+        """
+        Consume the next character, which should be one of ``chars``.
+        """
+        c = self.peek()
+        if not c or c not in chars:
+            raise ValueError("Expected one of {!r} in AIF JSON but found {!r}".\
+                             format(chars, c))
+        self.pos += 1
+        return c
+
+    def value(self):
+        """
+        Decode the next value.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except ValueError:
+                if self.eof:
+                    raise
+            else:
+                # a number at the end of the buffer may be cut short
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            self._fill()
+
+
+def _iter_members(f, chunk_size=CHUNK_SIZE):
+    """
+    Iterate over the items of the arrays in a JSON object, as pairs of the
+    key of the array and the item. Values which are not arrays are skipped.
+    """
+    reader = _Reader(f, chunk_size)
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+    while True:
+        key = reader.value()
+        reader.expect(':')
+        if reader.peek() == '[':
+            reader.expect('[')
+            if reader.peek() == ']':
+                reader.expect(']')
+            else:
+                while True:
+                    yield (key, reader.value())
+                    if reader.expect(',]') == ']':
+                        break
+        else:
+            reader.value()
+        if reader.expect(',}') == '}':
+            return
+
+
+def iter_aif(f, chunk_size=CHUNK_SIZE):
+    """
+    Read the arguments in an AIF JSON file.
+
+    :param f: A file opened for reading text.
+    :param chunk_size: The number of characters to read at a time.
+    :type chunk_size: int
+    :return: The arguments, paired with their IDs, in the order of their\
+    nodes in the file, followed by the propositions of I-nodes which are not\
+    connected to any argument.
+    :rtype: tuple(iterator(tuple(:class:`~carneades.caes.Argument`, str)),\
+    list(:class:`~carneades.caes.PropLiteral`))
+    :raises ValueError: if the file is not valid JSON, or if an RA-node does\
+    not have exactly one conclusion.
+    """
+    # the proposition of each I-node, and the type of each RA- or CA-node
+    props = {}
+    schemes = OrderedDict()
+    edges = []
+    for (key, item) in _iter_members(f, chunk_size):
+        if key == 'nodes':
+            node_id = str(item['nodeID'])
+            node_type = item.get('type')
+            if node_type == 'I':
+                props[node_id] = _parse(item['text'])
+            elif node_type in ('RA', 'CA'):
+                schemes[node_id] = node_type
+        elif key == 'edges':
+            edges.append((str(item['fromID']), str(item['toID'])))
+
+    sources = {}
+    targets = {}
+    connected = set()
+    for (source, target) in edges:
+        if source in props and target in schemes:
+            sources.setdefault(target, []).append(props[source])
+        elif source in schemes and (target in props or target in schemes):
+            targets.setdefault(source, []).append(target)
+        else:
+            continue
+        connected.update((source, target))
+    del edges
+
+    exceptions = {}
+    for (node_id, node_type) in schemes.items():
+        if node_type == 'CA':
+            for target in targets.get(node_id, []):
+                if target in schemes:
+                    exceptions.setdefault(target, set()).update(
+                        sources.get(node_id, []))
+
+    def arguments():
+        for (node_id, node_type) in schemes.items():
+            premises = set(sources.get(node_id, []))
+            excepted = exceptions.get(node_id, set())
+            conclusions = [props[t] for t in targets.get(node_id, [])
+                           if t in props]
+            if node_type == 'RA':
+                if len(conclusions) != 1:
+                    raise ValueError("RA-node '{}' should have one conclusion".\
+                                     format(node_id))
+                yield (Argument(conclusions[0], premises, excepted), node_id)
+            elif len(conclusions) == 1:
+                yield (Argument(conclusions[0].negate(), premises, excepted),
+                       node_id)
+            else:
+                logging.debug("Skipped CA-node '{}' with {} I-node targets".\
+                              format(node_id, len(conclusions)))
+
+    isolated = [p for (node_id, p) in props.items() if node_id not in connected]
+    return (arguments(), isolated)
+
+
+def read_aif(f, argset=None, chunk_size=CHUNK_SIZE):
+    """
+    Add the arguments in an AIF JSON file to an argument set.
+
+    :param f: A file opened for reading text.
+    :param argset: The argument set to add to; by default, a new\
+    :class:`~carneades.caes.ArgumentSet`.
+    :param chunk_size: The number of characters to read at a time.
+    :type chunk_size: int
+    :return: The argument set.
+    :raises ValueError: as for :func:`iter_aif`, or if the ID of an RA-node\
+    is already the ID of an argument in the set.
+    """
+    if argset is None:
+        argset = ArgumentSet()
+    (arguments, isolated) = iter_aif(f, chunk_size)
+    argset.add_arguments(arguments)
+    for proposition in isolated:
+        argset.add_proposition(proposition)
+    return argset
+
+
+def _fresh(numbers, taken):
+    """
+    The next of a sequence of numbers, as a string which is not in ``taken``.
+    """
+    for n in numbers:
+        if str(n) not in taken:
+            return str(n)
+
+
+def write_aif(argset, f):
+    """
+    Write an argument set to a file in AIF JSON.
+
+    Each proposition becomes an I-node, and each argument an RA-node with the
+    ID of the argument, or a CA-node if its conclusion is negative and the
+    positive proposition is in the set. Each exception of an argument becomes
+    a further CA-node, from the exception to the node of the argument.
+
+    The nodes and edges are written as they are generated, so that the
+    output does not have to be held in memory.
+
+    :param argset: The argument set.
+    :param f: A file opened for writing text.
+    """
+    arg_ids = set(argument.arg_id for argument in argset.arguments)
+    propset = argset.propset()
+    # numbers for I-nodes and exception CA-nodes, which are not arg_ids
+    counter = itertools.count(1)
+    node_of = OrderedDict((p, _fresh(counter, arg_ids))
+                          for p in argset.iter_propositions())
+    start = next(counter)
+
+    def conflicts(argument):
+        return not argument.conclusion.polarity and \
+            argument.conclusion.negate() in propset
+
+    def write_items(items):
+        first = True
+        for item in items:
+            f.write('\n  ' if first else ',\n  ')
+            json.dump(item, f, sort_keys=True)
+            first = False
+
+    def nodes():
+        for (p, node_id) in node_of.items():
+            yield {'nodeID': node_id, 'text': str(p), 'type': 'I'}
+        fresh_ids = itertools.count(start)
+        for argument in argset.arguments:
+            node_type = 'CA' if conflicts(argument) else 'RA'
+            yield {'nodeID': argument.arg_id, 'text': argument.arg_id,
+                   'type': node_type}
+            for _ in sorted(argument.exceptions):
+                yield {'nodeID': _fresh(fresh_ids, arg_ids),
+                       'text': 'exception', 'type': 'CA'}
+
+    def edges():
+        fresh_ids = itertools.count(start)
+        for argument in argset.arguments:
+            arg_id = argument.arg_id
+            for p in sorted(argument.premises):
+                yield (node_of[p], arg_id)
+            if conflicts(argument):
+                yield (arg_id, node_of[argument.conclusion.negate()])
+            else:
+                yield (arg_id, node_of[argument.conclusion])
+            for e in sorted(argument.exceptions):
+                node_id = _fresh(fresh_ids, arg_ids)
+                yield (node_of[e], node_id)
+                yield (node_id, arg_id)
+
+    f.write('{"nodes": [')
+    write_items(nodes())
+    f.write('],\n "edges": [')
+    write_items({'edgeID': str(edge_id), 'fromID': source, 'toID': target}
+                for (edge_id, (source, target))
+                in zip(itertools.count(1), edges()))
+    f.write(']}\n')
@@ -158,16 +158,31 @@ False
 """
 
 
-from collections import namedtuple, defaultdict
+from array import array
+from collections import Counter, OrderedDict, namedtuple, defaultdict
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import bisect
+import copy
+import csv
+import itertools
+import json
 import logging
 import os
+import re
 import sys
+import threading
+import time
+from types import MappingProxyType
 
-from igraph import Graph, plot
+from igraph import Graph, Layout, plot
 
 # fix to ensure that package is loaded properly on system path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+from carneades.store import (ArgumentStore, LRUCache, PrefixIndex, PropTable,
+                             settle, share)
 from carneades.tracecalls import TraceCalls
 
 
@@ -179,6 +194,33 @@ LOGLEVEL = logging.DEBUG
 
 logging.basicConfig(format='%(levelname)s: %(message)s', level=LOGLEVEL)
 
+# An ArgumentSet compacts its argument store once the rows of removed and
+# replaced arguments number at least COMPACT_MIN and make up at least
+# COMPACT_RATIO of all rows.
+COMPACT_MIN = 64
+COMPACT_RATIO = 0.25
+
+# The number of updates to an argument set that are remembered for the sake
+# of keeping evaluation caches up to date; an ArgumentSet remembers up to
+# twice as many as it has arguments, and COMPACT_MIN more.
+LOG_MAX = 4096
+
+# The number of labels that CAES.iter_labelling keeps between propositions.
+LABELS_MAX = 65536
+
+# The largest family of candidate assumption sets that
+# CAES.minimal_assumptions derives for a proposition, beyond which it falls
+# back to trying subsets of the assumptions.
+SUPPORT_MAX = 256
+
+# The number of summary layouts that ArgumentSet.draw keeps, each for the
+# root and size of summary it was drawn with.
+LAYOUTS_MAX = 16
+
+# The separator between the namespaces and the name of a proposition, as in
+# ``case42/witness``.
+NAMESPACE_SEPARATOR = '/'
+
 class PropLiteral(object):
     """
     Proposition literals have most of the properties of ordinary strings,
@@ -237,6 +279,127 @@ class PropLiteral(object):
 
 
 
+def _parse(string):
+    """
+    Recover a :class:`PropLiteral` from its print string.
+    """
+    if string.startswith('-'):
+        return PropLiteral(string[1:], polarity=False)
+    return PropLiteral(string)
+
+
+_VARIABLE = re.compile(r'\?\w+')
+
+
+def _atom(proposition):
+    """
+    Split a proposition of the form ``predicate(term, ...)`` into a key of
+    its polarity, predicate and number of terms, and a tuple of the terms.
+    A proposition without parentheses has no terms.
+    """
+    string = proposition._string
+    i = string.find('(')
+    if i < 0 or not string.endswith(')'):
+        return ((proposition.polarity, string, 0), ())
+    terms = tuple(t.strip() for t in string[i + 1:-1].split(','))
+    return ((proposition.polarity, string[:i], len(terms)), terms)
+
+
+def _atom_prefix(prefix=None, namespace=None, glob=None):
+    """
+    The prefix which the atom of a proposition, its string without any
+    negation, must start with to be selected by a query, or :class:`None`
+    if the parts of the query are inconsistent.
+    """
+    prefixes = []
+    if prefix is not None:
+        prefixes.append(prefix)
+    if namespace is not None:
+        prefixes.append(namespace.rstrip(NAMESPACE_SEPARATOR) +
+                        NAMESPACE_SEPARATOR)
+    if glob is not None:
+        # the literal part of the pattern before its first wildcard
+        prefixes.append(re.match(r'[^*?[]*', glob).group())
+    longest = ''
+    for p in prefixes:
+        if p.startswith(longest):
+            longest = p
+        elif not longest.startswith(p):
+            return None
+    return longest
+
+
+def _variables(proposition):
+    """
+    The variables, such as ``?x``, in a templated proposition.
+    """
+    return set(_VARIABLE.findall(proposition._string))
+
+
+def _substitute(template, binding):
+    """
+    Replace the variables in a templated proposition by their values.
+    """
+    string = _VARIABLE.sub(lambda m: binding[m.group()], template._string)
+    return PropLiteral(string, template.polarity)
+
+
+def _match(template, proposition, binding):
+    """
+    Extend a binding of variables so that a templated proposition grounds to
+    a given proposition, or return :class:`None` if there is no such binding.
+    """
+    (key, terms) = _atom(template)
+    (other_key, values) = _atom(proposition)
+    if key != other_key:
+        return None
+    result = dict(binding)
+    for (term, value) in zip(terms, values):
+        if _VARIABLE.fullmatch(term):
+            if result.setdefault(term, value) != value:
+                return None
+        elif term != value:
+            return None
+    # the proposition must be written as the template is
+    if _substitute(template, result) != proposition:
+        return None
+    return result
+
+
+class _FactIndex(object):
+    """
+    Ground propositions, indexed by the key of :func:`_atom`, against which
+    the variables of premises can be bound.
+    """
+    def __init__(self, facts):
+        self.facts = facts
+        self._index = defaultdict(list)
+        for p in facts:
+            self._index[_atom(p)[0]].append(p)
+
+    def candidates(self, template):
+        return self._index.get(_atom(template)[0], [])
+
+
+def _bindings(templates, binding, facts):
+    """
+    Generate the extensions of a binding which bind every variable of a list
+    of templated propositions, by matching those with unbound variables
+    against facts.
+    """
+    if not templates:
+        yield binding
+        return
+    (first, rest) = (templates[0], templates[1:])
+    if _variables(first) <= binding.keys():
+        yield from _bindings(rest, binding, facts)
+        return
+    for fact in facts.candidates(first):
+        extended = _match(first, fact, binding)
+        if extended is not None:
+            yield from _bindings(rest, extended, facts)
+
+
 class Argument(object):
     """
     An argument consists of a conclusion, a set of premises and a set of
@@ -246,7 +409,7 @@ class Argument(object):
     to specify these when calling the :meth:`add_argument` method of
     :class:`ArgumentSet`.
     """
-    def __init__(self, conclusion, premises=set(), exceptions=set()):
+    def __init__(self, conclusion, premises=None, exceptions=None):
         """
         :param conclusion: The conclusion of the argument.
         :type conclusion: :class:`PropLiteral`
@@ -257,11 +420,20 @@ class Argument(object):
         """
 
         self.conclusion = conclusion
-        self.premises = premises
-        self.exceptions = exceptions
+        self.premises = set() if premises is None else premises
+        self.exceptions = set() if exceptions is None else exceptions
         self.arg_id = None
 
 
+    def key(self):
+        """
+        A canonical key for the content of the argument, which is the same
+        for any two arguments with the same conclusion, premises and
+        exceptions.
+        """
+        return (self.conclusion, frozenset(self.premises),
+                frozenset(self.exceptions))
+
     def __str__(self):
         """
         Define print string for arguments.
@@ -282,25 +454,253 @@ class Argument(object):
         return "{}, ~{} => {}".format(prems, excepts, self.conclusion)
 
 
-class ArgumentSet(object):
+class _ArgumentView(Argument):
+    """
+    An :class:`Argument` read from a row of an :class:`ArgumentSet`.
+
+    Views are built afresh on each read, so they compare by content rather
+    than by identity: a view is equal to any argument with the same ID,
+    conclusion, premises and exceptions, and its premises and exceptions are
+    frozen, so that it can be hashed.
+    """
+    def __eq__(self, other):
+        if not isinstance(other, Argument):
+            return NotImplemented
+        return self.arg_id == other.arg_id and self.key() == other.key()
+
+    def __hash__(self):
+        return hash((self.arg_id, self.key()))
+
+
+class _ChangeLog(object):
+    """
+    A log of the propositions whose arguments have been updated, against a
+    version counter, from which a :class:`CAES` can tell which of the
+    acceptability it has cached is stale.
+    """
+    def __init__(self):
+        # the propositions whose arguments changed in each update since
+        # version _log_base
+        self._version = 0
+        self._log_base = 0
+        self._log = []
+
+    def _touch(self, *propositions):
+        """
+        Record an update to the arguments for some propositions.
+        """
+        self._log.append(propositions)
+        self._version += 1
+        # forget the oldest half of a log that has grown too long
+        if len(self._log) > self._log_max():
+            half = len(self._log) // 2
+            self._log = self._log[half:]
+            self._log_base += half
+
+    def _log_max(self):
+        """
+        The length beyond which the log is trimmed.
+        """
+        return LOG_MAX
+
+    def changed_since(self, version):
+        """
+        The propositions whose arguments have changed since a given version
+        of the argument set.
+
+        :param version: A value of the ``_version`` counter, which is\
+        incremented by every update to the arguments.
+        :type version: int
+        :return: The changed propositions, or :class:`None` if the updates\
+        since ``version`` are no longer known.
+        :rtype: set(:class:`PropLiteral`) or None
+        """
+        if version < self._log_base:
+            return None
+        changed = set()
+        for propositions in self._log[version - self._log_base:]:
+            changed.update(propositions)
+        return changed
+
+
+class ArgumentSet(_ChangeLog):
     """
     An ``ArgumentSet`` is modeled as a dependency graph where vertices represent
     the components of an argument. A vertex corresponding to the conclusion
     of an argument *A* will **depend on** the premises and exceptions in *A*.
 
-    The graph is built using the `igraph <http://igraph.org/>`_ library. This
+    The arguments themselves are kept in an :class:`ArgumentStore`; the
+    :attr:`graph` is built from them on demand, using the `igraph
+    <http://igraph.org/>`_ library. This
     allows *attributes* to be associated with both vertices and edges.
     Attributes are represented as Python dictionaries where the key (which
     must be a string) is the name of the attribute and the value is the
     attribute itself. For more details, see the
     `igraph tutorial\
     <http://igraph.org/python/doc/tutorial/tutorial.html#setting-and-retrieving-attributes>`_.
+
+    In *dedup* mode, an argument with the same conclusion, premises and
+    exceptions as one already in the set is not given a vertex of its own,
+    but is merged into the existing argument, which keeps track of the IDs
+    of all the arguments merged into it; see :meth:`sources`. When a
+    :class:`CAES` looks up the weight of a merged argument, the weights of
+    its sources are combined with ``merge_weights``.
+
+    Reading an argument set never changes it, so any number of threads may
+    read it at once, as they do in :meth:`CAES.evaluate_threaded`; an update
+    must not overlap with any other read or update.
     """
-    def __init__(self):
-        self.graph = Graph()
-        self.graph.to_directed()
+    # the indexes which a fork shares with the original
+    _SHARED = ('_prop_order', '_keys', '_sources', '_aliases', '_schemes',
+               '_scheme_index', '_instances')
+
+    def __init__(self, dedup=False, merge_weights=max):
+        """
+        :parameter dedup: If :class:`True`, merge identical arguments.
+        :type dedup: bool
+        :parameter merge_weights: A function which combines the weights of\
+        the sources of a merged argument; the default agrees with\
+        :meth:`CAES.max_weight_applicable`.
+        :type merge_weights: function from list(float) to float
+        """
         self.arg_count = 1
-        self.arguments = []
+        self.dedup = dedup
+        self.merge_weights = merge_weights
+        # the arguments, in columns of proposition numbers, together with
+        # the order in which each proposition number (or -1 if it is not in
+        # the graph) and each row was added, which is the order of the
+        # vertices of the graph
+        self._props = PropTable()
+        self._prop_order = array('q')
+        self._order = 0
+        # the numbers of the propositions in the table, by atom
+        self._atoms = PrefixIndex()
+        self._store = ArgumentStore()
+        # in dedup mode, indexes from canonical keys to arg_ids, from
+        # arg_ids to the IDs of the arguments merged into them, and from the
+        # IDs of merged arguments to the arg_ids they were merged into
+        self._keys = {}
+        self._sources = {}
+        self._aliases = {}
+        # argument schemes by scheme ID, the IDs of the schemes by the key
+        # of their conclusion, and the scheme ID of each grounded instance
+        self._schemes = {}
+        self._scheme_index = {}
+        self._instances = {}
+        # positions of the vertices of summary graphs, by the arguments of
+        # the most recent calls to draw which used them
+        self._layouts = LRUCache(LAYOUTS_MAX)
+        _ChangeLog.__init__(self)
+        # the graph built by the graph property since the last update
+        self._graph = None
+        # True if any of the _SHARED attributes may be overlays, or lent to a
+        # fork
+        self._overlaid = False
+
+    @property
+    def arguments(self):
+        """
+        The :class:`Argument`\ s in the set, in order of addition.
+
+        Unlike the list that an argument set used to keep, this is a tuple
+        built afresh on each access, so that it cannot be updated in place
+        by mistake; use :meth:`add_argument` and :meth:`remove_argument`
+        instead.
+
+        :rtype: tuple(:class:`Argument`)
+        """
+        return tuple(self._view(row) for row in self._store.rows())
+
+    def _view(self, row):
+        """
+        Create an :class:`Argument` for a row of the argument store.
+
+        Views are built afresh on each call, so they should be compared by
+        ``arg_id`` rather than by identity.
+        """
+        store = self._store
+        props = self._props
+        argument = _ArgumentView(
+            props[store.conclusion[row]],
+            frozenset(props[i] for i in store.premises(row)),
+            frozenset(props[i] for i in store.exceptions(row)))
+        argument.arg_id = store.ids[row]
+        return argument
+
+    def _number(self, proposition):
+        """
+        The number of a proposition in the graph, or :class:`None`.
+        """
+        i = self._props.get(proposition)
+        if i is None or self._prop_order[i] < 0:
+            return None
+        return i
+
+    def _intern(self, proposition):
+        """
+        The number of a proposition in the proposition table.
+        """
+        i = self._props.intern(proposition)
+        if i == len(self._prop_order):
+            self._prop_order.append(-1)
+            self._atoms.add(proposition._string, i)
+        return i
+
+    def _next_order(self):
+        order = self._order
+        self._order += 1
+        return order
+
+    @property
+    def graph(self):
+        """
+        The argument set as an igraph ``Graph``, with a vertex for each
+        proposition (with the attribute ``prop``) and for each argument
+        (with the attribute ``arg``, its ID), in order of addition, and
+        edges from each proposition to the arguments for it and from each
+        argument to its premises and exceptions.
+
+        The graph is built from the argument store when it is first read
+        after an update, and is not kept in step with later updates; it
+        should not be modified.
+
+        :rtype: :class:`Graph`
+        """
+        g = self._graph
+        if g is None:
+            g = self._graph = self._build_graph()
+        return g
+
+    def _build_graph(self):
+        props = self._props
+        store = self._store
+        keys = [(k, i, True) for (i, k) in enumerate(self._prop_order)
+                if k >= 0]
+        keys.extend((store.order[row], row, False) for row in store.rows())
+        keys.sort()
+        prop_attr = []
+        arg_attr = []
+        prop_vertex = {}
+        edges = []
+        for (v, (_, n, is_prop)) in enumerate(keys):
+            if is_prop:
+                prop_vertex[n] = v
+                prop_attr.append(props[n])
+                arg_attr.append(None)
+            else:
+                prop_attr.append(None)
+                arg_attr.append(store.ids[n])
+        for (v, (_, row, is_prop)) in enumerate(keys):
+            if not is_prop:
+                edges.append((prop_vertex[store.conclusion[row]], v))
+                edges.extend((v, prop_vertex[i]) for i in
+                             store.premises(row) + store.exceptions(row))
+        g = Graph(n=len(keys), edges=edges, directed=True)
+        # set both vertex attributes, so that they can be read even before
+        # there are vertices of both kinds
+        g.vs['prop'] = prop_attr
+        g.vs['arg'] = arg_attr
+        return g
 
     def propset(self):
         """
@@ -308,38 +708,75 @@ class ArgumentSet(object):
         the graph.
 
         Retrieving this set relies on the fact that :meth:`add_proposition`
-        sets a value for the ``prop`` attribute in vertices created when a
-        new proposition is added to the graph.
+        records the order of each new proposition against the proposition
+        table.
         """
-        g = self.graph
-        props = set()
-        try:
-            props = {p for p in g.vs['prop']}
-        except KeyError:
-            pass
-        return props
+        props = self._props
+        return {props[i] for (i, k) in enumerate(self._prop_order) if k >= 0}
+
+    def iter_propositions(self):
+        """
+        Iterate over the propositions in the graph, in order of addition,
+        without building a set of them.
+        """
+        props = self._props
+        return (props[i] for (i, k) in enumerate(self._prop_order) if k >= 0)
+
+    def find_propositions(self, prefix=None, namespace=None, glob=None,
+                          polarity=None):
+        """
+        Find the propositions in the graph whose atoms, their strings without
+        any negation, satisfy a query, by looking them up in an index of the
+        atoms rather than scanning every proposition.
+
+        The parts of the query which are given must all hold.
+
+        :param prefix: A prefix of the atom.
+        :type prefix: str or None
+        :param namespace: A namespace of the atom, such as ``case42``, which\
+        selects ``case42/witness`` and ``case42/trial/verdict``.
+        :type namespace: str or None
+        :param glob: A pattern which the whole atom must match, in the\
+        case-sensitive syntax of :mod:`fnmatch`, such as ``witness*``.
+        :type glob: str or None
+        :param polarity: :class:`True` for positive propositions only,\
+        :class:`False` for negative ones only, or :class:`None` for both.
+        :type polarity: bool or None
+        :return: The propositions, in order of atom, with the positive one\
+        of each atom first.
+        :rtype: list(:class:`PropLiteral`)
+        """
+        start = _atom_prefix(prefix, namespace, glob)
+        if start is None:
+            return []
+        props = self._props
+        found = []
+        for (_, numbers) in self._atoms.find(start, glob):
+            literals = [props[i] for i in numbers if self._prop_order[i] >= 0
+                        and polarity in (None, props[i].polarity)]
+            found.extend(sorted(literals, key=lambda p: not p.polarity))
+        return found
 
     def add_proposition(self, proposition):
         """
         Add a proposition to a graph if it is not already present as a vertex.
 
+        The vertex itself is only made when :attr:`graph` is next built.
+
         :param proposition: The proposition to be added to the graph.
         :type proposition: :class:`PropLiteral`
-        :return: The graph vertex corresponding to the proposition.
-        :rtype: :class:`Graph.Vertex`
         :raises TypeError: if the input is not a :class:`PropLiteral`.
         """
         if isinstance(proposition, PropLiteral):
-            if proposition in self.propset():
+            if self._number(proposition) is not None:
                 logging.debug("Proposition '{}' is already in graph".\
                               format(proposition))
             else:
-                # add the proposition as a vertex attribute, recovered via the
-                # key 'prop'
-                self.graph.add_vertex(prop=proposition)
+                self._write()
+                self._prop_order[self._intern(proposition)] = \
+                    self._next_order()
                 logging.debug("Added proposition '{}' to graph".\
                               format(proposition))
-            return self.graph.vs.select(prop=proposition)[0]
 
         else:
             raise TypeError('Input {} should be PropLiteral'.\
@@ -353,85 +790,717 @@ class ArgumentSet(object):
         :type argument: :class:`Argument`
         :parameter arg_id: The ID of the argument
         :type arg_id: str or None
+        :raises ValueError: if an argument with the same ID is already in\
+        the graph; IDs must be unique, so that :meth:`remove_argument` and\
+        :meth:`replace_argument` can tell which argument is meant.
         """
-        g = self.graph
-        if arg_id is not None:
-            argument.arg_id = arg_id
-        else:
-            argument.arg_id = 'arg{}'.format(self.arg_count)
+        if arg_id is None:
+            arg_id = 'arg{}'.format(self.arg_count)
+        if arg_id in self._store or arg_id in self._aliases:
+            raise ValueError("Argument '{}' is already in the current graph".\
+                             format(arg_id))
+        self._write()
+        argument.arg_id = arg_id
         self.arg_count += 1
-        self.arguments.append(argument)
+        if self.dedup:
+            intern = self._intern
+            key = (intern(argument.conclusion),
+                   tuple(sorted(intern(p) for p in argument.premises)),
+                   tuple(sorted(intern(e) for e in argument.exceptions)))
+            if self._merge(arg_id, key):
+                self._touch(argument.conclusion)
+                return
+        self._link_argument(arg_id, argument)
+        self._touch(argument.conclusion)
+
+    def add_arguments(self, arguments):
+        """
+        Add a batch of arguments to the graph.
+
+        The result is the same as calling :meth:`add_argument` on each
+        argument in turn, but the propositions of the whole batch are
+        interned first and the rows stored in one pass, which is much faster
+        for large batches.
+
+        :parameter arguments: Pairs of an argument and its ID, which may be\
+        :class:`None`.
+        :type arguments: iterable(tuple(:class:`Argument`, str))
+        :raises ValueError: if an argument with the same ID as one of the\
+        arguments is already in the graph or earlier in the batch, in which\
+        case none of them are added.
+        """
+        store = self._store
+        count = self.arg_count
+        seen = set()
+        named = []
+        for (argument, arg_id) in arguments:
+            if arg_id is None:
+                arg_id = 'arg{}'.format(count)
+            if arg_id in seen or arg_id in store or arg_id in self._aliases:
+                raise ValueError("Argument '{}' is already in the current graph".\
+                                 format(arg_id))
+            seen.add(arg_id)
+            count += 1
+            named.append((argument, arg_id))
+
+        # nothing is changed until every ID has been checked
+        self._write()
+        intern = self._intern
+        batch = []
+        for (argument, arg_id) in named:
+            argument.arg_id = arg_id
+            batch.append((arg_id,
+                          intern(argument.conclusion),
+                          intern(argument.conclusion.negate()),
+                          [intern(p) for p in sorted(argument.premises)],
+                          [intern(e) for e in sorted(argument.exceptions)]))
+
+        props = self._props
+        prop_order = self._prop_order
+        conclusions = []
+        for (arg_id, conclusion, negation, premises, exceptions) in batch:
+            conclusions.append(props[conclusion])
+            if self.dedup:
+                key = (conclusion, tuple(sorted(premises)),
+                       tuple(sorted(exceptions)))
+                if self._merge(arg_id, key):
+                    continue
+            order = self._next_order()
+            for i in [conclusion, negation] + premises + exceptions:
+                if prop_order[i] < 0:
+                    prop_order[i] = self._next_order()
+            store.append(arg_id, conclusion, premises, exceptions, order)
+        self.arg_count = count
+        if conclusions:
+            self._touch(*conclusions)
+        logging.debug("Added {} arguments to graph".format(len(batch)))
+
+    def _merge(self, arg_id, key):
+        """
+        In dedup mode, merge a new argument into the argument with the same
+        canonical key, if there is one, or else index it under its key.
 
-        # add the arg_id as a vertex attribute, recovered via the 'arg' key
-        self.graph.add_vertex(arg=argument.arg_id)
-        arg_v = g.vs.select(arg=argument.arg_id)[0]
+        :return: :class:`True` if the argument was merged.
+        :rtype: bool
+        """
+        canonical = self._keys.get(key)
+        if canonical is not None:
+            self._aliases[arg_id] = canonical
+            self._sources[canonical] = self._sources[canonical] + [arg_id]
+            logging.debug("Merged argument '{}' into '{}'".\
+                          format(arg_id, canonical))
+            return True
+        self._keys[key] = arg_id
+        self._sources[arg_id] = [arg_id]
+        return False
+
+    def sources(self, arg_id):
+        """
+        The IDs of the arguments which were merged into an argument in dedup
+        mode, starting with its own.
+
+        :parameter arg_id: The ID of an argument in the graph.
+        :type arg_id: str
+        :rtype: list(str)
+        """
+        return self._sources.get(arg_id, [arg_id])
 
-        # add proposition vertices to the graph
-        conclusion_v = self.add_proposition(argument.conclusion)
+    def _link_argument(self, arg_id, argument, row=None):
+        """
+        Add the propositions of an argument to the graph, and store the
+        argument in a new row, or in an existing one, which then comes after
+        every other in the order of the graph.
+        """
+        order = self._next_order()
+        self.add_proposition(argument.conclusion)
         self.add_proposition(argument.conclusion.negate())
-        premise_vs =\
-            [self.add_proposition(prop) for prop in sorted(argument.premises)]
-        exception_vs =\
-            [self.add_proposition(prop) for prop in sorted(argument.exceptions)]
-        target_vs = premise_vs + exception_vs
+        premises = sorted(argument.premises)
+        exceptions = sorted(argument.exceptions)
+        for prop in premises + exceptions:
+            self.add_proposition(prop)
+
+        props = self._props
+        columns = (props.get(argument.conclusion),
+                   [props.get(prop) for prop in premises],
+                   [props.get(prop) for prop in exceptions])
+        if row is None:
+            self._store.append(arg_id, *columns, order=order)
+        else:
+            self._store.update(row, *columns)
+            self._store.order[row] = order
 
-        # add new edges to the graph
-        edge_to_arg = [(conclusion_v.index, arg_v.index)]
-        edges_from_arg = [(arg_v.index, target.index) for target in target_vs]
-        g.add_edges(edge_to_arg + edges_from_arg)
+    def _row_key(self, row):
+        """
+        The canonical key of the argument in a row.
+        """
+        store = self._store
+        return (store.conclusion[row], tuple(sorted(store.premises(row))),
+                tuple(sorted(store.exceptions(row))))
 
+    def _drop(self, arg_id):
+        """
+        Remove an argument, together with any arguments merged into it.
+        """
+        row = self._store.find(arg_id)
+        argument = self._view(row)
+        if self.dedup:
+            del self._keys[self._row_key(row)]
+            for source in self._sources.pop(arg_id)[1:]:
+                del self._aliases[source]
+        self._store.kill(row)
+        return argument
+
+    def _unmerge(self, arg_id):
+        """
+        Remove one of several arguments which have been merged together, and
+        return the argument which remains.
+        """
+        canonical = self._aliases.pop(arg_id, arg_id)
+        sources = [s for s in self._sources.pop(canonical) if s != arg_id]
+        row = self._store.find(canonical)
+        if canonical == arg_id:
+            # the next source takes over the row of the removed argument
+            canonical = sources[0]
+            self._store.rename(row, canonical)
+            self._keys[self._row_key(row)] = canonical
+            for source in sources[1:]:
+                self._aliases[source] = canonical
+            del self._aliases[canonical]
+        self._sources[canonical] = sources
+        return self._view(row)
+
+    def remove_argument(self, arg_id):
+        """
+        Remove an argument from the graph.
 
-    def get_arguments(self, proposition):
+        The propositions mentioned by the argument stay in the graph; use
+        :meth:`remove_proposition` to get rid of them.
+
+        :parameter arg_id: The ID of the argument to be removed.
+        :type arg_id: str
+        :return: The argument that was removed or, if it had been merged\
+        with others in dedup mode, the argument that remains.
+        :rtype: :class:`Argument`
+        :raises ValueError: if there is no argument with this ID in the graph.
         """
-        Find the arguments for a proposition in an *ArgumentSet*.
+        if arg_id not in self._store and arg_id not in self._aliases:
+            raise ValueError("Argument '{}' is not in the current graph".\
+                             format(arg_id))
+        self._write()
+        if len(self.sources(self._aliases.get(arg_id, arg_id))) > 1:
+            argument = self._unmerge(arg_id)
+        else:
+            argument = self._drop(arg_id)
+        self._touch(argument.conclusion)
+        logging.debug("Removed argument '{}' from graph".format(arg_id))
+        self._maybe_compact()
+        return argument
 
-        :param proposition: The proposition to be checked.
+    def replace_argument(self, arg_id, argument):
+        """
+        Replace an argument with a new one under the same ID.
+
+        The new argument keeps the position of the old one in
+        :attr:`arguments`, except in dedup mode, where this amounts to
+        removing the old argument and adding the new one.
+
+        :parameter arg_id: The ID of the argument to be replaced.
+        :type arg_id: str
+        :parameter argument: The argument that takes its place.
+        :type argument: :class:`Argument`
+        :return: The argument that was replaced.
+        :rtype: :class:`Argument`
+        :raises ValueError: if there is no argument with this ID in the graph.
+        """
+        if self.dedup:
+            old = self.remove_argument(arg_id)
+            self.add_argument(argument, arg_id)
+            return old
+        row = self._store.find(arg_id)
+        if row is None:
+            raise ValueError("Argument '{}' is not in the current graph".\
+                             format(arg_id))
+        self._write()
+        old = self._view(row)
+        argument.arg_id = arg_id
+        self._link_argument(arg_id, argument, row)
+        self._touch(old.conclusion, argument.conclusion)
+        logging.debug("Replaced argument '{}' in graph".format(arg_id))
+        self._maybe_compact()
+        return old
+
+    def remove_proposition(self, proposition):
+        """
+        Remove a proposition from the graph.
+
+        Arguments for or against the proposition, and arguments which use it
+        as a premise or an exception, are removed along with it.
+
+        :param proposition: The proposition to be removed.
         :type proposition: :class:`PropLiteral`
-        :return: A list of the arguments pro the proposition
+        :return: The arguments that were removed.
         :rtype: list(:class:`Argument`)
+        :raises ValueError: if the proposition isn't present in the graph.
+        """
+        i = self._number(proposition)
+        if i is None:
+            raise ValueError("Proposition '{}' is not in the current graph".\
+                             format(proposition))
+        self._write()
+        store = self._store
+        rows = set(store.pro_rows(i))
+        rows.update(store.user_rows(i))
+        neg = self._number(proposition.negate())
+        if neg is not None:
+            rows.update(store.pro_rows(neg))
+
+        removed = [self._drop(store.ids[row]) for row
+                   in sorted(rows, key=store.order.__getitem__)]
+
+        self._prop_order[i] = -1
+        self._touch(proposition, *[arg.conclusion for arg in removed])
+        logging.debug("Removed proposition '{}' from graph".\
+                      format(proposition))
+        self._maybe_compact()
+        return removed
+
+    def _maybe_compact(self):
+        """
+        Compact the argument store once the rows of removed and replaced
+        arguments make up a sizeable fraction of it.
+        """
+        n = self._store.waste()
+        if n >= COMPACT_MIN and n >= COMPACT_RATIO * len(self._store.ids):
+            self.compact()
 
-        :raises ValueError: if the input :class:`PropLiteral` isn't present\
-        in the graph.
+    def compact(self):
         """
-        g = self.graph
+        Delete the rows of removed arguments from the argument store, along
+        with the entries left behind by replaced arguments.
+
+        This takes time linear in the size of the store; it is called
+        automatically when enough garbage has accumulated.
+        """
+        if not self._store.waste():
+            return
+        self._write()
+        self._store.compact()
 
-        # index of vertex associated with the proposition
-        vs = g.vs.select(prop=proposition)
+    def _log_max(self):
+        """
+        The length beyond which the log is trimmed, which grows with the
+        argument set, so that the log is only trimmed once it has outgrown
+        the set.
+        """
+        return 2 * len(self._store) + COMPACT_MIN
 
-        try:
-            conc_v_index = vs[0].index
-            # IDs of vertices reachable in one hop from the proposition's vertex
-            target_IDs = [e.target for e in g.es.select(_source=conc_v_index)]
+    def _write(self):
+        """
+        Prepare the indexes for an update, copying those lent to a fork and
+        folding those which a fork has outgrown into indexes of its own.
+        """
+        self._graph = None
+        if self._overlaid:
+            self._overlaid = settle(self, self._SHARED)
+
+    def dependents(self, propositions):
+        """
+        The propositions whose acceptability may depend on the arguments for
+        any of the given propositions.
+
+        Since a proposition is evaluated by weighing the arguments for it
+        against those for its negation, the result includes the given
+        propositions and their negations, together with the conclusions
+        (and their negations) of every argument that uses one of these as a
+        premise or an exception, and so on transitively.
+
+        :param propositions: The propositions to start from.
+        :type propositions: iterable(:class:`PropLiteral`)
+        :rtype: set(:class:`PropLiteral`)
+        """
+        store = self._store
+        result = set()
+        stack = list(propositions)
+        while stack:
+            prop = stack.pop()
+            for p in (prop, prop.negate()):
+                if p in result:
+                    continue
+                result.add(p)
+                i = self._number(p)
+                if i is None:
+                    continue
+                # arguments which have p as a premise or an exception
+                for row in store.user_rows(i):
+                    stack.append(self._props[store.conclusion[row]])
+        return result
+
+    def profile(self):
+        """
+        Measure the size and shape of the argument set, as a guide to the
+        cost of evaluating it.
+
+        Propositions are linked to the premises and exceptions of the
+        arguments for them and for their negations, since these are what
+        :meth:`CAES.acceptable` may visit. The estimated cost of a
+        proposition is the number of propositions and arguments visited by
+        an evaluation that starts with an empty cache and shares no work
+        between branches, which bounds the work actually done; it is
+        infinite if the evaluation would run into a cycle. Everything is
+        computed in time linear in the size of the graph.
+
+        :rtype: :class:`GraphProfile`
+        """
+        props = self._props
+        store = self._store
+        live = [i for (i, k) in enumerate(self._prop_order) if k >= 0]
+        negation = {i: props.get(props[i].negate()) for i in live}
+        return _profile(props, live, negation,
+                        ((store.conclusion[row], store.premises(row),
+                          store.exceptions(row)) for row in store.rows()))
+
+    def fork(self):
+        """
+        Take a copy-on-write snapshot of the argument set.
 
-            # the vertices indexed by target_IDs
-            out_vs = [g.vs[i] for i in target_IDs]
+        The snapshot shares its store and indexes with the original, and
+        keeps the arguments and propositions that it adds, removes or
+        replaces afterwards in overlays over them, which are folded into a
+        store and indexes of its own only once they outgrow a fraction of
+        them, so that neither the fork nor its first update copies the whole
+        set. The original goes on reading its store and indexes directly,
+        and only copies them before it next changes them.
 
-            arg_IDs = [v['arg'] for v in out_vs]
-            args = [arg for arg in self.arguments if arg.arg_id in arg_IDs]
-            return args
-        except IndexError:
-            raise ValueError("Proposition '{}' is not in the current graph".\
-                             format(proposition))
+        :rtype: :class:`ArgumentSet`
+        """
+        branch = copy.copy(self)
+        branch._log_base = self._version
+        branch._log = []
+        branch._props = self._props.copy()
+        branch._atoms = self._atoms.copy()
+        branch._store = self._store.copy()
+        branch._layouts = self._layouts.copy()
+        share(self, branch, self._SHARED)
+        self._overlaid = branch._overlaid = True
+        return branch
+
+    def add_scheme(self, scheme, scheme_id=None):
+        """
+        Add an argument scheme, which is an :class:`Argument` whose
+        propositions may contain variables, such as ``witness(?x)``.
+
+        A scheme stands for all of its ground instances. A :class:`CAES`
+        grounds the instances it needs when it comes to evaluate a
+        proposition that matches the conclusion of the scheme, so that only
+        what is actually queried is grounded, and keeps them apart from the
+        argument set, which evaluation never changes. Other methods of the
+        argument set only see the instances added to the graph by
+        :meth:`ground`.
+
+        Propositions are matched term by term, where the terms are
+        separated by commas inside parentheses, and a variable stands for a
+        whole term. A ground proposition matches only if it is written in
+        the same way as the template, with each variable replaced by a term.
+
+        :parameter scheme: The scheme.
+        :type scheme: :class:`Argument`
+        :parameter scheme_id: The ID of the scheme, which is also the ID by\
+        which :meth:`CAES.weight_of` looks up the weight of an instance that\
+        has no weight of its own.
+        :type scheme_id: str or None
+        :raises ValueError: if a scheme with the same ID is already in the\
+        set, or if a variable of an exception occurs neither in the\
+        conclusion nor in a premise.
+        """
+        if scheme_id is None:
+            scheme_id = 'scheme{}'.format(len(self._schemes) + 1)
+        if scheme_id in self._schemes:
+            raise ValueError("Scheme '{}' is already in the current graph".\
+                             format(scheme_id))
+        bound = _variables(scheme.conclusion).union(
+            *(_variables(p) for p in scheme.premises))
+        for e in scheme.exceptions:
+            unbound = _variables(e) - bound
+            if unbound:
+                raise ValueError("Variable '{}' of exception '{}' occurs in no "
+                                 "conclusion or premise of scheme '{}'".\
+                                 format(min(unbound), e, scheme_id))
+        self._write()
+        scheme.arg_id = scheme_id
+        self._schemes[scheme_id] = scheme
+        key = _atom(scheme.conclusion)[0]
+        # the list may be shared with a fork
+        self._scheme_index[key] = self._scheme_index.get(key, []) + [scheme_id]
+        # propositions that have already been grounded may have new instances
+        self._touch(*(p for p in self.iter_propositions()
+                      if _match(scheme.conclusion, p, {}) is not None))
+        logging.debug("Added scheme '{}'".format(scheme_id))
+
+    @property
+    def schemes(self):
+        """
+        The argument schemes in the set, by ID.
+
+        :rtype: dict(str, :class:`Argument`)
+        """
+        return dict(self._schemes)
+
+    def scheme_of(self, arg_id):
+        """
+        The ID of the scheme that an argument is an instance of, or
+        :class:`None` if it is not an instance of a scheme.
 
+        :parameter arg_id: The ID of an argument.
+        :type arg_id: str
+        :rtype: str or None
+        """
+        return self._instances.get(arg_id)
+
+    def ground(self, proposition, facts=()):
+        """
+        Add the instances of the argument schemes whose conclusion matches a
+        proposition, if they are not already in the graph.
+
+        A variable of a scheme which does not occur in its conclusion is
+        bound by matching the premises in which it occurs against the
+        facts. An instance has the ID of its scheme followed by the values
+        of its variables, as in ``testimony[?x=bob]``. The proposition is
+        added to the graph if it matches some scheme, even if no instance
+        results, so that it can be evaluated.
+
+        :param proposition: The proposition.
+        :type proposition: :class:`PropLiteral`
+        :param facts: Ground propositions against which to bind variables.
+        :type facts: iterable(:class:`PropLiteral`)
+        :return: The IDs of the instances added.
+        :rtype: list(str)
+        """
+        (matched, instances, scheme_of) = self._instantiate(proposition, facts)
+        if instances:
+            self.add_arguments(instances)
+            self._instances.update(scheme_of)
+        elif matched and self._number(proposition) is None:
+            self.add_proposition(proposition)
+            self.add_proposition(proposition.negate())
+        logging.debug("Grounded {} instances for '{}'".\
+                      format(len(instances), proposition))
+        return [arg_id for (_, arg_id) in instances]
+
+    def _instantiate(self, proposition, facts):
+        """
+        Find the instances of the argument schemes whose conclusion matches
+        a proposition, which are not already in the graph, without changing
+        the argument set; see :meth:`ground`.
+
+        :return: Whether any scheme matches the proposition, the pairs of an\
+        instance and its ID, and the ID of the scheme of each instance.
+        :rtype: tuple(bool, list(tuple(:class:`Argument`, str)),\
+        dict(str, str))
+        """
+        scheme_ids = self._scheme_index.get(_atom(proposition)[0])
+        if not scheme_ids:
+            return (False, [], {})
+        if not isinstance(facts, _FactIndex):
+            facts = _FactIndex(facts)
+        instances = []
+        scheme_of = {}
+        matched = False
+        for scheme_id in scheme_ids:
+            scheme = self._schemes[scheme_id]
+            binding = _match(scheme.conclusion, proposition, {})
+            if binding is None:
+                continue
+            matched = True
+            premises = sorted(scheme.premises)
+            for full in _bindings(premises, binding, facts):
+                arg_id = '{}[{}]'.format(scheme_id, ', '.join(
+                    '{}={}'.format(v, full[v]) for v in sorted(full)))
+                if arg_id in self._instances or arg_id in scheme_of:
+                    continue
+                argument = Argument(
+                    proposition,
+                    set(_substitute(p, full) for p in scheme.premises),
+                    set(_substitute(e, full) for e in scheme.exceptions))
+                argument.arg_id = arg_id
+                instances.append((argument, arg_id))
+                scheme_of[arg_id] = scheme_id
+        return (matched, instances, scheme_of)
 
+    def get_arguments(self, proposition):
+        """
+        Find the arguments for a proposition in an *ArgumentSet*.
 
+        :param proposition: The proposition to be checked.
+        :type proposition: :class:`PropLiteral`
+        :return: A list of the arguments pro the proposition
+        :rtype: list(:class:`Argument`)
 
+        :raises ValueError: if the input :class:`PropLiteral` isn't present\
+        in the graph.
+        """
+        i = self._number(proposition)
+        if i is None:
+            raise ValueError("Proposition '{}' is not in the current graph".\
+                             format(proposition))
+        return [self._view(row) for row in self._store.pro_rows(i)]
 
-    def draw(self, debug=False):
+    def summary_graph(self, root=None, max_vertices=100, min_chain=3):
+        """
+        Build a summary of the graph that is small enough to be drawn.
+
+        Each strongly connected component of more than one vertex is
+        collapsed into a single ``cycle`` vertex, and then each run of at
+        least ``min_chain`` vertices with one edge in and one edge out is
+        collapsed into a single ``chain`` vertex. Finally, if there are more
+        than ``max_vertices`` vertices, only those nearest to ``root``, or
+        to the vertices which nothing depends on, are kept.
+
+        The vertices of the summary have the attributes ``label``; ``kind``,
+        which is one of ``'prop'``, ``'arg'``, ``'cycle'`` or ``'chain'``;
+        ``members``, the indices of the vertices of the graph that they
+        stand for; and ``hidden``, the number of their neighbours which were
+        left out.
+
+        :param root: The proposition to centre the summary on.
+        :type root: :class:`PropLiteral` or None
+        :param max_vertices: The maximum number of vertices, or\
+        :class:`None` for no maximum.
+        :type max_vertices: int or None
+        :param min_chain: The minimum length of a chain to be collapsed.
+        :type min_chain: int
+        :rtype: :class:`Graph`
+        :raises ValueError: if ``root`` is not in the graph.
+        """
+        g = self.graph
+        n = g.vcount()
+        root_index = None
+        if root is not None:
+            if self._number(root) is None:
+                raise ValueError("Proposition '{}' is not in the current graph".\
+                                 format(root))
+        props = g.vs['prop'] if n else []
+        args = g.vs['arg'] if n else []
+        if root is not None:
+            root_index = props.index(root)
+        names = [str(p) if a is None else a for (p, a) in zip(props, args)]
+
+        def merge(members):
+            return [i for m in members for i in m]
+
+        # collapse strongly connected components
+        view = Graph(n=n, edges=g.get_edgelist(), directed=True)
+        view.vs['members'] = [[i] for i in range(n)]
+        # number the components in order of their first vertex
+        components = {}
+        membership = [components.setdefault(m, len(components)) for m in
+                      g.connected_components(mode='strong').membership]
+        view.contract_vertices(membership, combine_attrs={'members': merge})
+        view.simplify()
+        kinds = []
+        labels = []
+        for members in view.vs['members']:
+            if len(members) == 1:
+                i = members[0]
+                kinds.append('prop' if args[i] is None else 'arg')
+                labels.append(names[i])
+            else:
+                kinds.append('cycle')
+                labels.append('{} (+{} in cycle)'.format(
+                    min(names[i] for i in members), len(members) - 1))
+
+        # collapse chains
+        root_group = None
+        if root_index is not None:
+            root_group = next(k for (k, members) in enumerate(view.vs['members'])
+                              if root_index in members)
+        succ = view.get_adjlist(mode='out')
+        pred = view.get_adjlist(mode='in')
+        inner = [len(succ[k]) == 1 and len(pred[k]) == 1 and k != root_group
+                 for k in range(view.vcount())]
+        membership = list(range(view.vcount()))
+        chains = {}
+        for k in range(view.vcount()):
+            if not inner[k] or inner[pred[k][0]]:
+                continue
+            run = [k]
+            while inner[succ[run[-1]][0]] and succ[run[-1]][0] != k:
+                run.append(succ[run[-1]][0])
+            if len(run) >= min_chain:
+                for j in run:
+                    membership[j] = k
+                chains[k] = '{} .. {} ({})'.format(labels[run[0]],
+                                                   labels[run[-1]], len(run))
+        if chains:
+            # number the groups in order of their first vertex
+            groups = {}
+            membership = [groups.setdefault(m, len(groups)) for m in membership]
+            first = {}
+            for (k, m) in enumerate(membership):
+                first.setdefault(m, k)
+            kinds = [kinds[first[m]] for m in range(len(groups))]
+            labels = [labels[first[m]] for m in range(len(groups))]
+            for (k, label) in chains.items():
+                kinds[groups[k]] = 'chain'
+                labels[groups[k]] = label
+            view.contract_vertices(membership, combine_attrs={'members': merge})
+            view.simplify()
+            if root_group is not None:
+                root_group = groups[root_group]
+        view.vs['kind'] = kinds
+        view.vs['label'] = labels
+
+        # keep the vertices nearest the root
+        neighbours = view.get_adjlist(mode='all')
+        view.vs['hidden'] = [0] * view.vcount()
+        if max_vertices is not None and view.vcount() > max_vertices:
+            if root_group is not None:
+                queue = [root_group]
+            else:
+                indegree = view.indegree()
+                queue = [k for k in range(view.vcount()) if indegree[k] == 0]
+            kept = set(queue[:max_vertices])
+            queue = queue[:max_vertices]
+            for k in queue:
+                if len(kept) == max_vertices:
+                    break
+                for j in neighbours[k]:
+                    if j not in kept and len(kept) < max_vertices:
+                        kept.add(j)
+                        queue.append(j)
+            view.vs['hidden'] = [sum(1 for j in neighbours[k] if j not in kept)
+                                 for k in range(view.vcount())]
+            view = view.induced_subgraph(sorted(kept))
+        return view
+
+    def draw(self, debug=False, root=None, max_vertices=None):
         """
         Visualise an :class:`ArgumentSet` as a labeled graph.
 
+        If ``root`` or ``max_vertices`` is given, the graph is drawn at a
+        level of detail suitable for large graphs, using
+        :meth:`summary_graph`. The positions of the vertices are cached, so
+        that after a small edit only the changes need to be laid out again.
+
         :parameter debug: If :class:`True`, add the vertex index to the label.
+        :parameter root: The proposition to centre the drawing on.
+        :type root: :class:`PropLiteral` or None
+        :parameter max_vertices: The maximum number of vertices to draw.
+        :type max_vertices: int or None
         """
+        if root is not None or max_vertices is not None:
+            self._draw_summary(debug, root, max_vertices)
+            return
+
         g = self.graph
 
         # labels for nodes that are classed as propositions
         labels = g.vs['prop']
+        args = g.vs['arg']
 
         # insert the labels for nodes that are classed as arguments
         for i in range(len(labels)):
-            if g.vs['arg'][i] is not None:
-                labels[i] = g.vs['arg'][i]
+            if args[i] is not None:
+                labels[i] = args[i]
 
         if debug:
             d_labels = []
@@ -440,24 +1509,74 @@ class ArgumentSet(object):
 
             labels = d_labels
 
-        g.vs['label'] = labels
-
-
-        roots = [i for i in range(len(g.vs)) if g.indegree()[i] == 0]
+        indegree = g.indegree()
+        roots = [i for i in range(len(g.vs)) if indegree[i] == 0]
         ALL = 3 # from igraph
         layout = g.layout_reingold_tilford(mode=ALL, root=roots)
 
         plot_style = {}
         plot_style['vertex_color'] = \
-            ['lightblue' if x is None else 'pink' for x in g.vs['arg']]
+            ['lightblue' if x is None else 'pink' for x in args]
         plot_style['vertex_size'] = 60
         plot_style['vertex_shape'] = \
-            ['circle' if x is None else 'rect' for x in g.vs['arg']]
+            ['circle' if x is None else 'rect' for x in args]
         plot_style['margin'] = 40
         plot_style['layout'] = layout
+        plot_style['vertex_label'] = labels
         plot(g, **plot_style)
 
+    def _draw_summary(self, debug, root, max_vertices):
+        view = self.summary_graph(root, 100 if max_vertices is None
+                                  else max_vertices)
+        layout = self._summary_layout(view, (root, max_vertices))
+        labels = view.vs['label']
+        labels = ['{}\n(+{})'.format(label, hidden) if hidden else label
+                  for (label, hidden) in zip(labels, view.vs['hidden'])]
+        if debug:
+            labels = ['{}\nv{}'.format(label, i)
+                      for (i, label) in enumerate(labels)]
+        view.vs['label'] = labels
+        colours = {'prop': 'lightblue', 'arg': 'pink', 'cycle': 'orange',
+                   'chain': 'lightgrey'}
+        shapes = {'prop': 'circle', 'arg': 'rect', 'cycle': 'diamond',
+                  'chain': 'rect'}
+        plot_style = {}
+        plot_style['vertex_color'] = [colours[k] for k in view.vs['kind']]
+        plot_style['vertex_size'] = 60
+        plot_style['vertex_shape'] = [shapes[k] for k in view.vs['kind']]
+        plot_style['margin'] = 40
+        plot_style['layout'] = layout
+        plot(view, **plot_style)
 
+    def _summary_layout(self, view, key):
+        """
+        Lay out a summary graph, starting from the positions that vertices
+        with the same labels had when the summary was last drawn with the
+        same ``key``.
+        """
+        labels = view.vs['label']
+        edges = view.get_edgelist()
+        cached = self._layouts.get(key)
+        if cached is not None and cached[1] == edges and \
+           all(label in cached[0] for label in labels):
+            layout = Layout([cached[0][label] for label in labels])
+        elif cached is not None and any(label in cached[0] for label in labels):
+            # place each new vertex next to a neighbour that was placed before
+            positions = cached[0]
+            neighbours = view.get_adjlist(mode='all')
+            seed = []
+            for (k, label) in enumerate(labels):
+                near = [positions[labels[j]] for j in neighbours[k]
+                        if labels[j] in positions]
+                seed.append(positions.get(label) or
+                            (near[0] if near else (0.0, 0.0)))
+            layout = view.layout_fruchterman_reingold(seed=seed, niter=50)
+        else:
+            indegree = view.indegree()
+            roots = [k for k in range(view.vcount()) if indegree[k] == 0]
+            layout = view.layout_reingold_tilford(mode='all', root=roots)
+        self._layouts.put(key, (dict(zip(labels, layout.coords)), edges))
+        return layout
 
     def write_to_graphviz(self, fname=None):
         g = self.graph
@@ -496,6 +1615,11 @@ class ArgumentSet(object):
             print(result, file=f)
 
 
+# The names of the proof standards, from the weakest to the strongest.
+PROOF_STANDARDS = ('scintilla', 'preponderance', 'clear_and_convincing',
+                   'beyond_reasonable_doubt', 'dialectical_validity')
+
+
 class ProofStandard(object):
     """
     Each proposition in a CAES is associated with a proof standard.
@@ -516,10 +1640,7 @@ class ProofStandard(object):
         each proposition under consideration.
         :type propstandards: list(tuple(:class:`PropLiteral`, str))
         """
-        self.proof_standards = ["scintilla", "preponderance",
-                                "clear_and_convincing",
-                                "beyond_reasonable_doubt",
-                                "dialectical_validity"]
+        self.proof_standards = list(PROOF_STANDARDS)
         self.default = default
         self.config = defaultdict(lambda: self.default)
         self._set_standard(propstandards)
@@ -541,6 +1662,15 @@ class ProofStandard(object):
         """
         return self.config[proposition]
 
+    def _settings(self):
+        """
+        The default proof standard, and the propositions which have another
+        one. Propositions filed under the default by a lookup are left out.
+        """
+        return (self.default,
+                {prop: standard for (prop, standard) in self.config.items()
+                 if standard != self.default})
+
 
 Audience = namedtuple('Audience', ['assumptions', 'weight'])
 """
@@ -551,55 +1681,1738 @@ assigns weights to arguments.
 :type assumptions: set(:class:`PropLiteral`)
 
 :param weights: An mapping from :class:`Argument`\ s to weights.
-:type weights: dict
+:type weights: dict or :class:`WeightProvider`
 """
 
 
+class WeightProvider(Mapping):
+    """
+    A mapping from argument IDs to weights which are computed on demand, for
+    use as the weights of an :class:`Audience`.
+
+    Weights are requested from a scoring function, which is given a list of
+    argument IDs and returns a mapping from the IDs to their weights; an ID
+    which is left out has no weight. A :class:`CAES` only asks for the
+    weights of arguments which are applicable, and asks for those of the
+    applicable arguments pro and con a proposition in a single batch. The
+    weights are memoized, so that an argument is only scored once, unless
+    two threads ask for it at the same time, in which case the first weight
+    to arrive is kept; iterating over the provider gives just the IDs which
+    have been scored.
+    """
+    def __init__(self, score, batch_size=None):
+        """
+        :param score: The scoring function.
+        :type score: callable(list(str)) -> dict(str, float)
+        :param batch_size: The maximum number of IDs in a request, or\
+        :class:`None` for no limit.
+        :type batch_size: int or None
+        """
+        self.score = score
+        self.batch_size = batch_size
+        self.requests = 0
+        self._weights = {}
+        self._unweighted = set()
+        self._lock = threading.Lock()
 
-class CAES(object):
+    def _request(self, arg_ids):
+        return self.score(arg_ids)
+
+    def prefetch(self, arg_ids):
+        """
+        Request the weights of any of the arguments which have not been
+        requested before.
+
+        :param arg_ids: The IDs of the arguments.
+        :type arg_ids: iterable(str)
+        """
+        with self._lock:
+            wanted = [arg_id for arg_id in dict.fromkeys(arg_ids)
+                      if arg_id not in self._weights and
+                      arg_id not in self._unweighted]
+        size = self.batch_size or max(len(wanted), 1)
+        for i in range(0, len(wanted), size):
+            batch = wanted[i:i + size]
+            # the scoring function is called without the lock, so that it
+            # may itself look up weights, and other threads are not held up
+            weights = self._request(batch)
+            logging.debug("Scored {} arguments".format(len(batch)))
+            with self._lock:
+                self.requests += 1
+                for arg_id in batch:
+                    if arg_id in self._weights or arg_id in self._unweighted:
+                        continue
+                    if arg_id in weights:
+                        self._weights[arg_id] = weights[arg_id]
+                    else:
+                        self._unweighted.add(arg_id)
+
+    def __getitem__(self, arg_id):
+        self.prefetch([arg_id])
+        return self._weights[arg_id]
+
+    def __contains__(self, arg_id):
+        self.prefetch([arg_id])
+        return arg_id in self._weights
+
+    def __iter__(self):
+        return iter(dict(self._weights))
+
+    def __len__(self):
+        return len(self._weights)
+
+
+class AsyncWeightProvider(WeightProvider):
     """
-    A class that represents a Carneades Argument Evaluation Structure (CAES).
+    A :class:`WeightProvider` whose scoring function is a coroutine function.
 
+    Evaluation is not itself asynchronous, so each request waits for the
+    coroutine to finish: on the event loop ``loop``, if it is running, or
+    else on a new event loop. :meth:`CAES.acceptable_async` evaluates in a
+    worker thread, so that the coroutines can run on the caller's loop.
     """
-    def __init__(self, argset, audience, proofstandard, alpha=0.4, beta=0.3,
-                 gamma=0.2):
+    def __init__(self, score, batch_size=None, loop=None):
         """
-        :parameter argset: the argument set used in the CAES
-        :type argset: :class:`ArgSet`
+        :param score: The scoring function.
+        :type score: coroutine function(list(str)) -> dict(str, float)
+        :param batch_size: See :class:`WeightProvider`.
+        :param loop: The event loop on which to score arguments.
+        :type loop: :class:`asyncio.AbstractEventLoop` or None
+        """
+        WeightProvider.__init__(self, score, batch_size)
+        self.loop = loop
+
+    def _request(self, arg_ids):
+        loop = self.loop
+        if loop is not None and loop.is_running():
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            if running is loop:
+                raise RuntimeError("Arguments cannot be scored while blocking "
+                                   "their event loop; use CAES.acceptable_async")
+            return asyncio.run_coroutine_threadsafe(self.score(arg_ids),
+                                                    loop).result()
+        return asyncio.run(self.score(arg_ids))
+
+
+Interval = namedtuple('Interval', ['lower', 'upper', 'lower_closed',
+                                   'upper_closed'])
+"""
+An interval of threshold values.
 
-        :parameter audience: the audience for the CAES
-        :type audience: :class:`Audience`
+:param lower: The lower bound of the interval.
+:param upper: The upper bound of the interval.
+:param lower_closed: Whether the lower bound belongs to the interval.
+:param upper_closed: Whether the upper bound belongs to the interval.
+"""
 
-        :parameter proofstandard: the proof standards used in the CAES
-        :type proofstandard: :class:`ProofStandard`
 
-        :parameter alpha: threshold of strength of argument required for a\
-        proposition to reach the proof standards "clear and convincing" and\
-        "beyond reasonable doubt".
+GraphProfile = namedtuple('GraphProfile', [
+    'propositions', 'arguments', 'edges', 'max_depth', 'fan_in', 'fan_out',
+    'components', 'cycles', 'exception_density', 'cost'])
+"""
+The size and shape of an :class:`ArgumentSet`, as computed by
+:meth:`ArgumentSet.profile`.
+
+:param propositions: The number of propositions.
+:param arguments: The number of arguments.
+:param edges: The number of links from arguments to their conclusions,\
+premises and exceptions.
+:param max_depth: The greatest number of arguments in a chain of\
+derivation, counting a cycle as one.
+:param fan_in: A :class:`Counter` of the number of arguments for each\
+proposition.
+:param fan_out: A :class:`Counter` of the number of arguments which use each\
+proposition as a premise or exception.
+:param components: The number of strongly connected components of the\
+propositions.
+:param cycles: The sizes of the components which contain a cycle,\
+largest first.
+:param exception_density: The fraction of premises and exceptions which\
+are exceptions.
+:param cost: The estimated cost of evaluating each proposition.
+"""
 
-        :type alpha: float in interval [0, 1]
 
+def _profile(props, live, negation, arguments):
+    """
+    Compute the :class:`GraphProfile` of the arguments between some
+    numbered propositions, as :meth:`ArgumentSet.profile` describes.
+
+    :param props: The propositions, by number.
+    :param live: The numbers of the propositions in the graph.
+    :param negation: The number of the negation of each live proposition,\
+    or :class:`None` if it is not in the graph.
+    :param arguments: The number of the conclusion and the numbers of the\
+    premises and of the exceptions of each argument.
+    :rtype: :class:`GraphProfile`
+    """
+    args_for = defaultdict(list)
+    users = Counter()
+    n_premises = n_exceptions = 0
+    links = []
+    for (row, (conclusion, premises, exceptions)) in enumerate(arguments):
+        links.append((premises, exceptions))
+        args_for[conclusion].append(row)
+        n_premises += len(premises)
+        n_exceptions += len(exceptions)
+        users.update(set(premises) | set(exceptions))
+
+    def targets(row):
+        return itertools.chain(*links[row])
+
+    # links from each proposition to the propositions it depends on
+    edges = []
+    for i in live:
+        for row in args_for[i] + args_for.get(negation[i], []):
+            edges.extend((i, j) for j in targets(row))
+    deps = Graph(n=len(props), edges=edges, directed=True)
+    sccs = deps.connected_components(mode='strong')
+    membership = sccs.membership
+    cyclic = [False] * len(sccs)
+    for (i, j) in edges:
+        if membership[i] == membership[j]:
+            cyclic[membership[i]] = True
+
+    # dependencies come after the propositions that depend on them
+    order = sccs.cluster_graph().topological_sorting()
+    members = defaultdict(list)
+    for i in live:
+        members[membership[i]].append(i)
+    depth = {}
+    cost = {}
+    for c in reversed(order):
+        for i in members[c]:
+            if cyclic[c] or any(cost[j] == float('inf') for row in
+                                args_for[i] + args_for.get(negation[i], [])
+                                for j in targets(row)
+                                if membership[j] != c):
+                cost[i] = float('inf')
+            else:
+                cost[i] = 1.0 + sum(1.0 + sum(cost[j] for j in targets(row))
+                                    for row in args_for[i] +
+                                    args_for.get(negation[i], []))
+            # a cycle counts as a single step of derivation
+            depth[i] = max([1 + max([depth[j] for j in targets(row)
+                                     if membership[j] != c], default=0)
+                            for row in args_for[i]], default=0)
+
+    return GraphProfile(
+        propositions=len(live),
+        arguments=len(links),
+        edges=len(links) + n_premises + n_exceptions,
+        max_depth=max(depth.values(), default=0),
+        fan_in=Counter(len(args_for[i]) for i in live),
+        fan_out=Counter(users[i] for i in live),
+        components=len({membership[i] for i in live}),
+        cycles=sorted((len(members[c]) for c in members if cyclic[c]),
+                      reverse=True),
+        exception_density=(n_exceptions / (n_premises + n_exceptions)
+                           if n_exceptions else 0.0),
+        cost={props[i]: cost[i] for i in live})
+
+
+Label = namedtuple('Label', ['proposition', 'standard', 'acceptable',
+                             'max_pro', 'max_con', 'pro_args', 'con_args'])
+"""
+The evaluation of a proposition in a CAES, as generated by
+:meth:`CAES.iter_labelling` and :meth:`CAES.labelling_from`.
+
+:param proposition: The proposition.
+:param standard: The name of its proof standard.
+:param acceptable: Whether it is acceptable.
+:param max_pro: The maximum weight of an applicable argument pro.
+:param max_con: The maximum weight of an applicable argument con.
+:param pro_args: The IDs of the applicable arguments pro.
+:param con_args: The IDs of the applicable arguments con.
+"""
 
-        :parameter beta: difference required between strength of\
-        argument *pro* a proposition vs strength of argument *con*\
-        to reach the proof standard "clear and convincing".
 
-        :type beta: float in interval [0, 1]
+class StandardsMatrix(namedtuple('StandardsMatrix', ['propositions',
+                                                     'standards', 'bits'])):
+    """
+    Which proof standards each proposition meets, as computed by
+    :meth:`CAES.standards_matrix`.
 
-        :parameter gamma: threshold of strength of a *con* argument required\
-        for a proposition to reach the proof standard "beyond reasonable\
-        doubt".
+    :param propositions: The propositions, one for each row.
+    :param standards: The names of the proof standards, one for each column.
+    :param bits: One byte for each proposition, with bit ``j`` set if it\
+    meets ``standards[j]``.
+    """
+    __slots__ = ()
 
-        :type gamma: float in interval [0, 1]
+    def row(self, proposition):
         """
-        self.argset = argset
-        self.assumptions = audience.assumptions
-        self.weight = audience.weight
-        self.standard = proofstandard
+        Whether a proposition meets each of the proof standards.
+
+        :param proposition: The proposition.
+        :type proposition: :class:`PropLiteral`
+        :rtype: tuple(bool)
+        :raises ValueError: if the proposition is not in the matrix.
+        """
+        bits = self.bits[self.propositions.index(proposition)]
+        return tuple(bool(bits >> j & 1) for j in range(len(self.standards)))
+
+    def meets(self, proposition, standard):
+        """
+        Whether a proposition meets a proof standard.
+
+        :param proposition: The proposition.
+        :type proposition: :class:`PropLiteral`
+        :param standard: The name of the proof standard.
+        :type standard: str
+        :rtype: bool
+        """
+        return self.row(proposition)[self.standards.index(standard)]
+
+    def __str__(self):
+        width = max([len(str(p)) for p in self.propositions] + [0])
+        lines = [' '.join([''.ljust(width)] + list(self.standards))]
+        for (p, bits) in zip(self.propositions, self.bits):
+            cells = [('x' if bits >> j & 1 else '.').center(len(name))
+                     for (j, name) in enumerate(self.standards)]
+            lines.append(' '.join([str(p).ljust(width)] + cells).rstrip())
+        return '\n'.join(lines)
+
+
+ArgumentCheck = namedtuple('ArgumentCheck', ['arg_id', 'applicable',
+                                             'premises', 'exceptions',
+                                             'weight'])
+"""
+How the applicability of an argument was decided, as recorded in a
+:class:`Justification`.
+
+The premises and exceptions which were checked are paired with how they
+stood: ``'assumed'`` or ``'denied'`` by the audience, or found
+``'acceptable'`` or ``'unacceptable'`` in the CAES, in which case their own
+justification is recorded in turn. A premise or exception is left out if the
+outcome was settled before it came to be checked.
+
+:param arg_id: The ID of the argument.
+:param applicable: Whether the argument is applicable.
+:param premises: Pairs of a premise and how it stood.
+:param exceptions: Pairs of an exception and how it stood.
+:param weight: The weight of the argument, or :class:`None` if it was not\
+needed.
+"""
+
+
+Justification = namedtuple('Justification', ['proposition', 'standard',
+                                             'acceptable', 'max_pro',
+                                             'max_con', 'pro', 'con'])
+"""
+How the acceptability of a proposition was decided, as recorded by a CAES
+made with ``record=True``.
+
+:param proposition: The proposition.
+:param standard: The name of its proof standard.
+:param acceptable: Whether it is acceptable.
+:param max_pro: The maximum weight of an applicable argument pro, or\
+:class:`None` if the standard does not compare weights.
+:param max_con: The maximum weight of an applicable argument con, or\
+:class:`None` if the standard does not compare weights.
+:param pro: The :class:`ArgumentCheck` of each argument pro which was checked.
+:param con: The :class:`ArgumentCheck` of each argument con which was checked.
+"""
+
+
+class Explanation(namedtuple('Explanation', ['proposition', 'nodes'])):
+    """
+    The justification of a proposition, together with the justifications of
+    the propositions on which it rests, as returned by :meth:`CAES.explain`.
+
+    :param proposition: The proposition explained.
+    :param nodes: The :class:`Justification` of each proposition reached\
+    from it, the proposition itself first. A proposition shared by several\
+    arguments appears once.
+    """
+    __slots__ = ()
+
+    def to_json(self):
+        """
+        Convert the explanation into objects which can be serialised to JSON.
+
+        :rtype: dict
+        """
+        def check(c):
+            return {'arg_id': c.arg_id, 'applicable': c.applicable,
+                    'premises': {str(p): status for (p, status) in c.premises},
+                    'exceptions': {str(e): status
+                                   for (e, status) in c.exceptions},
+                    'weight': c.weight}
+
+        return {'proposition': str(self.proposition),
+                'nodes': {str(p): {'standard': node.standard,
+                                   'acceptable': node.acceptable,
+                                   'max_pro': node.max_pro,
+                                   'max_con': node.max_con,
+                                   'pro': [check(c) for c in node.pro],
+                                   'con': [check(c) for c in node.con]}
+                          for (p, node) in self.nodes.items()}}
+
+
+ArgumentDiff = namedtuple('ArgumentDiff', ['added', 'removed', 'modified'])
+"""
+The differences between the arguments of two versions of an argument set,
+as found by :func:`diff`.
+
+:param added: The arguments of the new version whose content is not in the\
+old.
+:param removed: The arguments of the old version whose content is not in the\
+new.
+:param modified: Pairs of an argument of the old version and an argument of\
+the new version with the same content, but other IDs or other arguments\
+merged into them, so that they may be weighed differently.
+"""
+
+
+AssumptionSets = namedtuple('AssumptionSets', ['sets', 'complete'])
+"""
+The result of :meth:`CAES.minimal_assumptions`.
+
+:param sets: The minimal sets of assumptions found, in order of size.
+:param complete: Whether the search finished, rather than being cut short\
+by a limit on the number of sets or on the time taken.
+"""
+
+
+Margin = namedtuple('Margin', ['lower', 'upper'])
+"""
+How far the weight of an argument can be decreased or increased before the
+acceptability of some proposition changes.
+
+:param lower: The margin for decreasing the weight.
+:param upper: The margin for increasing the weight.
+"""
+
+
+class _Undecided(object):
+    """
+    The type of :data:`UNDECIDED`.
+    """
+    def __repr__(self):
+        return 'UNDECIDED'
+
+    def __bool__(self):
+        raise TypeError('An undecided outcome is neither true nor false')
+
+
+UNDECIDED = _Undecided()
+"""
+The outcome of an evaluation which ran out of budget before the acceptability
+of a proposition was decided.
+"""
+
+
+Evaluation = namedtuple('Evaluation', ['proposition', 'outcome', 'labels',
+                                       'steps', 'elapsed', 'path'])
+"""
+The result of a bounded evaluation, as returned by :meth:`CAES.evaluate`.
+
+:param proposition: The proposition.
+:param outcome: :class:`True` or :class:`False` if it was decided whether\
+the proposition is acceptable, otherwise :data:`UNDECIDED`.
+:param labels: The acceptability of the propositions which were decided in\
+the course of the evaluation.
+:param steps: The number of propositions which were visited.
+:param elapsed: The time taken, in seconds.
+:param path: If the outcome is :data:`UNDECIDED`, the propositions which\
+were being evaluated when the budget ran out, from the outermost to the\
+innermost; otherwise empty.
+"""
+
+
+class _ArgIds(object):
+    """
+    The IDs of a list of arguments, to be formatted in a log message only if
+    the message is emitted.
+    """
+    def __init__(self, arguments):
+        self.arguments = arguments
+
+    def __str__(self):
+        return str([arg.arg_id for arg in self.arguments])
+
+
+class _Grounding(object):
+    """
+    The instances of the argument schemes of an argument set which a
+    :class:`CAES` has grounded against the assumptions of its audience, kept
+    apart from the argument set itself.
+    """
+    def __init__(self, schemes, assumptions):
+        # the number of schemes when grounding started
+        self.schemes = schemes
+        self.facts = _FactIndex(assumptions)
+        # the instances for each grounded proposition that matches a scheme
+        self.instances = {}
+        self.scheme_of = {}
+        # the conclusions of the instances which use each proposition as a
+        # premise or an exception
+        self.users = defaultdict(set)
+        self.grounded = set()
+
+    def add(self, proposition, instances, scheme_of):
+        self.instances[proposition] = [argument for (argument, _) in instances]
+        self.scheme_of.update(scheme_of)
+        for (argument, _) in instances:
+            for p in argument.premises | argument.exceptions:
+                self.users[p].add(proposition)
+
+    def copy(self):
+        other = copy.copy(self)
+        other.instances = dict(self.instances)
+        other.scheme_of = dict(self.scheme_of)
+        other.users = defaultdict(set, ((p, set(conclusions)) for
+                                        (p, conclusions) in self.users.items()))
+        other.grounded = set(self.grounded)
+        return other
+
+
+class _OutOfBudget(Exception):
+    """
+    Raised when an evaluation runs out of budget, to abandon it.
+    """
+    def __init__(self, proposition):
+        Exception.__init__(self)
+        # innermost first
+        self.path = [proposition]
+
+
+class _Budget(object):
+    """
+    The number of steps and the time remaining to an evaluation, together
+    with the propositions it has decided so far, and those it is in the
+    middle of deciding. An evaluation runs in a single thread, so each of
+    these belongs to one thread.
+    """
+    def __init__(self, max_steps=None, timeout=None):
+        self.max_steps = max_steps
+        self.start = time.monotonic()
+        self.deadline = None if timeout is None else self.start + timeout
+        self.steps = 0
+        # pairs of a proposition and its acceptability, in order of decision
+        self.decided = []
+        # the propositions being decided, from the outermost to the
+        # innermost, as the keys of a dict
+        self.active = {}
+        # the propositions being decided when the stack overflowed
+        self.overflow = None
+
+    def charge(self, proposition):
+        """
+        Account for a visit to a proposition, which is then in progress
+        until :meth:`release` is called.
+
+        :raises _OutOfBudget: if the budget is exhausted, or the proposition\
+        is already in progress, so that its acceptability depends on itself.
+        """
+        if proposition in self.active:
+            raise _OutOfBudget(proposition)
+        self.steps += 1
+        if (self.max_steps is not None and self.steps > self.max_steps) or \
+           (self.deadline is not None and time.monotonic() > self.deadline):
+            raise _OutOfBudget(proposition)
+        self.active[proposition] = None
+
+    def release(self, proposition):
+        """
+        Mark a proposition as no longer in progress.
+        """
+        del self.active[proposition]
+
+
+class _Axis(object):
+    """
+    The partition of the interval [0, 1] induced by a finite set of
+    breakpoints, into the breakpoints themselves and the open intervals
+    between them. Cells are numbered from left to right, so that breakpoint
+    ``i`` is cell ``2 * i``.
+    """
+    def __init__(self, breakpoints):
+        self.points = sorted({b for b in breakpoints if 0.0 <= b <= 1.0} |
+                             {0.0, 1.0})
+        # a value that lies in each cell
+        self.samples = []
+        for (i, b) in enumerate(self.points):
+            if i > 0:
+                self.samples.append((self.points[i-1] + b) / 2)
+            self.samples.append(b)
+
+    def __len__(self):
+        return len(self.samples)
+
+    def cell(self, value):
+        """
+        The cell that contains a value.
+        """
+        if not 0.0 <= value <= 1.0:
+            raise ValueError("Threshold {} is not in the interval [0, 1]".\
+                             format(value))
+        i = bisect.bisect_left(self.points, value)
+        if self.points[i] == value:
+            return 2 * i
+        return 2 * i - 1
+
+    def interval(self, first, last):
+        """
+        The interval covered by a run of cells.
+        """
+        return Interval(self.points[first // 2], self.points[(last + 1) // 2],
+                        first % 2 == 0, last % 2 == 0)
+
+
+class ThresholdRegion(object):
+    """
+    The set of values of the thresholds ``alpha``, ``beta`` and ``gamma`` of a
+    :class:`CAES` for which a proposition is acceptable, as computed by
+    :meth:`CAES.threshold_regions`.
+
+    The region is a union of cells of a grid over ``alpha`` and ``gamma``,
+    represented as the bits of an integer; the acceptability of a
+    proposition is constant within each cell. The proof standards make no
+    use of ``beta``, so the region is unbounded along that axis.
+    """
+    def __init__(self, alphas, gammas, bits):
+        self._alphas = alphas
+        self._gammas = gammas
+        self.bits = bits
+
+    def __bool__(self):
+        return self.bits != 0
+
+    def contains(self, alpha, beta, gamma):
+        """
+        Determine whether a proposition is acceptable for some thresholds.
+
+        :raises ValueError: if ``alpha`` or ``gamma`` is not in the\
+        interval [0, 1].
+        :rtype: bool
+        """
+        i = self._alphas.cell(alpha)
+        j = self._gammas.cell(gamma)
+        return bool(self.bits >> (i * len(self._gammas) + j) & 1)
+
+    def boxes(self):
+        """
+        Describe the region as a union of disjoint boxes.
+
+        :return: For each box, the intervals of ``alpha`` and ``gamma`` which\
+        it spans.
+        :rtype: list(tuple(:class:`Interval`, :class:`Interval`))
+        """
+        n = len(self._gammas)
+        row = (1 << n) - 1
+
+        def runs(bits):
+            result = []
+            j = 0
+            while j < n:
+                if bits >> j & 1:
+                    start = j
+                    while j + 1 < n and bits >> (j + 1) & 1:
+                        j += 1
+                    result.append((start, j))
+                j += 1
+            return result
+
+        boxes = []
+        i = 0
+        while i < len(self._alphas):
+            bits = self.bits >> (i * n) & row
+            start = i
+            while i + 1 < len(self._alphas) and \
+                    self.bits >> ((i + 1) * n) & row == bits:
+                i += 1
+            for (first, last) in runs(bits):
+                boxes.append((self._alphas.interval(start, i),
+                              self._gammas.interval(first, last)))
+            i += 1
+        return boxes
+
+    def __repr__(self):
+        return 'ThresholdRegion({})'.format(self.boxes())
+
+
+class CAES(object):
+    """
+    A class that represents a Carneades Argument Evaluation Structure (CAES).
+
+    A CAES may be shared between threads. Its acceptability cache is a
+    dictionary which is only ever added to while the argument set stays the
+    same, and any two threads that decide a proposition at the same time
+    store the same value for it.
+    """
+    def __init__(self, argset, audience, proofstandard, alpha=0.4, beta=0.3,
+                 gamma=0.2, record=False):
+        """
+        :parameter argset: the argument set used in the CAES
+        :type argset: :class:`ArgSet`
+
+        :parameter audience: the audience for the CAES
+        :type audience: :class:`Audience`
+
+        :parameter proofstandard: the proof standards used in the CAES
+        :type proofstandard: :class:`ProofStandard`
+
+        :parameter alpha: threshold of strength of argument required for a\
+        proposition to reach the proof standards "clear and convincing" and\
+        "beyond reasonable doubt".
+
+        :type alpha: float in interval [0, 1]
+
+
+        :parameter beta: difference required between strength of\
+        argument *pro* a proposition vs strength of argument *con*\
+        to reach the proof standard "clear and convincing".
+
+        :type beta: float in interval [0, 1]
+
+        :parameter gamma: threshold of strength of a *con* argument required\
+        for a proposition to reach the proof standard "beyond reasonable\
+        doubt".
+
+        :type gamma: float in interval [0, 1]
+
+        :parameter record: whether to record the justification of each\
+        proposition as it is evaluated, for :meth:`explain`.
+
+        :type record: bool
+        """
+        # incremented whenever the audience or the thresholds are set; see
+        # invalidate
+        self._audience_version = 0
+        self.argset = argset
+        self.assumptions = audience.assumptions
+        self.weight = audience.weight
+        self.standard = proofstandard
         self.alpha = alpha
         self.beta = beta
         self.gamma = gamma
+        # cache of acceptability, valid for the recorded version of argset
+        self._labels = {}
+        self._version = argset._version
+        # _sync is serialised by _lock; the budget of the evaluation in
+        # progress is kept separately for each thread
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # the instances of the schemes of argset grounded for the
+        # propositions evaluated so far
+        self._grounding = None
+        # the justification of each proposition in the cache, if recording;
+        # the checks of arguments made while evaluating each proposition in
+        # progress are kept on a stack for each thread
+        self._justifications = {} if record else None
+        # the version of the audience that the cache is valid for
+        self._labels_audience = self._audience_version
+
+    def invalidate(self):
+        """
+        Drop the acceptability cached so far, after the assumptions or the
+        weights of the audience have been changed in place.
+
+        Setting :attr:`assumptions`, :attr:`weight`, :attr:`alpha`,
+        :attr:`beta` or :attr:`gamma` drops the cache by itself, but
+        changes made to the set of assumptions or the mapping of weights
+        themselves are not noticed until this is called.
+        """
+        self._audience_version += 1
+
+    @property
+    def assumptions(self):
+        """
+        The propositions assumed by the audience.
+
+        :rtype: set(:class:`PropLiteral`)
+        """
+        return self._assumptions
+
+    @assumptions.setter
+    def assumptions(self, assumptions):
+        self._assumptions = assumptions
+        self.invalidate()
+
+    @property
+    def weight(self):
+        """
+        The weights of the arguments, by ID.
+
+        :rtype: dict(str, float) or :class:`WeightProvider`
+        """
+        return self._weight
+
+    @weight.setter
+    def weight(self, weight):
+        self._weight = weight
+        self.invalidate()
+
+    @property
+    def alpha(self):
+        return self._alpha
+
+    @alpha.setter
+    def alpha(self, alpha):
+        self._alpha = alpha
+        self.invalidate()
+
+    @property
+    def beta(self):
+        return self._beta
+
+    @beta.setter
+    def beta(self, beta):
+        self._beta = beta
+        self.invalidate()
+
+    @property
+    def gamma(self):
+        return self._gamma
+
+    @gamma.setter
+    def gamma(self, gamma):
+        self._gamma = gamma
+        self.invalidate()
+
+    def _sync(self):
+        """
+        Drop cached acceptability for any proposition that may have been
+        affected by updates to the argument set since the cache was filled,
+        and all of it if the audience or the thresholds have been set, or
+        :meth:`invalidate` called, since.
+        """
+        if self._audience_version != self._labels_audience:
+            with self._lock:
+                version = self._audience_version
+                if version != self._labels_audience:
+                    logging.debug("Audience or thresholds changed, dropping "
+                                  "{} labels".format(len(self._labels)))
+                    self._labels = {}
+                    if self._justifications is not None:
+                        self._justifications = {}
+                    self._grounding = None
+                    self._labels_audience = version
+        if self.argset._version == self._version:
+            return
+        with self._lock:
+            version = self.argset._version
+            if version == self._version:
+                return
+            changed = self.argset.changed_since(self._version)
+            grounding = self._grounding
+            if grounding is not None and \
+                    grounding.schemes != len(self.argset._schemes):
+                # instances of the new schemes may conclude any proposition
+                # grounded so far
+                if changed is not None:
+                    changed |= grounding.grounded
+            if changed is None:
+                self._labels = {}
+                if self._justifications is not None:
+                    self._justifications = {}
+                self._grounding = None
+            else:
+                stale = self._dependents(changed)
+                self._labels = {p: label for (p, label) in self._labels.items()
+                                if p not in stale}
+                if self._justifications is not None:
+                    self._justifications = {
+                        p: node for (p, node) in self._justifications.items()
+                        if p not in stale}
+                if grounding is not None and \
+                        grounding.schemes != len(self.argset._schemes):
+                    self._grounding = None
+            self._version = version
+
+    def _dependents(self, propositions):
+        """
+        The propositions whose acceptability may depend on the arguments for
+        any of the given propositions, through the arguments of the argument
+        set or the instances of schemes grounded here; see
+        :meth:`ArgumentSet.dependents`.
+        """
+        result = self.argset.dependents(propositions)
+        grounding = self._grounding
+        if grounding is None:
+            return result
+        frontier = result
+        while frontier:
+            found = set()
+            for p in frontier:
+                found.update(grounding.users.get(p, ()))
+            frontier = self.argset.dependents(found - result) - result
+            result |= frontier
+        return result
 
+    def _copy(self, assumptions=None):
+        """
+        A shallow copy of the CAES, with its own lock and thread-local state,
+        which records no justifications, optionally for other assumptions.
+        """
+        other = copy.copy(self)
+        other._lock = threading.Lock()
+        other._local = threading.local()
+        other._grounding = None
+        other._justifications = None
+        if assumptions is not None:
+            # the caller decides which of the labels still hold
+            other._assumptions = assumptions
+        return other
+
+    def fork(self):
+        """
+        Create a CAES for a what-if branch of the current one.
+
+        The new CAES evaluates a :meth:`ArgumentSet.fork` of the argument
+        set, with the same audience and proof standards. It starts out with
+        the acceptability already computed here, and only recomputes it for
+        those propositions which depend on updates made to the branch.
+
+        :rtype: :class:`CAES`
+        """
+        self._sync()
+        branch = self._copy()
+        branch.argset = self.argset.fork()
+        if self._grounding is not None:
+            branch._grounding = self._grounding.copy()
+        branch._labels = dict(self._labels)
+        if self._justifications is not None:
+            branch._justifications = dict(self._justifications)
+        return branch
+
+    def relabel(self, old, delta=None):
+        """
+        Take over the acceptability computed by a CAES for an older version
+        of the argument set, and recompute it only where it may have been
+        affected by the differences between the versions.
+
+        The older CAES must have the same audience, proof standards and
+        thresholds as this one.
+
+        :param old: The CAES for the older version.
+        :type old: :class:`CAES`
+        :param delta: The differences from the older version to the argument\
+        set of this CAES, if they are already known; see :func:`diff`.
+        :type delta: :class:`ArgumentDiff` or None
+        :return: The propositions which were evaluated by the older CAES and\
+        whose acceptability has changed, with their new acceptability.
+        :rtype: dict(:class:`PropLiteral`, bool)
+        :raises ValueError: if the older CAES has other assumptions, weights,\
+        proof standards or thresholds.
+        """
+        if frozenset(old.assumptions) != self.assumptions:
+            raise ValueError("The older CAES has other assumptions")
+        if old.weight is not self.weight and \
+                not (type(old.weight) is dict and type(self.weight) is dict
+                     and old.weight == self.weight):
+            raise ValueError("The older CAES has other weights")
+        if (old.alpha, old.beta, old.gamma) != \
+                (self.alpha, self.beta, self.gamma):
+            raise ValueError("The older CAES has other thresholds")
+        if old.standard is not self.standard and \
+                old.standard._settings() != self.standard._settings():
+            raise ValueError("The older CAES has other proof standards")
+        if delta is None:
+            delta = diff(old.argset, self.argset)
+        old._sync()
+        self._sync()
+        conclusions = [arg.conclusion for arg in delta.added]
+        conclusions += [arg.conclusion for arg in delta.removed]
+        for (previous, argument) in delta.modified:
+            conclusions += [previous.conclusion, argument.conclusion]
+        # the instances grounded by the older CAES are still valid if the
+        # schemes are the same, since they only depend on the assumptions
+        grounding = old._grounding
+        if grounding is not None and grounding.instances:
+            if self._grounding is None and \
+                    grounding.schemes == len(self.argset._schemes):
+                self._grounding = grounding.copy()
+            else:
+                conclusions += grounding.instances
+        props = self.argset.propset()
+        cone = self._dependents(conclusions)
+        # when recording, a label is only taken over with its justification
+        recording = self._justifications is not None
+        justifications = old._justifications or {}
+        for (p, label) in old._labels.items():
+            if p in cone or p not in props:
+                continue
+            if not recording:
+                self._labels.setdefault(p, label)
+            elif p in justifications and p not in self._labels:
+                self._labels[p] = label
+                self._justifications[p] = justifications[p]
+        changed = {}
+        for (p, label) in old._labels.items():
+            if p in cone and p in props and self.acceptable(p) != label:
+                changed[p] = self._labels[p]
+        logging.debug("Relabelled {} propositions, of which {} changed".\
+                      format(len(cone), len(changed)))
+        return changed
+
+    @staticmethod
+    def compile(argset, proofstandard):
+        """
+        Compile an argument set and proof standards into a plan for
+        evaluating them for any audience.
+
+        :param argset: The argument set.
+        :type argset: :class:`ArgumentSet`
+        :param proofstandard: The proof standards.
+        :type proofstandard: :class:`ProofStandard`
+        :rtype: :class:`EvaluationPlan`
+        :raises ValueError: if the acceptability of a proposition depends on\
+        itself.
+        """
+        props = list(argset.iter_propositions())
+        index = {p: i for (i, p) in enumerate(props)}
+        n = len(props)
+        negation = array('i', (index.get(p.negate(), -1) for p in props))
+        standards = bytes(_STANDARD_CODES.get(
+            proofstandard.get_proofstandard(p), len(_STANDARD_CODES))
+                          for p in props)
+
+        arg_ids = []
+        sources = []
+        pro = [[] for _ in range(n)]
+        prem_start = array('i', [0])
+        prem_index = array('i')
+        exc_start = array('i', [0])
+        exc_index = array('i')
+        for (k, argument) in enumerate(argset.arguments):
+            arg_ids.append(argument.arg_id)
+            merged = argset.sources(argument.arg_id)
+            sources.append(tuple(merged) if len(merged) > 1 else None)
+            pro[index[argument.conclusion]].append(k)
+            prem_index.extend(index[p] for p in sorted(argument.premises))
+            prem_start.append(len(prem_index))
+            exc_index.extend(index[e] for e in sorted(argument.exceptions))
+            exc_start.append(len(exc_index))
+        pro_start = array('i', [0])
+        pro_index = array('i')
+        for args in pro:
+            pro_index.extend(args)
+            pro_start.append(len(pro_index))
+
+        # the propositions whose acceptability depends directly on that of
+        # each proposition; the arguments con a proposition only matter if
+        # its standard compares them with the arguments pro
+        dependents = [[] for _ in range(n)]
+        indegree = array('i', bytes(4 * n))
+        for i in range(n):
+            args = pro[i]
+            if standards[i] != _SCINTILLA and negation[i] >= 0:
+                args = args + pro[negation[i]]
+            depends_on = set()
+            for k in args:
+                depends_on.update(prem_index[prem_start[k]:prem_start[k + 1]])
+                depends_on.update(exc_index[exc_start[k]:exc_start[k + 1]])
+            indegree[i] = len(depends_on)
+            for j in depends_on:
+                dependents[j].append(i)
+        order = array('i', (i for i in range(n) if indegree[i] == 0))
+        for j in order:
+            for i in dependents[j]:
+                indegree[i] -= 1
+                if indegree[i] == 0:
+                    order.append(i)
+        if len(order) < n:
+            cyclic = next(props[i] for i in range(n) if indegree[i])
+            raise ValueError("The acceptability of proposition '{}' depends "
+                             "on a cycle of arguments".format(cyclic))
+
+        return EvaluationPlan(tuple(props), standards, order, negation,
+                              pro_start, pro_index, prem_start, prem_index,
+                              exc_start, exc_index, tuple(arg_ids),
+                              tuple(sources), argset.merge_weights)
+
+    def counterfactuals(self, candidates=None, negate=False):
+        """
+        Determine which propositions change their acceptability when each of
+        a number of assumptions is dropped by the audience.
+
+        Every counterfactual is evaluated against the acceptability computed
+        for the actual audience: only the propositions returned by
+        :meth:`ArgumentSet.dependents` for a candidate are re-evaluated, and
+        the rest are taken over unchanged.
+
+        :param candidates: The assumptions to be dropped, one at a time;\
+        defaults to all the assumptions of the audience.
+        :type candidates: iterable(:class:`PropLiteral`) or None
+        :param negate: If :class:`True`, the negation of each candidate is\
+        assumed in its place, rather than the candidate just being dropped.
+        :type negate: bool
+        :return: A mapping from each candidate to the propositions in the\
+        graph whose acceptability flips.
+        :rtype: dict(:class:`PropLiteral`, frozenset(:class:`PropLiteral`))
+        """
+        if candidates is None:
+            candidates = sorted(self.assumptions)
+        props = self.argset.propset()
+        self._sync()
+
+        flips = {}
+        for assumption in candidates:
+            cone = self._dependents([assumption])
+            assumptions = set(self.assumptions)
+            assumptions.discard(assumption)
+            if negate:
+                assumptions.add(assumption.negate())
+
+            alt = self._copy(assumptions)
+            alt._labels = dict(self._labels)
+            for p in cone:
+                alt._labels.pop(p, None)
+
+            flips[assumption] = frozenset(
+                p for p in cone & props
+                if alt.acceptable(p) != self.acceptable(p))
+            logging.debug("Dropping assumption '{}' flips {}".\
+                          format(assumption, sorted(flips[assumption])))
+        return flips
+
+    def minimal_assumptions(self, proposition, acceptable=True, limit=None,
+                            timeout=None, max_size=None, smallest=False):
+        """
+        Find the minimal subsets of the audience's assumptions under which a
+        proposition is acceptable, or is not acceptable.
+
+        Only assumptions on which the acceptability of the proposition can
+        depend are considered, which are found by following the arguments
+        pro and con the proposition back through their premises and
+        exceptions.
+
+        The search starts from a family of candidate sets, derived from the
+        dependency graph, one of which is contained in any set that gives
+        the proposition the required acceptability. For acceptability, a
+        candidate supports an argument which can meet the proof standard of
+        the proposition on its own, by supporting each of its premises in
+        turn, either as an assumption or as an acceptable proposition. For
+        unacceptability, a candidate hits every such argument, by leaving
+        a premise unsupported or supporting an exception, unless the proof
+        standard lets an applicable argument con outweigh it. Candidates
+        are tried in order of size, and only those which fail are extended
+        by subsets of the other assumptions, skipping any set which contains
+        a set already found, so that every set found is minimal, and the
+        first ones found are as small as possible. The acceptability of each
+        proposition is memoized against the assumptions which can affect
+        it, so that it is only computed once for all the sets that agree on
+        them.
+
+        :param proposition: The proposition.
+        :type proposition: :class:`PropLiteral`
+        :param acceptable: Whether the sets should make the proposition\
+        acceptable or not acceptable.
+        :type acceptable: bool
+        :param limit: The maximum number of sets to find.
+        :type limit: int or None
+        :param timeout: The maximum time to search for, in seconds.
+        :type timeout: float or None
+        :param max_size: The maximum size of a set.
+        :type max_size: int or None
+        :param smallest: If :class:`True`, only find the sets of the\
+        smallest size.
+        :type smallest: bool
+        :rtype: :class:`AssumptionSets`
+        """
+        self._sync()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        assumptions = self.assumptions
+
+        def direct(p):
+            return {a for a in (p, p.negate()) if a in assumptions}
+
+        def arguments_for(p):
+            try:
+                return self._get_arguments(p)
+            except ValueError:
+                return []
+
+        # the assumptions which can affect the acceptability of each
+        # proposition
+        relevant = {}
+
+        def find_relevant(p):
+            if p not in relevant:
+                found = set()
+                for q in (p, p.negate()):
+                    for argument in arguments_for(q):
+                        for x in argument.premises | argument.exceptions:
+                            found |= direct(x) | find_relevant(x)
+                relevant[p] = frozenset(found)
+            return relevant[p]
+
+        candidates = sorted(find_relevant(proposition))
+        if max_size is None:
+            max_size = len(candidates)
+
+        def minimize(sets):
+            family = []
+            for s in sorted(set(sets), key=lambda s: (len(s), sorted(s))):
+                if len(s) <= max_size and not any(f <= s for f in family):
+                    family.append(s)
+            # too many candidates are left to be tried as subsets
+            return family if len(family) <= SUPPORT_MAX else [frozenset()]
+
+        def product(families):
+            result = [frozenset()]
+            for family in families:
+                result = minimize(a | b for a in result for b in family)
+            return result
+
+        def alone(argument, standard, unknown):
+            """
+            Whether an applicable argument can meet a proof standard on its
+            own, or ``unknown`` if it has no weight.
+            """
+            if standard == 'scintilla':
+                return True
+            try:
+                weight = self.weight_of(argument)
+            except ValueError:
+                return unknown
+            if standard == 'preponderance':
+                return weight > 0
+            return weight > self.alpha and weight > self.gamma
+
+        # the candidate sets for the acceptability and for the
+        # unacceptability of each proposition; a proposition on a cycle is
+        # given the empty set, which every set contains
+        supports = {}
+        defeats = {}
+
+        def support(p):
+            if p not in supports:
+                supports[p] = [frozenset()]
+                standard = self.standard.get_proofstandard(p)
+                if standard not in PROOF_STANDARDS[:-1] or \
+                        (standard == 'beyond_reasonable_doubt' and
+                         self.gamma <= 0):
+                    supports[p] = []
+                else:
+                    supports[p] = minimize(
+                        s for argument in arguments_for(p)
+                        if alone(argument, standard, True)
+                        for s in support_argument(argument))
+            return supports[p]
+
+        def defeat(p):
+            if p not in defeats:
+                defeats[p] = [frozenset()]
+                standard = self.standard.get_proofstandard(p)
+                if standard in PROOF_STANDARDS[:-1] and \
+                        not (standard == 'beyond_reasonable_doubt' and
+                             self.gamma <= 0):
+                    outweigh = []
+                    if standard != 'scintilla':
+                        outweigh = [s for argument in arguments_for(p.negate())
+                                    if alone(argument, 'preponderance', True)
+                                    for s in support_argument(argument)]
+                    defeats[p] = product(
+                        minimize(hit_argument(argument) + outweigh)
+                        for argument in arguments_for(p)
+                        if alone(argument, standard, False))
+            return defeats[p]
+
+        def support_argument(argument):
+            return product(minimize(
+                ([frozenset([q])] if q in assumptions else []) + support(q))
+                           for q in argument.premises)
+
+        def hit_argument(argument):
+            hits = []
+            for q in argument.premises:
+                if q.negate() in assumptions:
+                    hits.append(frozenset([q.negate()]))
+                hits.extend(defeat(q))
+            for e in argument.exceptions:
+                if e in assumptions:
+                    hits.append(frozenset([e]))
+                hits.extend(support(e))
+            return minimize(hits)
+
+        family = support(proposition) if acceptable else defeat(proposition)
+        bases = set(family)
+        # the acceptability of each proposition, by the relevant assumptions
+        memo = defaultdict(dict)
+
+        def evaluate(subset):
+            alt = self._copy(subset)
+            alt._labels = {}
+            for (p, results) in memo.items():
+                label = results.get(subset & relevant[p])
+                if label is not None:
+                    alt._labels[p] = label
+            result = alt.acceptable(proposition)
+            for (p, label) in alt._labels.items():
+                if p in relevant:
+                    memo[p][subset & relevant[p]] = label
+            return result
+
+        def subsets(size, residual):
+            for base in family:
+                if len(base) == size:
+                    yield base
+            for base in residual:
+                rest = [a for a in candidates if a not in base]
+                for extra in itertools.combinations(rest, size - len(base)):
+                    yield base.union(extra)
+
+        found = []
+        complete = True
+        # the candidates which fail, to be extended by other assumptions
+        residual = []
+        for size in range(max_size + 1):
+            if smallest and found:
+                break
+            tried = set()
+            for subset in subsets(size, list(residual)):
+                if limit is not None and len(found) >= limit:
+                    complete = False
+                    break
+                if deadline is not None and time.monotonic() > deadline:
+                    complete = False
+                    break
+                if subset in tried or any(s <= subset for s in found):
+                    continue
+                tried.add(subset)
+                if evaluate(subset) == acceptable:
+                    found.append(subset)
+                elif subset in bases:
+                    residual.append(subset)
+            if not complete:
+                break
+        logging.debug("Found {} minimal assumption sets for '{}'".\
+                      format(len(found), proposition))
+        return AssumptionSets(found, complete and max_size == len(candidates))
+
+    def threshold_regions(self, propositions=None):
+        """
+        Determine, for all values of the thresholds ``alpha``, ``beta`` and
+        ``gamma`` at once, where propositions are acceptable.
+
+        The proof standards compare the weights of applicable arguments with
+        the thresholds, and with each other, so acceptability can only change
+        where a threshold crosses a weight, or the difference between the
+        weights of an argument pro and an argument con a proposition. These
+        breakpoints divide the threshold space into a grid of cells, and a
+        single pass over the graph computes the cells in which each
+        proposition is acceptable. The thresholds of the CAES itself are
+        ignored.
+
+        :param propositions: The propositions of interest; defaults to all\
+        the propositions in the graph.
+        :type propositions: iterable(:class:`PropLiteral`) or None
+        :rtype: dict(:class:`PropLiteral`, :class:`ThresholdRegion`)
+        """
+        argset = self.argset
+        if propositions is None:
+            propositions = argset.propset()
+        comparative = ('clear_and_convincing', 'beyond_reasonable_doubt')
+
+        def known_weights(proposition):
+            weights = []
+            try:
+                arguments = self._get_arguments(proposition)
+            except ValueError:
+                return weights
+            self._prefetch(arguments)
+            for arg in arguments:
+                try:
+                    weights.append(self.weight_of(arg))
+                except ValueError:
+                    pass
+            return weights
+
+        # the weights and differences in weight which thresholds are
+        # compared with
+        alpha_points = set()
+        gamma_points = set()
+        for p in argset.propset():
+            if self.standard.get_proofstandard(p) in comparative:
+                pro = known_weights(p)
+                con = known_weights(p.negate())
+                alpha_points.update(pro)
+                gamma_points.update(con)
+                gamma_points.update(w - v for w in pro + [0.0]
+                                    for v in con + [0.0])
+        alphas = _Axis(alpha_points)
+        gammas = _Axis(gamma_points)
+
+        n = len(gammas)
+        full = (1 << (len(alphas) * n)) - 1
+        # copying the cells of one row to every row
+        columns = sum(1 << (i * n) for i in range(len(alphas)))
+        masks = {}
+
+        def alpha_below(w):
+            key = ('alpha<', w)
+            if key not in masks:
+                row = (1 << n) - 1
+                masks[key] = sum(row << (i * n)
+                                 for (i, a) in enumerate(alphas.samples)
+                                 if a < w)
+            return masks[key]
+
+        def gamma_below(w):
+            key = ('gamma<', w)
+            if key not in masks:
+                masks[key] = columns * sum(1 << j for (j, g) in
+                                           enumerate(gammas.samples) if g < w)
+            return masks[key]
+
+        def gamma_above(w):
+            key = ('gamma>', w)
+            if key not in masks:
+                masks[key] = columns * sum(1 << j for (j, g) in
+                                           enumerate(gammas.samples) if g > w)
+            return masks[key]
+
+        regions = {}
+        arg_regions = {}
+
+        def arg_region(argument):
+            # cells in which the argument is applicable
+            if argument.arg_id in arg_regions:
+                return arg_regions[argument.arg_id]
+            bits = full
+            for p in argument.premises:
+                if p in self.assumptions:
+                    continue
+                if p.negate() in self.assumptions:
+                    bits = 0
+                    break
+                bits &= region(p)
+            for e in argument.exceptions:
+                if e in self.assumptions:
+                    bits = 0
+                    break
+                if e.negate() in self.assumptions:
+                    continue
+                bits &= full ^ region(e)
+            arg_regions[argument.arg_id] = bits
+            return bits
+
+        def weighted(proposition):
+            # arguments applicable in some cell, with their weights
+            result = []
+            for arg in self._get_arguments(proposition):
+                bits = arg_region(arg)
+                if bits:
+                    result.append((bits, self.weight_of(arg)))
+            return result
+
+        def region(proposition):
+            # cells in which the proposition is acceptable
+            if proposition in regions:
+                return regions[proposition]
+            standard = self.standard.get_proofstandard(proposition)
+            bits = 0
+            if standard == 'scintilla':
+                for arg in self._get_arguments(proposition):
+                    bits |= arg_region(arg)
+            elif standard == 'preponderance':
+                con = weighted(proposition.negate())
+                for (a, w) in weighted(proposition):
+                    if w > 0:
+                        for (c, v) in con:
+                            if not w > v:
+                                a &= full ^ c
+                        bits |= a
+            elif standard in comparative:
+                pro = weighted(proposition)
+                con = weighted(proposition.negate())
+                exceeds_alpha = 0
+                exceeds_con = 0
+                for (a, w) in pro:
+                    exceeds_alpha |= a & alpha_below(w)
+                    a &= gamma_below(w)
+                    for (c, v) in con:
+                        a &= (full ^ c) | gamma_below(w - v)
+                    exceeds_con |= a
+                bits = exceeds_alpha & exceeds_con
+                if standard == 'beyond_reasonable_doubt':
+                    bits &= gamma_above(0.0)
+                    for (c, v) in con:
+                        bits &= (full ^ c) | gamma_above(v)
+            regions[proposition] = bits
+            return bits
+
+        return {p: ThresholdRegion(alphas, gammas, region(p))
+                for p in propositions}
+
+    def weight_margins(self):
+        """
+        Determine how far the weight of each argument can be moved before
+        the acceptability of some proposition changes, the other weights
+        staying as they are.
+
+        Only the weights of applicable arguments are ever consulted, and the
+        weight of an argument only enters into the evaluation of its
+        conclusion and of the negation of its conclusion; if neither of these
+        changes, nothing else does. For each such proposition, the proof
+        standard reduces to a comparison between the weight of the argument
+        and a bound given by the thresholds and the strongest competing
+        weights, so the margins can be read off in a single pass over the
+        propositions.
+
+        A margin is the smallest change of weight, within the interval
+        [0, 1], which flips a proposition; a change exactly equal to the
+        margin may or may not suffice, depending on whether the comparison
+        involved is strict. A margin of ``inf`` means that no such change
+        exists.
+
+        :return: A mapping from the arg_id of each argument to its margins.
+        :rtype: dict(str, :class:`Margin`)
+        """
+        self._sync()
+        inf = float('inf')
+        lower = {arg.arg_id: inf for arg in self.argset.arguments}
+        upper = dict(lower)
+        weights = {}
+
+        def applicable_weights(proposition):
+            if proposition not in weights:
+                applicable = self._applicable_arguments(proposition)
+                self._prefetch(applicable)
+                weights[proposition] = [(arg.arg_id, self.weight_of(arg))
+                                        for arg in applicable]
+            return weights[proposition]
+
+        def strongest(ws):
+            # the strongest weight, its arg_id, and the runner-up weight
+            first, second, arg_id = 0.0, 0.0, None
+            for (i, w) in ws:
+                if arg_id is None or w > first:
+                    first, second, arg_id = w, first, i
+                elif w > second:
+                    second = w
+            return (first, arg_id, second)
+
+        def competing(best, arg_id):
+            (first, first_id, second) = best
+            return second if arg_id == first_id else first
+
+        for p in self.argset.propset():
+            standard = self.standard.get_proofstandard(p)
+            if standard not in ('preponderance', 'clear_and_convincing',
+                                'beyond_reasonable_doubt'):
+                continue
+            pro = applicable_weights(p)
+            con = applicable_weights(p.negate())
+            best_pro = strongest(pro)
+            best_con = strongest(con)
+            mwp = best_pro[0]
+            mwc = best_con[0]
+
+            # p is acceptable iff max weight pro w exceeds a bound
+            if standard == 'preponderance':
+                bound = mwc
+                exceeds = lambda w: w > mwc
+            else:
+                bound = max(self.alpha, mwc + self.gamma)
+                exceeds = lambda w: w > self.alpha and w - mwc > self.gamma
+            if standard != 'beyond_reasonable_doubt' or mwc < self.gamma:
+                for (arg_id, w) in pro:
+                    if exceeds(competing(best_pro, arg_id)):
+                        continue
+                    if exceeds(w):
+                        if bound >= 0.0:
+                            lower[arg_id] = min(lower[arg_id],
+                                                max(w - bound, 0.0))
+                    elif bound < 1.0:
+                        upper[arg_id] = min(upper[arg_id],
+                                            max(bound - w, 0.0))
+
+            # p is acceptable iff max weight con w falls short of a bound
+            if standard == 'preponderance':
+                bound = mwp
+                short = lambda w: mwp > w
+            elif mwp > self.alpha:
+                bound = mwp - self.gamma
+                short = lambda w: mwp - w > self.gamma
+                if standard == 'beyond_reasonable_doubt':
+                    bound = min(bound, self.gamma)
+                    short = lambda w: mwp - w > self.gamma and w < self.gamma
+            else:
+                continue
+            for (arg_id, w) in con:
+                if not short(competing(best_con, arg_id)):
+                    continue
+                if short(w):
+                    if bound <= 1.0:
+                        upper[arg_id] = min(upper[arg_id],
+                                            max(bound - w, 0.0))
+                elif bound > 0.0:
+                    lower[arg_id] = min(lower[arg_id], max(w - bound, 0.0))
+
+        return {arg_id: Margin(lower[arg_id], upper[arg_id])
+                for arg_id in lower}
+
+    def iter_labelling(self, propositions=None, cache_size=LABELS_MAX):
+        """
+        Generate the evaluation of each proposition in turn.
+
+        The propositions are evaluated by a copy of the CAES, which starts
+        out with the most recent of the acceptability already cached here,
+        and keeps at most ``cache_size`` labels from one proposition to the
+        next, dropping the oldest first. Nothing else is accumulated, and
+        the cache of the CAES itself is left as it is, so that the
+        labelling of a large graph can be streamed to a file with
+        :func:`write_labelling_csv` or :func:`write_labelling_jsonl`.
+
+        :param propositions: The propositions to be evaluated; defaults to\
+        all the propositions in the graph.
+        :type propositions: iterable(:class:`PropLiteral`) or None
+        :param cache_size: The number of labels kept between propositions.
+        :type cache_size: int
+        :rtype: iter(:class:`Label`)
+        """
+        if propositions is None:
+            propositions = self.argset.iter_propositions()
+        self._sync()
+        stream = self._copy()
+        if self._grounding is not None:
+            stream._grounding = self._grounding.copy()
+        recent = itertools.islice(reversed(self._labels.items()), cache_size)
+        stream._labels = OrderedDict(reversed(list(recent)))
+        for proposition in propositions:
+            yield stream._label(proposition)
+            labels = stream._labels
+            if type(labels) is not OrderedDict:
+                # _sync has rebuilt the cache after an update
+                labels = stream._labels = OrderedDict(labels)
+            while len(labels) > cache_size:
+                labels.popitem(last=False)
+
+    def labelling_from(self, acceptability, propositions=None):
+        """
+        Generate the evaluation of each proposition in turn, as
+        :meth:`iter_labelling` does, taking the acceptability of
+        propositions from a map computed elsewhere, such as by
+        :meth:`EvaluationPlan.evaluate`, rather than deciding it again.
+
+        The map is taken together with the acceptability already cached
+        here, and should hold the premises and exceptions of the arguments
+        for the propositions, so that only their weights are looked up;
+        any other propositions needed are evaluated. Neither the map nor
+        the cache of the CAES is changed.
+
+        :param acceptability: The acceptability of propositions.
+        :type acceptability: dict(:class:`PropLiteral`, bool)
+        :param propositions: The propositions to be labelled; defaults to\
+        all the propositions in the graph.
+        :type propositions: iterable(:class:`PropLiteral`) or None
+        :rtype: iter(:class:`Label`)
+        """
+        if propositions is None:
+            propositions = self.argset.iter_propositions()
+        self._sync()
+        stream = self._copy()
+        if self._grounding is not None:
+            stream._grounding = self._grounding.copy()
+        stream._labels = dict(self._labels)
+        stream._labels.update(acceptability)
+        for proposition in propositions:
+            yield stream._label(proposition)
+
+    @property
+    def decided(self):
+        """
+        The acceptability of the propositions decided so far, which is kept
+        until the argument set or the audience changes.
+
+        :rtype: Mapping(:class:`PropLiteral`, bool)
+        """
+        self._sync()
+        return MappingProxyType(self._labels)
+
+    def _label(self, proposition):
+        """
+        Evaluate a proposition for :meth:`iter_labelling` and
+        :meth:`labelling_from`.
+
+        The applicable arguments pro and con the proposition are found once,
+        and its acceptability is decided from them, as
+        :meth:`meets_proof_standard` would, unless it is already cached.
+        """
+        self._sync()
+        standard = self.standard.get_proofstandard(proposition)
+        acceptable = self._labels.get(proposition)
+        if acceptable is None:
+            self._ground(proposition)
+        arguments = self._get_arguments(proposition)
+        try:
+            con_arguments = self._get_arguments(proposition.negate())
+        except ValueError:
+            con_arguments = []
+        pro = [arg for arg in arguments if self.applicable(arg)]
+        con = [arg for arg in con_arguments if self.applicable(arg)]
+        self._prefetch(pro + con)
+        if acceptable is None:
+            if standard == 'scintilla':
+                acceptable = bool(pro)
+            elif standard in ('preponderance', 'clear_and_convincing',
+                              'beyond_reasonable_doubt'):
+                acceptable = self._weigh(proposition, standard, pro, con,
+                                         arguments, con_arguments)
+            else:
+                acceptable = False
+            self._labels[proposition] = acceptable
+        return Label(proposition, standard, acceptable,
+                     max((self.weight_of(arg) for arg in pro), default=0.0),
+                     max((self.weight_of(arg) for arg in con), default=0.0),
+                     [arg.arg_id for arg in pro], [arg.arg_id for arg in con])
+
+    def standards_matrix(self, propositions=None):
+        """
+        Determine which of the proof standards each proposition meets, in one
+        pass.
+
+        The applicable arguments pro and con a proposition, and their
+        maximum weights, are found once and tested against every standard,
+        rather than evaluating the CAES again under each standard in turn.
+        A proposition is tested on its own: the acceptability of the
+        premises and exceptions of its arguments is still determined by
+        their proof standards in the CAES. As in
+        :meth:`meets_proof_standard`, ``dialectical_validity`` is never met,
+        and as in :meth:`iter_labelling`, a proposition whose negation is
+        not in the argument set has no arguments con.
+
+        :param propositions: The propositions to be tested; defaults to all\
+        the propositions in the graph.
+        :type propositions: iterable(:class:`PropLiteral`) or None
+        :rtype: :class:`StandardsMatrix`
+        :raises ValueError: if an applicable argument has no weight.
+        """
+        if propositions is None:
+            propositions = self.argset.iter_propositions()
+        propositions = list(propositions)
+        self._sync()
+        bits = bytearray()
+        for proposition in propositions:
+            pro = self._applicable_arguments(proposition)
+            con = self._applicable_arguments(proposition.negate())
+            self._prefetch(pro + con)
+            mwp = max((self.weight_of(arg) for arg in pro), default=0.0)
+            mwc = max((self.weight_of(arg) for arg in con), default=0.0)
+            clear = mwp > self.alpha and mwp - mwc > self.gamma
+            met = (bool(pro), mwp > mwc, clear, clear and mwc < self.gamma,
+                   False)
+            bits.append(sum(1 << j for (j, m) in enumerate(met) if m))
+        return StandardsMatrix(propositions, PROOF_STANDARDS, bytes(bits))
+
+    def _applicable_arguments(self, proposition):
+        """
+        The applicable arguments for a proposition, if it is in the argument
+        set.
+        """
+        try:
+            arguments = self._get_arguments(proposition)
+        except ValueError:
+            return []
+        return [arg for arg in arguments if self.applicable(arg)]
 
     def get_all_arguments(self):
         """
@@ -636,21 +3449,67 @@ class CAES(object):
         :type _acceptable: LambdaType
         :rtype: bool
         """
-        logging.debug('Checking applicability of {}...'.format(argument.arg_id))
-        logging.debug('Current assumptions: {}'.format(self.assumptions))
-        logging.debug('Current premises: {}'.format(argument.premises))
+        logging.debug('Checking applicability of %s...', argument.arg_id)
+        logging.debug('Current assumptions: %s', self.assumptions)
+        logging.debug('Current premises: %s', argument.premises)
+        frames = getattr(self._local, 'frames', None)
+        if frames:
+            return self._applicable_recorded(argument, _acceptable, frames[-1])
         b1 = all(p in self.assumptions or \
                  (p.negate() not in self.assumptions and \
                   _acceptable(p)) for p in argument.premises)
 
         if argument.exceptions:
-            logging.debug('Current exception: {}'.format(argument.exceptions))
+            logging.debug('Current exception: %s', argument.exceptions)
         b2 = all(e not in self.assumptions and \
                  (e.negate() in self.assumptions or \
                   not _acceptable(e)) for e in argument.exceptions)
 
         return b1 and b2
 
+    def _applicable_recorded(self, argument, _acceptable, checks):
+        """
+        Determine the applicability of an argument as :meth:`_applicable`
+        does, checking the same premises and exceptions in the same order,
+        and record how each of them stood.
+        """
+        premises = []
+        exceptions = []
+
+        def premise(p):
+            if p in self.assumptions:
+                premises.append((p, 'assumed'))
+                return True
+            if p.negate() in self.assumptions:
+                premises.append((p, 'denied'))
+                return False
+            held = _acceptable(p)
+            premises.append((p, 'acceptable' if held else 'unacceptable'))
+            return held
+
+        def exception(e):
+            if e in self.assumptions:
+                exceptions.append((e, 'assumed'))
+                return False
+            if e.negate() in self.assumptions:
+                exceptions.append((e, 'denied'))
+                return True
+            held = _acceptable(e)
+            exceptions.append((e, 'acceptable' if held else 'unacceptable'))
+            return not held
+
+        b1 = all(premise(p) for p in argument.premises)
+
+        if argument.exceptions:
+            logging.debug('Current exception: %s', argument.exceptions)
+        b2 = all(exception(e) for e in argument.exceptions)
+
+        result = b1 and b2
+        weight = checks[argument.arg_id][4] if argument.arg_id in checks \
+            else None
+        checks[argument.arg_id] = [argument, result, premises, exceptions,
+                                   weight]
+        return result
 
     @TraceCalls()
     def acceptable(self, proposition):
@@ -665,12 +3524,354 @@ class CAES(object):
 
         :rtype: bool
         """
+        self._sync()
+        try:
+            return self._labels[proposition]
+        except KeyError:
+            pass
 
+        budget = getattr(self._local, 'budget', None)
+        if budget is not None:
+            budget.charge(proposition)
+        self._ground(proposition)
         standard = self.standard.get_proofstandard(proposition)
-        logging.debug("Checking whether proposition '{}'"
-                      "meets proof standard '{}'.".\
-                      format(proposition, standard))
-        return self.meets_proof_standard(proposition, standard)
+        logging.debug("Checking whether proposition '%s' "
+                      "meets proof standard '%s'.", proposition, standard)
+        frames = None
+        if self._justifications is not None:
+            frames = getattr(self._local, 'frames', None)
+            if frames is None:
+                frames = self._local.frames = []
+            frames.append({})
+        try:
+            result = self.meets_proof_standard(proposition, standard)
+        except _OutOfBudget as e:
+            e.path.append(proposition)
+            raise
+        except RecursionError:
+            # the path is only known before the stack unwinds
+            if budget is not None and budget.overflow is None:
+                budget.overflow = list(budget.active)
+            raise
+        finally:
+            if frames is not None:
+                checks = frames.pop()
+            if budget is not None:
+                budget.release(proposition)
+        self._labels[proposition] = result
+        if frames is not None:
+            self._justifications[proposition] = self._justify(
+                proposition, standard, result, checks)
+        if budget is not None:
+            budget.decided.append((proposition, result))
+        return result
+
+    def _justify(self, proposition, standard, result, checks):
+        """
+        Build the justification of a proposition from the checks of
+        arguments made while evaluating it.
+        """
+        sides = {proposition: [], proposition.negate(): []}
+        for (argument, applicable, premises, exceptions, weight) in \
+                checks.values():
+            if argument.conclusion in sides:
+                sides[argument.conclusion].append(ArgumentCheck(
+                    argument.arg_id, applicable, tuple(sorted(premises)),
+                    tuple(sorted(exceptions)), weight))
+        (pro, con) = (sides[proposition], sides[proposition.negate()])
+        (max_pro, max_con) = (None, None)
+        if standard in ('preponderance', 'clear_and_convincing',
+                        'beyond_reasonable_doubt'):
+            max_pro = max((c.weight for c in pro if c.applicable),
+                          default=0.0)
+            max_con = max((c.weight for c in con if c.applicable),
+                          default=0.0)
+        return Justification(proposition, standard, result, max_pro, max_con,
+                             tuple(pro), tuple(con))
+
+    def explain(self, proposition):
+        """
+        Look up how the acceptability of a proposition was decided.
+
+        The justifications are those recorded as the propositions were
+        evaluated, by a CAES made with ``record=True``. A proposition whose
+        acceptability was cached without a justification, as when labels are
+        copied in from a CAES which did not record, is evaluated again so
+        that its justification is recorded. The premises
+        and exceptions of the arguments checked for a proposition refer to
+        the justifications of other propositions, which are included once
+        each, however many arguments share them.
+
+        :param proposition: The proposition.
+        :type proposition: :class:`PropLiteral`
+        :rtype: :class:`Explanation`
+        :raises ValueError: if justifications are not recorded, or the\
+        proposition has not been evaluated.
+        """
+        self._sync()
+        if self._justifications is None or \
+                (proposition not in self._justifications and
+                 proposition not in self._labels):
+            raise ValueError("No justification recorded for '{}'".\
+                             format(proposition))
+        nodes = {}
+        stack = [proposition]
+        while stack:
+            p = stack.pop()
+            if p in nodes:
+                continue
+            if p not in self._justifications:
+                self._labels.pop(p, None)
+                self.acceptable(p)
+            node = nodes[p] = self._justifications[p]
+            for check in node.pro + node.con:
+                for (q, status) in check.premises + check.exceptions:
+                    if status in ('acceptable', 'unacceptable'):
+                        stack.append(q)
+        return Explanation(proposition, nodes)
+
+    def _ground(self, proposition):
+        """
+        Ground the argument schemes of the argument set for a proposition and
+        its negation, the first time that the proposition is evaluated.
+
+        The variables of premises are bound against the assumptions of the
+        audience. The instances are kept by the CAES, and not added to the
+        argument set, which is left unchanged; grounding a proposition
+        before it is evaluated leaves the acceptability already cached
+        valid, since none of it can depend on the proposition.
+        """
+        schemes = self.argset._schemes
+        if not schemes:
+            return
+        grounding = self._grounding
+        if grounding is None:
+            with self._lock:
+                if self._grounding is None:
+                    self._grounding = _Grounding(len(schemes),
+                                                 self.assumptions)
+                grounding = self._grounding
+        if proposition in grounding.grounded:
+            return
+        found = [(p,) + self.argset._instantiate(p, grounding.facts)
+                 for p in (proposition, proposition.negate())]
+        with self._lock:
+            for (p, matched, instances, scheme_of) in found:
+                if matched and p not in grounding.grounded:
+                    grounding.add(p, instances, scheme_of)
+                grounding.grounded.add(p)
+        logging.debug("Grounded {} instances for '{}'".format(
+            sum(len(instances) for (_, _, instances, _) in found),
+            proposition))
+
+    def _get_arguments(self, proposition):
+        """
+        Find the arguments for a proposition in the argument set, together
+        with the instances of schemes grounded for it here.
+
+        :raises ValueError: if the proposition is neither in the argument\
+        set nor in an instance grounded here.
+        """
+        grounding = self._grounding
+        if grounding is None:
+            return self.argset.get_arguments(proposition)
+        try:
+            arguments = self.argset.get_arguments(proposition)
+        except ValueError:
+            # the propositions of the instances count as being in the graph
+            if proposition not in grounding.instances and \
+                    proposition not in grounding.users:
+                raise
+            arguments = []
+        instances = grounding.instances.get(proposition)
+        if not instances:
+            return arguments
+        # an instance may since have been added to the argument set itself
+        scheme_of = self.argset.scheme_of
+        return arguments + [arg for arg in instances
+                            if scheme_of(arg.arg_id) is None]
+
+    def _acceptable_within(self, proposition, budget):
+        """
+        Determine the acceptability of a proposition, charging the visits to
+        propositions to a budget.
+
+        :raises _OutOfBudget: if the budget is exhausted, or the evaluation\
+        runs into a cycle of arguments.
+        """
+        outer = getattr(self._local, 'budget', None)
+        self._local.budget = budget
+        try:
+            return self.acceptable(proposition)
+        finally:
+            self._local.budget = outer
+
+    def evaluate(self, proposition, max_steps=None, timeout=None):
+        """
+        Determine the acceptability of a proposition within a budget.
+
+        Each proposition whose acceptability is not already known counts as
+        one step. If the evaluation takes more than ``max_steps`` steps, or
+        more than ``timeout`` seconds, it is abandoned, and the outcome is
+        :data:`UNDECIDED`. So it is if the acceptability of a proposition
+        turns out to depend on itself, through a cycle of arguments, or on a
+        chain of arguments too long to follow without overflowing the stack. The acceptability of the propositions that were
+        decided before then is kept, so that a further call picks up where
+        this one left off.
+
+        :param proposition: The proposition whose acceptability is to be\
+        determined.
+        :type proposition: :class:`PropLiteral`
+        :param max_steps: The maximum number of steps, or :class:`None` for\
+        no limit.
+        :type max_steps: int or None
+        :param timeout: The maximum time in seconds, or :class:`None` for no\
+        limit.
+        :type timeout: float or None
+        :rtype: :class:`Evaluation`
+        """
+        self._sync()
+        budget = _Budget(max_steps, timeout)
+        path = []
+        try:
+            outcome = self._acceptable_within(proposition, budget)
+        except _OutOfBudget as e:
+            logging.debug("Gave up evaluating '%s' after %s steps at '%s'",
+                          proposition, budget.steps, e.path[0])
+            outcome = UNDECIDED
+            path = e.path[::-1]
+        except RecursionError:
+            logging.debug("Gave up evaluating '%s' after %s steps, too deep "
+                          "for the stack", proposition, budget.steps)
+            outcome = UNDECIDED
+            path = budget.overflow or [proposition]
+        return Evaluation(proposition, outcome, dict(budget.decided),
+                          budget.steps, time.monotonic() - budget.start, path)
+
+    def evaluate_threaded(self, propositions, workers=None):
+        """
+        Determine the acceptability of several propositions, sharing them out
+        between a pool of threads.
+
+        The threads share the acceptability cache of the CAES, so that work
+        done by one thread is reused by the others. Threads only run in
+        parallel on a free-threaded build of Python; elsewhere they take turns,
+        which only pays off if the argument set waits on I/O, as a
+        :class:`~carneades.sqlstore.SQLiteArgumentSet` does.
+
+        The argument set must not be updated while this is in progress.
+
+        :param propositions: The propositions whose acceptability is to be\
+        determined.
+        :type propositions: iterable(:class:`PropLiteral`)
+        :param workers: The number of threads; defaults to the number of\
+        processors.
+        :type workers: int or None
+        :rtype: dict(:class:`PropLiteral`, bool)
+        """
+        propositions = list(dict.fromkeys(propositions))
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = max(1, min(workers, len(propositions)))
+        self._sync()
+        shares = [propositions[i::workers] for i in range(workers)]
+        labels = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for result in pool.map(self.acceptable_many, shares):
+                labels.update(result)
+        return {p: labels[p] for p in propositions}
+
+    async def acceptable_async(self, propositions):
+        """
+        Determine the acceptability of several propositions, as in
+        :meth:`acceptable_many`, without blocking the running event loop.
+
+        The evaluation runs in a worker thread. If the weights of the
+        audience are an :class:`AsyncWeightProvider` with no event loop of
+        its own, they are scored on the running loop.
+
+        :param propositions: The propositions whose acceptability is to be\
+        determined.
+        :type propositions: iterable(:class:`PropLiteral`)
+        :rtype: dict(:class:`PropLiteral`, bool)
+        """
+        loop = asyncio.get_running_loop()
+        if isinstance(self.weight, AsyncWeightProvider) and \
+                self.weight.loop is None:
+            self.weight.loop = loop
+        return await loop.run_in_executor(None, self.acceptable_many,
+                                          list(propositions))
+
+    def acceptable_matching(self, prefix=None, namespace=None, glob=None,
+                            polarity=None):
+        """
+        Determine the acceptability of the propositions which satisfy a
+        query, as in :meth:`ArgumentSet.find_propositions`.
+
+        Only the matching propositions, and those on which they depend, are
+        evaluated.
+
+        :param prefix: See :meth:`ArgumentSet.find_propositions`.
+        :param namespace: See :meth:`ArgumentSet.find_propositions`.
+        :param glob: See :meth:`ArgumentSet.find_propositions`.
+        :param polarity: See :meth:`ArgumentSet.find_propositions`.
+        :rtype: dict(:class:`PropLiteral`, bool)
+        """
+        return self.acceptable_many(self.argset.find_propositions(
+            prefix, namespace, glob, polarity))
+
+    def acceptable_many(self, propositions):
+        """
+        Determine the acceptability of several propositions.
+
+        Intermediate results are shared between the propositions, so that
+        the part of the graph on which they jointly depend is evaluated only
+        once.
+
+        :param propositions: The propositions whose acceptability is to be\
+        determined.
+        :type propositions: iterable(:class:`PropLiteral`)
+        :rtype: dict(:class:`PropLiteral`, bool)
+        :raises ValueError: if the acceptability of a proposition depends on\
+        a cycle of arguments.
+        """
+        return dict(self.iter_acceptable(propositions))
+
+    def iter_acceptable(self, propositions):
+        """
+        Generate the acceptability of several propositions, as each is
+        decided.
+
+        A proposition may be decided in the course of evaluating another
+        one on which it depends, in which case it is generated straight
+        away.
+
+        :param propositions: The propositions whose acceptability is to be\
+        determined.
+        :type propositions: iterable(:class:`PropLiteral`)
+        :return: Pairs of a proposition and its acceptability.
+        :rtype: iter(tuple(:class:`PropLiteral`, bool))
+        :raises ValueError: if the acceptability of a proposition depends on\
+        a cycle of arguments.
+        """
+        remaining = dict.fromkeys(propositions)
+        self._sync()
+        while remaining:
+            proposition = next(iter(remaining))
+            budget = _Budget()
+            try:
+                result = self._acceptable_within(proposition, budget)
+            except _OutOfBudget as e:
+                raise ValueError("The acceptability of proposition '{}' "
+                                 "depends on a cycle of arguments".\
+                                 format(e.path[0])) from None
+            decided = [(p, label) for (p, label) in budget.decided
+                       if p in remaining and p != proposition]
+            for (p, label) in decided:
+                del remaining[p]
+                yield (p, label)
+            del remaining[proposition]
+            yield (proposition, result)
 
     @TraceCalls()
     def meets_proof_standard(self, proposition, standard):
@@ -689,33 +3890,51 @@ class CAES(object):
         :rtype: bool
 
         """
-        arguments = self.argset.get_arguments(proposition)
+        arguments = self._get_arguments(proposition)
 
         result = False
 
         if standard == 'scintilla':
             result = any(arg for arg in arguments if self.applicable(arg))
-        elif standard == 'preponderance':
-            result = self.max_weight_pro(proposition) > \
-                self.max_weight_con(proposition)
-        elif standard == 'clear_and_convincing':
-            mwp = self.max_weight_pro(proposition)
-            mwc = self.max_weight_con(proposition)
+            return result
+        if standard not in ('preponderance', 'clear_and_convincing',
+                            'beyond_reasonable_doubt'):
+            return result
+
+        # the weights of the applicable arguments pro and con are requested
+        # in a single batch
+        con_arguments = self._get_arguments(proposition.negate())
+        pro = [arg for arg in arguments if self.applicable(arg)]
+        con = [arg for arg in con_arguments if self.applicable(arg)]
+        self._prefetch(pro + con)
+        return self._weigh(proposition, standard, pro, con, arguments,
+                           con_arguments)
+
+    def _weigh(self, proposition, standard, pro, con, arguments,
+               con_arguments):
+        """
+        Decide whether a proposition meets a proof standard which compares
+        weights, given the applicable arguments pro and con it, whose
+        weights have been prefetched.
+        """
+        mwp = self._max_weight(pro, arguments)
+        mwc = self._max_weight(con, con_arguments)
+
+        if standard == 'preponderance':
+            result = mwp > mwc
+        else:
             exceeds_alpha = mwp > self.alpha
             diff_exceeds_gamma = (mwp - mwc) > self.gamma
-            logging.debug("max weight pro '{}' is {}".format(proposition, mwp))
-            logging.debug("max weight con '{}' is {}".format(proposition, mwc))
-            logging.debug("max weight pro '{}' >  alpha '{}': {}".\
-                          format(mwp, self.alpha, exceeds_alpha))
-            logging.debug("diff between pro and con = {} > gamma: {}".\
-                          format(mwp-mwc, diff_exceeds_gamma))
+            logging.debug("max weight pro '%s' is %s", proposition, mwp)
+            logging.debug("max weight con '%s' is %s", proposition, mwc)
+            logging.debug("max weight pro '%s' >  alpha '%s': %s",
+                          mwp, self.alpha, exceeds_alpha)
+            logging.debug("diff between pro and con = %s > gamma: %s",
+                          mwp-mwc, diff_exceeds_gamma)
 
             result = (mwp > self.alpha) and (mwp - mwc > self.gamma)
-        elif standard == 'beyond_reasonable_doubt':
-            result = self.meets_proof_standard(proposition,
-                                               'clear_and_convincing') \
-                and \
-                self.max_weight_con(proposition) < self.gamma
+            if standard == 'beyond_reasonable_doubt':
+                result = result and mwc < self.gamma
 
         return result
 
@@ -729,12 +3948,35 @@ class CAES(object):
         :rtype: float in interval [0, 1]
         """
         arg_id = argument.arg_id
+        sources = self.argset.sources(arg_id)
+        if len(sources) > 1:
+            weights = [self.weight[s] for s in sources if s in self.weight]
+            if weights:
+                return self.argset.merge_weights(weights)
+            raise ValueError("No weight assigned to argument '{}'.".\
+                             format(arg_id))
         try:
             return self.weight[arg_id]
         except KeyError:
-            raise ValueError("No weight assigned to argument '{}'.".\
-                             format(arg_id))
-
+            pass
+        # an instance of a scheme may be weighted by the ID of the scheme
+        scheme_id = self.argset.scheme_of(arg_id)
+        if scheme_id is None and self._grounding is not None:
+            scheme_id = self._grounding.scheme_of.get(arg_id)
+        if scheme_id is not None and scheme_id in self.weight:
+            return self.weight[scheme_id]
+        raise ValueError("No weight assigned to argument '{}'.".\
+                         format(arg_id))
+
+    def _prefetch(self, arguments):
+        """
+        Ask a :class:`WeightProvider` for the weights of several arguments
+        in a single batch.
+        """
+        prefetch = getattr(self.weight, 'prefetch', None)
+        if prefetch is not None:
+            prefetch(s for arg in arguments
+                     for s in self.argset.sources(arg.arg_id))
 
     def max_weight_applicable(self, arguments):
         """
@@ -746,18 +3988,29 @@ class CAES(object):
         :return: The maximum of the weights of the arguments.
         :rtype: float in interval [0, 1]
         """
-        arg_ids = [arg.arg_id for arg in arguments]
-
         applicable_args = [arg for arg in arguments if self.applicable(arg)]
+        self._prefetch(applicable_args)
+        return self._max_weight(applicable_args, arguments)
+
+    def _max_weight(self, applicable_args, arguments):
+        """
+        Retrieve the weight of the strongest of the applicable arguments in
+        a list of arguments, once their weights have been prefetched.
+        """
         if len(applicable_args) == 0:
-            logging.debug('No applicable arguments in {}'.format(arg_ids))
+            logging.debug('No applicable arguments in %s',
+                          _ArgIds(arguments))
             return 0.0
 
-        applic_arg_ids = [arg.arg_id for arg in applicable_args]
-        logging.debug('Checking applicability and weights of {}'.\
-                      format(applic_arg_ids))
+        logging.debug('Checking applicability and weights of %s',
+                      _ArgIds(applicable_args))
         weights = [self.weight_of(argument) for argument in applicable_args]
-        logging.debug('Weights of {} are {}'.format(applic_arg_ids, weights))
+        logging.debug('Weights of %s are %s', _ArgIds(applicable_args),
+                      weights)
+        frames = getattr(self._local, 'frames', None)
+        if frames:
+            for (argument, weight) in zip(applicable_args, weights):
+                frames[-1][argument.arg_id][4] = weight
         return max(weights)
 
     def max_weight_pro(self, proposition):
@@ -770,7 +4023,7 @@ class CAES(object):
         :type proposition: :class:`PropLiteral`
         :rtype: float in interval [0, 1]
         """
-        args = self.argset.get_arguments(proposition)
+        args = self._get_arguments(proposition)
         return self.max_weight_applicable(args)
 
     def max_weight_con(self, proposition):
@@ -784,12 +4037,400 @@ class CAES(object):
         :rtype: float in interval [0, 1]
         """
         con = proposition.negate()
-        args = self.argset.get_arguments(con)
+        args = self._get_arguments(con)
         return self.max_weight_applicable(args)
 
 
 
 
+_STANDARD_CODES = {'scintilla': 0, 'preponderance': 1,
+                   'clear_and_convincing': 2, 'beyond_reasonable_doubt': 3}
+_SCINTILLA = _STANDARD_CODES['scintilla']
+_PREPONDERANCE = _STANDARD_CODES['preponderance']
+_BEYOND_REASONABLE_DOUBT = _STANDARD_CODES['beyond_reasonable_doubt']
+
+
+class EvaluationPlan(namedtuple('EvaluationPlan', [
+        'propositions', 'standards', 'order', 'negation', 'pro_start',
+        'pro_index', 'prem_start', 'prem_index', 'exc_start', 'exc_index',
+        'arg_ids', 'sources', 'merge_weights'])):
+    """
+    A plan for evaluating an argument set under fixed proof standards, as
+    compiled by :meth:`CAES.compile`, which can be evaluated for any
+    audience without looking anything up in the argument set.
+
+    Propositions and arguments are numbered, and the plan consists of:
+
+    - ``propositions``, the propositions in order of number;
+    - ``standards``, the code of the proof standard of each proposition;
+    - ``order``, the propositions in an order in which each one comes after\
+    all the propositions on which its acceptability depends;
+    - ``negation``, the number of the negation of each proposition, or -1;
+    - the arguments pro each proposition, the premises of each argument and\
+    the exceptions of each argument, each in compressed sparse row form,\
+    like the columns of an :class:`~carneades.store.ArgumentStore`;
+    - ``arg_ids``, the ID of each argument, with ``sources``, the IDs of\
+    the arguments merged into each argument in dedup mode, or\
+    :class:`None`, and the ``merge_weights`` of the argument set.
+
+    A plan can be pickled, provided that ``merge_weights`` can be, in order
+    to send it to another process.
+    """
+    __slots__ = ()
+
+    def evaluate(self, audience, alpha=0.4, beta=0.3, gamma=0.2):
+        """
+        Determine the acceptability of every proposition for an audience.
+
+        The result is the same as that of :meth:`CAES.acceptable` for a
+        CAES with the same argument set, proof standards and parameters,
+        except that a proposition whose negation is not in the argument set
+        is taken to have no arguments con, rather than raising an error.
+
+        If the weights of the audience are a :class:`WeightProvider`, the
+        propositions are evaluated a level at a time (see :meth:`levels`),
+        and the applicable arguments of each level are scored in one batch.
+
+        :param audience: The audience.
+        :type audience: :class:`Audience`
+        :param alpha: See :class:`CAES`.
+        :param beta: See :class:`CAES`.
+        :param gamma: See :class:`CAES`.
+        :rtype: dict(:class:`PropLiteral`, bool)
+        :raises ValueError: if an applicable argument whose weight is needed\
+        has no weight.
+        """
+        props = self.propositions
+        standards = self.standards
+        negation = self.negation
+        pro_start = self.pro_start
+        pro_index = self.pro_index
+        prem_start = self.prem_start
+        prem_index = self.prem_index
+        exc_start = self.exc_start
+        exc_index = self.exc_index
+        weights = audience.weight
+        assumptions = audience.assumptions
+        assumed = bytearray(p in assumptions for p in props)
+        denied = bytearray(p.negate() in assumptions for p in props)
+        acceptable = bytearray(len(props))
+        # 0 if the applicability of an argument is not yet known, 1 if it is
+        # not applicable and 2 if it is
+        applicability = bytearray(len(self.arg_ids))
+
+        def applicable(k):
+            if not applicability[k]:
+                result = all(assumed[j] or (not denied[j] and acceptable[j])
+                             for j in prem_index[prem_start[k]:
+                                                 prem_start[k + 1]]) and \
+                    all(not assumed[j] and (denied[j] or not acceptable[j])
+                        for j in exc_index[exc_start[k]:exc_start[k + 1]])
+                applicability[k] = 2 if result else 1
+            return applicability[k] == 2
+
+        def weight(k):
+            arg_id = self.arg_ids[k]
+            if self.sources[k] is not None:
+                ws = [weights[s] for s in self.sources[k] if s in weights]
+                if ws:
+                    return self.merge_weights(ws)
+            elif arg_id in weights:
+                return weights[arg_id]
+            raise ValueError("No weight assigned to argument '{}'.".\
+                             format(arg_id))
+
+        def max_weight(i):
+            if i < 0:
+                return 0.0
+            return max((weight(k) for k in pro_index[pro_start[i]:
+                                                     pro_start[i + 1]]
+                        if applicable(k)), default=0.0)
+
+        prefetch = getattr(weights, 'prefetch', None)
+        if prefetch is None:
+            levels = [self.order]
+        else:
+            levels = self.levels()
+
+        for level in levels:
+            if prefetch is not None:
+                # score the applicable arguments of the whole level at once
+                prefetch(s for i in level
+                         if _SCINTILLA < standards[i] < len(_STANDARD_CODES)
+                         for j in (i, negation[i]) if j >= 0
+                         for k in pro_index[pro_start[j]:pro_start[j + 1]]
+                         if applicable(k)
+                         for s in (self.sources[k] or [self.arg_ids[k]]))
+            for i in level:
+                code = standards[i]
+                if code == _SCINTILLA:
+                    result = any(applicable(k) for k in
+                                 pro_index[pro_start[i]:pro_start[i + 1]])
+                elif code < len(_STANDARD_CODES):
+                    mwp = max_weight(i)
+                    mwc = max_weight(negation[i])
+                    if code == _PREPONDERANCE:
+                        result = mwp > mwc
+                    else:
+                        result = mwp > alpha and mwp - mwc > gamma
+                        if code == _BEYOND_REASONABLE_DOUBT:
+                            result = result and mwc < gamma
+                else:
+                    result = False
+                acceptable[i] = result
+        return {p: bool(acceptable[i]) for (i, p) in enumerate(props)}
+
+    def evaluate_many(self, audiences, alpha=0.4, beta=0.3, gamma=0.2):
+        """
+        Determine the acceptability of all the propositions for each of
+        several audiences at once.
+
+        The audiences are evaluated side by side, as the bits of integers:
+        the acceptability of a proposition, and the applicability of an
+        argument, are found for all the audiences with a few bitwise
+        operations. Audiences that share their weights are evaluated
+        together, so the method pays off for many audiences with the same
+        weights and different assumptions.
+
+        :param audiences: The audiences.
+        :type audiences: list(:class:`Audience`)
+        :param alpha: See :class:`CAES`.
+        :param beta: See :class:`CAES`.
+        :param gamma: See :class:`CAES`.
+        :return: The acceptability of each proposition for each audience.
+        :rtype: list(dict(:class:`PropLiteral`, bool))
+        :raises ValueError: if an argument which is applicable for any of\
+        the audiences, and whose weight is needed, has no weight.
+        """
+        audiences = list(audiences)
+        groups = []
+        for (n, audience) in enumerate(audiences):
+            for (weights, members) in groups:
+                if weights is audience.weight or weights == audience.weight:
+                    members.append(n)
+                    break
+            else:
+                groups.append((audience.weight, [n]))
+        results = [None] * len(audiences)
+        for (weights, members) in groups:
+            labels = self._evaluate_bits([audiences[n] for n in members],
+                                         weights, alpha, gamma)
+            for (bit, n) in enumerate(members):
+                results[n] = {p: bool(labels[i] >> bit & 1)
+                              for (i, p) in enumerate(self.propositions)}
+        return results
+
+    def _evaluate_bits(self, audiences, weights, alpha, gamma):
+        """
+        The acceptability of each proposition for audiences with the same
+        weights, as an integer whose bits stand for the audiences.
+        """
+        props = self.propositions
+        standards = self.standards
+        negation = self.negation
+        pro_start = self.pro_start
+        pro_index = self.pro_index
+        prem_start = self.prem_start
+        prem_index = self.prem_index
+        exc_start = self.exc_start
+        exc_index = self.exc_index
+        everyone = (1 << len(audiences)) - 1
+        index = {p: i for (i, p) in enumerate(props)}
+        assumed = [0] * len(props)
+        denied = [0] * len(props)
+        for (bit, audience) in enumerate(audiences):
+            for p in audience.assumptions:
+                i = index.get(p)
+                if i is not None:
+                    assumed[i] |= 1 << bit
+                i = index.get(p.negate())
+                if i is not None:
+                    denied[i] |= 1 << bit
+        acceptable = [0] * len(props)
+        applicability = [None] * len(self.arg_ids)
+
+        def applicable(k):
+            if applicability[k] is None:
+                bits = everyone
+                for j in prem_index[prem_start[k]:prem_start[k + 1]]:
+                    bits &= assumed[j] | (~denied[j] & acceptable[j])
+                for j in exc_index[exc_start[k]:exc_start[k + 1]]:
+                    bits &= ~assumed[j] & (denied[j] | ~acceptable[j])
+                applicability[k] = bits
+            return applicability[k]
+
+        def weight(k):
+            arg_id = self.arg_ids[k]
+            if self.sources[k] is not None:
+                ws = [weights[s] for s in self.sources[k] if s in weights]
+                if ws:
+                    return self.merge_weights(ws)
+            elif arg_id in weights:
+                return weights[arg_id]
+            raise ValueError("No weight assigned to argument '{}'.".\
+                             format(arg_id))
+
+        def weighted(i):
+            # the weights of the arguments pro a proposition, with the
+            # audiences for which they are applicable
+            if i < 0:
+                return []
+            return [(weight(k), bits) for (k, bits) in
+                    ((k, applicable(k)) for k in
+                     pro_index[pro_start[i]:pro_start[i + 1]]) if bits]
+
+        for i in self.order:
+            code = standards[i]
+            if code == _SCINTILLA:
+                result = 0
+                for k in pro_index[pro_start[i]:pro_start[i + 1]]:
+                    result |= applicable(k)
+            elif code < len(_STANDARD_CODES):
+                # every audience has an argument pro of weight at least 0
+                pro = weighted(i) + [(0.0, everyone)]
+                # split the audiences by their strongest argument con
+                classes = []
+                remaining = everyone
+                for (w, bits) in sorted(weighted(negation[i]), reverse=True,
+                                        key=lambda wb: wb[0]):
+                    if bits & remaining:
+                        classes.append((w, bits & remaining))
+                        remaining &= ~bits
+                classes.append((0.0, remaining))
+                result = 0
+                for (mwc, members) in classes:
+                    if code == _PREPONDERANCE:
+                        wins = [bits for (w, bits) in pro if w > mwc]
+                    elif code == _BEYOND_REASONABLE_DOUBT and not mwc < gamma:
+                        wins = []
+                    else:
+                        wins = [bits for (w, bits) in pro
+                                if w > alpha and w - mwc > gamma]
+                    for bits in wins:
+                        result |= members & bits
+            else:
+                result = 0
+            acceptable[i] = result
+        return acceptable
+
+    def levels(self):
+        """
+        Group the propositions into levels, in order of evaluation, such that
+        the acceptability of a proposition only depends on propositions in
+        earlier levels.
+
+        :return: The numbers of the propositions in each level.
+        :rtype: list(list(int))
+        """
+        depth = [0] * len(self.propositions)
+        levels = []
+        for i in self.order:
+            sides = [i]
+            if self.standards[i] != _SCINTILLA and self.negation[i] >= 0:
+                sides.append(self.negation[i])
+            d = 0
+            for j in sides:
+                for k in self.pro_index[self.pro_start[j]:self.pro_start[j + 1]]:
+                    for m in itertools.chain(
+                            self.prem_index[self.prem_start[k]:
+                                            self.prem_start[k + 1]],
+                            self.exc_index[self.exc_start[k]:
+                                           self.exc_start[k + 1]]):
+                        d = max(d, depth[m] + 1)
+            depth[i] = d
+            if d == len(levels):
+                levels.append([])
+            levels[d].append(i)
+        return levels
+
+
+def diff(old, new):
+    """
+    Find the arguments which were added, removed or modified between two
+    versions of an argument set.
+
+    Arguments are matched by their canonical content, as given by
+    :meth:`Argument.key`, so that an argument whose premises or exceptions
+    change is removed and added again. Two arguments with the same content
+    are the same if they also have the same IDs of arguments merged into
+    them in dedup mode, which determine their weights, and otherwise the
+    argument is modified. The IDs of arguments are only kept for reporting.
+
+    :param old: The old version.
+    :type old: :class:`ArgumentSet`
+    :param new: The new version.
+    :type new: :class:`ArgumentSet`
+    :rtype: :class:`ArgumentDiff`
+    """
+    before = defaultdict(list)
+    for argument in old.arguments:
+        before[argument.key()].append(argument)
+    matched = set()
+    added = []
+    unmatched = []
+    for argument in new.arguments:
+        candidates = before.get(argument.key())
+        if not candidates:
+            added.append(argument)
+            continue
+        sources = new.sources(argument.arg_id)
+        for (i, previous) in enumerate(candidates):
+            if old.sources(previous.arg_id) == sources:
+                matched.add(previous.arg_id)
+                del candidates[i]
+                break
+        else:
+            unmatched.append(argument)
+    # arguments with the same content as an old one but other sources
+    modified = []
+    for argument in unmatched:
+        candidates = before[argument.key()]
+        if candidates:
+            previous = candidates.pop(0)
+            matched.add(previous.arg_id)
+            modified.append((previous, argument))
+        else:
+            added.append(argument)
+    removed = [argument for argument in old.arguments
+               if argument.arg_id not in matched]
+    return ArgumentDiff(added, removed, modified)
+
+
+LABEL_FIELDS = list(Label._fields)
+
+
+def write_labelling_csv(labelling, f):
+    """
+    Write a labelling to a file in CSV format, one row at a time.
+
+    The IDs of applicable arguments are separated by spaces.
+
+    :param labelling: The labels, as generated by :meth:`CAES.iter_labelling`.
+    :type labelling: iter(:class:`Label`)
+    :param f: A text file open for writing.
+    """
+    writer = csv.writer(f)
+    writer.writerow(LABEL_FIELDS)
+    for label in labelling:
+        writer.writerow([label.proposition, label.standard,
+                         label.acceptable, label.max_pro, label.max_con,
+                         ' '.join(label.pro_args), ' '.join(label.con_args)])
+
+
+def write_labelling_jsonl(labelling, f):
+    """
+    Write a labelling to a file in JSON Lines format, one object per line.
+
+    :param labelling: The labels, as generated by :meth:`CAES.iter_labelling`.
+    :type labelling: iter(:class:`Label`)
+    :param f: A text file open for writing.
+    """
+    for label in labelling:
+        record = label._asdict()
+        record['proposition'] = str(label.proposition)
+        f.write(json.dumps(record) + '\n')
+
+
 def arg_demo():
     """
     Demo of how to initialise and call methods of a CAES.
@@ -87,6 +87,143 @@ True
 >>> unreliable2 = PropLiteral('unreliable2')
 
 
+Updating an argument set
+++++++++++++++++++++++++
+
+>>> argset = ArgumentSet()
+>>> argset.add_argument(Argument(murder, premises={kill, intent}), arg_id='a1')
+>>> argset.add_argument(Argument(intent, premises={witness1}), arg_id='a2')
+>>> argset.add_argument(Argument(intent, premises={witness2}), arg_id='a3')
+
+Since arguments are removed and replaced by ID, two arguments can no longer
+share an ID.
+
+>>> argset.add_argument(Argument(intent), arg_id='a2')
+Traceback (most recent call last):
+  ...
+ValueError: Argument 'a2' is already in the current graph
+
+>>> print(argset.remove_argument('a2'))
+[witness1], ~[] => intent
+>>> [arg.arg_id for arg in argset.get_arguments(intent)]
+['a3']
+>>> argset.remove_argument('a2')
+Traceback (most recent call last):
+  ...
+ValueError: Argument 'a2' is not in the current graph
+
+>>> old = argset.replace_argument('a1', Argument(murder, premises={intent},
+...                                              exceptions={unreliable1}))
+>>> for arg in argset.arguments:
+...     print(arg.arg_id, arg)
+a1 [intent], ~[unreliable1] => murder
+a3 [witness2], ~[] => intent
+
+>>> sorted(arg.arg_id for arg in argset.remove_proposition(intent))
+['a1', 'a3']
+>>> intent in argset.propset(), murder in argset.propset()
+(False, True)
+>>> argset.arguments
+()
+
+The arguments of a set are a tuple, rather than a list which could be
+updated without the set knowing.
+
+>>> argset.arguments.append(Argument(intent))
+Traceback (most recent call last):
+  ...
+AttributeError: 'tuple' object has no attribute 'append'
+>>> argset.get_arguments(intent)
+Traceback (most recent call last):
+  ...
+ValueError: Proposition 'intent' is not in the current graph
+
+The graph is built from what is left in the set, so that reading or drawing
+it never compacts the set, although the rows of removed arguments are only
+deleted from its store when it is compacted.
+
+>>> argset.graph.vcount(), argset.summary_graph().vcount()
+(7, 7)
+>>> argset._store.waste()
+4
+>>> argset.compact()
+>>> argset._store.waste(), argset.graph.vcount()
+(0, 7)
+>>> argset.get_arguments(murder)
+[]
+
+A graph of propositions alone can be compacted and summarised too.
+
+>>> bare = ArgumentSet()
+>>> v = bare.add_proposition(kill)
+>>> v = bare.add_proposition(murder)
+>>> bare.remove_proposition(kill)
+[]
+>>> bare.compact()
+>>> bare.summary_graph().vs['label']
+['murder']
+
+
+Merging identical arguments
++++++++++++++++++++++++++++
+
+In dedup mode, ``arg3`` above is merged into ``arg2``.
+
+>>> argset = ArgumentSet(dedup=True)
+>>> for (i, arg) in enumerate(args, 1):
+...     argset.add_argument(arg, arg_id='arg{}'.format(i))
+>>> argset.get_arguments(negb) == [arg2]
+True
+>>> argset.sources('arg2')
+['arg2', 'arg3']
+>>> len(argset.arguments), argset.graph.vcount()
+(3, 10)
+
+The weights of merged arguments are combined by taking the maximum, unless
+another function is supplied.
+
+>>> audience = Audience({e}, {'arg2': 0.3, 'arg3': 0.6})
+>>> CAES(argset, audience, ProofStandard([])).weight_of(arg2)
+0.6
+>>> argset.merge_weights = min
+>>> CAES(argset, audience, ProofStandard([])).weight_of(arg2)
+0.3
+
+Removing ``arg2`` leaves ``arg3`` in its place.
+
+>>> print(argset.remove_argument('arg2'))
+[e], ~[] => -b
+>>> [arg.arg_id for arg in argset.get_arguments(negb)]
+['arg3']
+>>> argset.sources('arg3')
+['arg3']
+
+
+Adding arguments in bulk
+++++++++++++++++++++++++
+
+A batch of arguments gives the same graph as adding them one at a time, but
+a duplicate ID anywhere in the batch means that none of them are added, and
+none of them are given an ID.
+
+>>> batch = ArgumentSet()
+>>> batch.add_arguments([(arg1, None), (arg2, 'b2'), (arg4, None)])
+>>> [arg.arg_id for arg in batch.arguments]
+['arg1', 'b2', 'arg3']
+>>> single = ArgumentSet()
+>>> for (arg, arg_id) in [(arg1, None), (arg2, 'b2'), (arg4, None)]:
+...     single.add_argument(arg, arg_id)
+>>> batch.graph.get_edgelist() == single.graph.get_edgelist()
+True
+>>> new = Argument(PropLiteral('new'), premises={PropLiteral('x')})
+>>> batch.add_arguments([(new, 'b3'), (arg3, 'b2')])
+Traceback (most recent call last):
+  ...
+ValueError: Argument 'b2' is already in the current graph
+>>> len(batch.arguments), new.arg_id
+(3, None)
+
+
 Proof standard
 --------------
 
@@ -139,6 +276,660 @@ Vacuously true if there are no premises
 >>> caes = CAES(argset, audience, ps)
 >>> caes._applicable(arg2, acceptability)
 True
+
+What-if branches
+++++++++++++++++
+
+>>> argset = ArgumentSet()
+>>> argset.add_argument(Argument(murder, premises={kill, intent}))
+>>> argset.add_argument(Argument(intent, premises={witness1},
+...                              exceptions={unreliable1}))
+>>> argset.add_argument(Argument(neg_intent, premises={witness2},
+...                              exceptions={unreliable2}))
+>>> weights = {'arg1': 0.8, 'arg2': 0.3, 'arg3': 0.8, 'arg4': 0.9}
+>>> audience = Audience({kill, witness1, witness2, unreliable2}, weights)
+>>> caes = CAES(argset, audience, ps)
+>>> caes.acceptable(murder), caes.acceptable(kill)
+(False, False)
+
+A branch shares the argument set and the acceptability computed so far with
+its parent, until one of them is updated.
+
+>>> branch = caes.fork()
+>>> branch.argset.add_argument(Argument(intent, premises={kill}))
+>>> branch.argset.graph is argset.graph
+False
+>>> len(argset.arguments), len(branch.argset.arguments)
+(3, 4)
+
+The branch keeps the new argument in overlays over the store it shares with
+the parent, rather than in a copy of the store.
+
+>>> store = branch.argset._store
+>>> store.conclusion._base is argset._store.conclusion
+True
+>>> store.conclusion.size()
+1
+
+Only the propositions which depend on the new argument need to be
+re-evaluated in the branch; the rest are taken from the parent.
+
+>>> branch.acceptable(kill)
+False
+>>> sorted(p for p in caes._labels if p not in branch._labels)
+[intent, murder]
+>>> branch.acceptable(murder)
+True
+>>> caes.acceptable(murder)
+False
+
+Changing the audience
++++++++++++++++++++++
+
+The acceptability cached by a CAES is dropped if its assumptions, weights or
+thresholds are set.
+
+>>> jury = CAES(argset, Audience(set(audience.assumptions), dict(weights)), ps)
+>>> jury.acceptable(intent)
+False
+>>> jury.alpha = 0.2
+>>> jury.acceptable(intent)
+True
+>>> jury.assumptions = jury.assumptions - {unreliable2}
+>>> jury.acceptable(intent)
+False
+
+Changes made to the assumptions or the weights in place are only noticed
+once :meth:`invalidate` is called.
+
+>>> jury.assumptions.add(unreliable2)
+>>> jury.acceptable(intent)
+False
+>>> jury.invalidate()
+>>> jury.acceptable(intent)
+True
+>>> jury.weight['arg2'] = 0.1
+>>> jury.invalidate()
+>>> jury.acceptable(intent)
+False
+
+Several propositions at once
+++++++++++++++++++++++++++++
+
+>>> results = branch.acceptable_many([murder, intent, neg_intent])
+>>> sorted(results.items())
+[(-intent, False), (intent, True), (murder, True)]
+
+When `murder` is evaluated, `intent` is decided along the way.
+
+>>> fresh = CAES(branch.argset, audience, ps)
+>>> for (p, label) in fresh.iter_acceptable([murder, intent]):
+...     print(p, label)
+intent True
+murder True
+
+Exporting a labelling
++++++++++++++++++++++
+
+>>> for label in branch.iter_labelling([intent, murder]):
+...     print(label)
+Label(proposition=intent, standard='beyond_reasonable_doubt', acceptable=True, max_pro=0.9, max_con=0.0, pro_args=['arg2', 'arg4'], con_args=[])
+Label(proposition=murder, standard='scintilla', acceptable=True, max_pro=0.8, max_con=0.0, pro_args=['arg1'], con_args=[])
+
+A labelling is streamed with a bounded cache of its own, so that the cache
+of the CAES does not grow with the graph.
+
+>>> fresh = CAES(branch.argset, audience, ps)
+>>> [label.acceptable for label in fresh.iter_labelling([murder, intent],
+...                                                      cache_size=1)]
+[True, True]
+>>> fresh._labels
+{}
+
+>>> import io
+>>> f = io.StringIO()
+>>> write_labelling_csv(branch.iter_labelling([intent, neg_intent]), f)
+>>> print(f.getvalue())
+proposition,standard,acceptable,max_pro,max_con,pro_args,con_args
+intent,beyond_reasonable_doubt,True,0.9,0.0,arg2 arg4,
+-intent,scintilla,False,0.0,0.9,,arg2 arg4
+<BLANKLINE>
+>>> f = io.StringIO()
+>>> write_labelling_jsonl(branch.iter_labelling([murder]), f)
+>>> print(f.getvalue())
+{"proposition": "murder", "standard": "scintilla", "acceptable": true, "max_pro": 0.8, "max_con": 0.0, "pro_args": ["arg1"], "con_args": []}
+<BLANKLINE>
+
+Standards matrix
+++++++++++++++++
+
+Which proof standards would each proposition meet, if it were held to them?
+
+>>> matrix = branch.standards_matrix([intent, neg_intent, murder])
+>>> print(matrix)
+        scintilla preponderance clear_and_convincing beyond_reasonable_doubt dialectical_validity
+intent      x           x                x                      x                      .
+-intent     .           .                .                      .                      .
+murder      x           x                x                      x                      .
+>>> matrix.meets(neg_intent, 'preponderance')
+False
+>>> list(matrix.bits)
+[15, 0, 15]
+
+Recorded justifications
++++++++++++++++++++++++
+
+A CAES can record how each proposition was decided as it goes, so that the
+decision can be explained afterwards without evaluating anything again.
+
+>>> recorded = CAES(branch.argset, audience, ps, record=True)
+>>> recorded.acceptable(murder)
+True
+>>> explanation = recorded.explain(murder)
+>>> list(explanation.nodes)
+[murder, intent, unreliable1]
+>>> node = explanation.nodes[intent]
+>>> node.standard, node.acceptable, node.max_pro, node.max_con
+('beyond_reasonable_doubt', True, 0.9, 0.0)
+>>> for check in node.pro + node.con:
+...     print(check)
+ArgumentCheck(arg_id='arg2', applicable=True, premises=((witness1, 'assumed'),), exceptions=((unreliable1, 'unacceptable'),), weight=0.3)
+ArgumentCheck(arg_id='arg4', applicable=True, premises=((kill, 'assumed'),), exceptions=(), weight=0.9)
+ArgumentCheck(arg_id='arg3', applicable=False, premises=((witness2, 'assumed'),), exceptions=((unreliable2, 'assumed'),), weight=None)
+
+>>> import json
+>>> print(json.dumps(explanation.to_json()['nodes']['murder'], sort_keys=True))
+{"acceptable": true, "con": [], "max_con": null, "max_pro": null, "pro": [{"applicable": true, "arg_id": "arg1", "exceptions": {}, "premises": {"intent": "acceptable", "kill": "assumed"}, "weight": null}], "standard": "scintilla"}
+
+>>> recorded.explain(neg_intent)
+Traceback (most recent call last):
+...
+ValueError: No justification recorded for '-intent'
+
+A recording CAES takes over from one which does not record only the labels
+that come with a justification, and decides the others again.
+
+>>> relabelled = CAES(branch.argset, audience, ps, record=True)
+>>> relabelled.relabel(branch)
+{}
+>>> relabelled._labels
+{}
+>>> relabelled.acceptable(murder)
+True
+>>> list(relabelled.explain(murder).nodes)
+[murder, intent, unreliable1]
+
+Finding propositions
+++++++++++++++++++++
+
+Propositions can be looked up by the prefix, namespace or glob pattern of
+their atoms, and only the ones found need be evaluated.
+
+>>> cases = ArgumentSet()
+>>> cases.add_argument(Argument(PropLiteral('case1/guilty'),
+...                             premises={PropLiteral('case1/witness_a')}))
+>>> cases.add_argument(Argument(PropLiteral('case2/guilty'),
+...                             premises={PropLiteral('case2/witness_b')}))
+>>> cases.find_propositions(namespace='case1')
+[case1/guilty, -case1/guilty, case1/witness_a]
+>>> cases.find_propositions(glob='*/witness*')
+[case1/witness_a, case2/witness_b]
+>>> cases.find_propositions(prefix='case2/g', polarity=False)
+[-case2/guilty]
+
+>>> jury = CAES(cases, Audience({PropLiteral('case1/witness_a')},
+...                             {'arg1': 0.6, 'arg2': 0.6}), ProofStandard([]))
+>>> sorted(jury.acceptable_matching(glob='case?/guilty', polarity=True).items())
+[(case1/guilty, True), (case2/guilty, False)]
+>>> sorted(jury._labels)
+[case1/guilty, case2/guilty, case2/witness_b]
+
+Counterfactuals
++++++++++++++++
+
+Which conclusions of the branch depend on which assumptions?
+
+>>> flips = branch.counterfactuals()
+>>> for assumption in sorted(flips):
+...     print(assumption, sorted(flips[assumption]))
+kill [intent, murder]
+unreliable2 [-intent, intent, murder]
+witness1 []
+witness2 []
+
+>>> flips = branch.counterfactuals([unreliable1], negate=True)
+>>> flips[unreliable1]
+frozenset()
+>>> branch.acceptable(murder)
+True
+
+Profiling an argument set
++++++++++++++++++++++++++
+
+>>> profile = argset.profile()
+>>> profile.propositions, profile.arguments, profile.edges
+(9, 3, 9)
+>>> profile.max_depth, profile.cycles, profile.exception_density
+(2, [], 0.3333333333333333)
+>>> sorted(profile.fan_in.items()), sorted(profile.fan_out.items())
+([(0, 6), (1, 3)], [(0, 3), (1, 6)])
+>>> profile.cost[murder], profile.cost[intent], profile.cost[kill]
+(10.0, 7.0, 1.0)
+
+An argument for `kill` from `murder` would close a cycle.
+
+>>> cyclic = argset.fork()
+>>> cyclic.add_argument(Argument(kill, premises={murder}))
+>>> profile = cyclic.profile()
+>>> profile.cycles, profile.components
+([2], 9)
+>>> profile.cost[murder], profile.cost[witness1]
+(inf, 1.0)
+
+Threshold regions
++++++++++++++++++
+
+In the original CAES, `murder` is not acceptable because the only applicable
+argument for `intent` is too weak for its proof standard. For which values
+of the thresholds would `murder` be acceptable?
+
+>>> regions = caes.threshold_regions()
+>>> for box in regions[murder].boxes():
+...     print(box)
+(Interval(lower=0.0, upper=0.3, lower_closed=True, upper_closed=False), Interval(lower=0.0, upper=0.3, lower_closed=False, upper_closed=False))
+>>> regions[murder].contains(0.2, 0.3, 0.1)
+True
+>>> regions[murder].contains(0.3, 0.3, 0.1)
+False
+>>> CAES(argset, audience, ps, alpha=0.2, gamma=0.1).acceptable(murder)
+True
+>>> bool(regions[kill])
+False
+
+Weight margins
+++++++++++++++
+
+Only `arg2` is applicable, and raising its weight above `alpha` would make
+`intent`, and hence `murder`, acceptable.
+
+>>> margins = caes.weight_margins()
+>>> margins['arg1'], margins['arg3']
+(Margin(lower=inf, upper=inf), Margin(lower=inf, upper=inf))
+>>> round(margins['arg2'].upper, 6), margins['arg2'].lower
+(0.1, inf)
+
+Bounded evaluation
+++++++++++++++++++
+
+A long chain of arguments takes one step for each link.
+
+>>> steps = [PropLiteral('step{}'.format(k)) for k in range(11)]
+>>> chain = ArgumentSet()
+>>> chain.add_arguments((Argument(steps[k + 1], premises={steps[k]}), None)
+...                     for k in range(10))
+>>> weights = {'arg{}'.format(k): 0.5 for k in range(1, 11)}
+>>> bounded = CAES(chain, Audience({steps[0]}, weights), ProofStandard([]))
+>>> evaluation = bounded.evaluate(steps[5], max_steps=3)
+>>> evaluation.outcome, evaluation.steps, evaluation.labels
+(UNDECIDED, 4, {})
+>>> evaluation.path
+[step5, step4, step3, step2]
+>>> if evaluation.outcome:
+...     pass
+Traceback (most recent call last):
+  ...
+TypeError: An undecided outcome is neither true nor false
+
+Whatever is decided is kept for the next evaluation.
+
+>>> evaluation = bounded.evaluate(steps[3])
+>>> evaluation.outcome, evaluation.steps, evaluation.labels
+(True, 3, {step1: True, step2: True, step3: True})
+>>> evaluation = bounded.evaluate(steps[10], max_steps=7)
+>>> evaluation.outcome, evaluation.steps, evaluation.path
+(True, 7, [])
+
+The acceptability of a proposition on a cycle of arguments depends on
+itself, so it is left undecided however large the budget.
+
+>>> (ping, pong, serve) = (PropLiteral('ping'), PropLiteral('pong'),
+...                        PropLiteral('serve'))
+>>> rally = ArgumentSet()
+>>> rally.add_arguments([(Argument(ping, premises={pong}), None),
+...                      (Argument(pong, premises={ping, serve}), None)])
+>>> looping = CAES(rally, Audience({serve}, {}), ProofStandard([]))
+>>> evaluation = looping.evaluate(ping, max_steps=80)
+>>> evaluation.outcome, evaluation.path
+(UNDECIDED, [ping, pong, ping])
+>>> looping.evaluate(pong, timeout=10).path
+[pong, ping, pong]
+>>> looping.acceptable_many([pong])
+Traceback (most recent call last):
+  ...
+ValueError: The acceptability of proposition 'pong' depends on a cycle of arguments
+
+So is a proposition at the end of a chain of arguments too long to follow
+without overflowing the stack.
+
+>>> far = [PropLiteral('far{}'.format(k)) for k in range(5001)]
+>>> deep = ArgumentSet()
+>>> deep.add_arguments((Argument(far[k + 1], premises={far[k]}), None)
+...                    for k in range(5000))
+>>> deeper = CAES(deep, Audience({far[0]}, {}), ProofStandard([]))
+>>> evaluation = deeper.evaluate(far[5000], max_steps=10000)
+>>> evaluation.outcome, evaluation.path[:2]
+(UNDECIDED, [far5000, far4999])
+
+Evaluation in threads
++++++++++++++++++++++
+
+Threads sharing a CAES agree with a CAES evaluated in a single thread, even
+when they race to evaluate the same propositions.
+
+>>> import random
+>>> rng = random.Random(0)
+>>> props = [PropLiteral('q{}'.format(k)) for k in range(40)]
+>>> web = ArgumentSet()
+>>> for k in range(1, 40):
+...     for _ in range(2):
+...         earlier = rng.sample(props[:k], min(k, 2))
+...         conclusion = props[k] if rng.random() < 0.7 else props[k].negate()
+...         web.add_argument(Argument(conclusion, premises={earlier[0]},
+...                                   exceptions=set(earlier[1:])))
+>>> for p in list(web.propset()):
+...     v = web.add_proposition(p.negate())
+>>> weights = {arg.arg_id: rng.random() for arg in web.arguments}
+>>> audience = Audience({props[0]}, weights)
+>>> standards = ProofStandard([(p, 'preponderance') for p in props[::3]])
+>>> queries = sorted(web.propset())
+>>> expected = CAES(web, audience, standards).acceptable_many(queries)
+>>> all(CAES(web, audience, standards).evaluate_threaded(queries * 4,
+...                                                      workers=8) == expected
+...     for _ in range(20))
+True
+
+Compiled plans
+++++++++++++++
+
+A plan compiled from the argument set and proof standards can be evaluated
+for one audience after another.
+
+>>> plan = CAES.compile(web, standards)
+>>> plan.evaluate(audience) == expected
+True
+>>> sceptic = Audience({props[0], props[1].negate()}, weights)
+>>> labels = CAES(web, sceptic, standards, alpha=0.3).acceptable_many(queries)
+>>> plan.evaluate(sceptic, alpha=0.3) == labels
+True
+
+A labelling can be written out from the acceptability decided by a plan,
+without evaluating the propositions again.
+
+>>> planned = CAES(web, sceptic, standards, alpha=0.3)
+>>> labelling = list(planned.labelling_from(plan.evaluate(sceptic, alpha=0.3),
+...                                         queries))
+>>> labelling == list(CAES(web, sceptic, standards,
+...                        alpha=0.3).iter_labelling(queries))
+True
+>>> len(planned.decided)
+0
+
+Plans can be pickled, to be evaluated in another process.
+
+>>> import pickle
+>>> copied = pickle.loads(pickle.dumps(plan))
+>>> copied.evaluate(sceptic) == plan.evaluate(sceptic)
+True
+
+An argument set in which a proposition depends on itself cannot be compiled.
+
+>>> cyclic = ArgumentSet()
+>>> cyclic.add_argument(Argument(kill, premises={murder}))
+>>> cyclic.add_argument(Argument(murder, premises={kill}))
+>>> CAES.compile(cyclic, ps)
+Traceback (most recent call last):
+  ...
+ValueError: The acceptability of proposition 'kill' depends on a cycle of arguments
+
+Summarising large graphs
+++++++++++++++++++++++++
+
+For drawing, a chain of arguments is collapsed into one vertex, and so is a
+cycle.
+
+>>> summary = chain.summary_graph()
+>>> chain.graph.vcount(), summary.vcount()
+(31, 13)
+>>> [label for (kind, label) in zip(summary.vs['kind'], summary.vs['label'])
+...  if kind == 'chain']
+['arg10 .. arg1 (19)']
+>>> cyclic.add_argument(Argument(intent, premises={kill}))
+>>> summary = cyclic.summary_graph()
+>>> for (kind, label) in zip(summary.vs['kind'], summary.vs['label']):
+...     print(kind, label)
+cycle arg1 (+3 in cycle)
+prop -kill
+prop -murder
+arg arg3
+prop intent
+prop -intent
+>>> summary.get_edgelist()
+[(3, 0), (4, 3)]
+
+The summary can be limited to the vertices nearest to a proposition; the
+``hidden`` attribute counts the neighbours which are left out.
+
+>>> summary = cyclic.summary_graph(root=intent, max_vertices=2)
+>>> summary.vs['label'], summary.vs['hidden']
+(['arg3', 'intent'], [1, 0])
+
+The layouts of the summaries drawn most recently are kept, so that they can
+be reused after a small edit.
+
+>>> for size in range(1, LAYOUTS_MAX + 5):
+...     summary = chain.summary_graph(max_vertices=size)
+...     layout = chain._summary_layout(summary, (None, size))
+>>> len(chain._layouts)
+16
+
+Differences between versions
+++++++++++++++++++++++++++++
+
+Tomorrow, the argument for `murder` needs `intent` as well as `kill`, and
+the argument for `intent` no longer has an exception.
+
+>>> yesterday = ArgumentSet()
+>>> yesterday.add_argument(Argument(murder, premises={kill}), 'm')
+>>> yesterday.add_argument(Argument(intent, premises={witness1},
+...                                 exceptions={unreliable1}), 'i')
+>>> yesterday.add_argument(Argument(kill, premises={witness2}), 'k')
+>>> today = yesterday.fork()
+>>> old = today.replace_argument('m', Argument(murder, premises={kill, intent}))
+>>> old = today.replace_argument('i', Argument(intent, premises={witness1}))
+>>> today.add_argument(Argument(unreliable1, premises={witness2}), 'u')
+>>> delta = diff(yesterday, today)
+
+Arguments are matched by their content, so the changed arguments are removed
+and added again.
+
+>>> [arg.arg_id for arg in delta.added], [arg.arg_id for arg in delta.removed]
+(['m', 'i', 'u'], ['m', 'i'])
+>>> for arg in delta.removed + delta.added:
+...     print(arg)
+[kill], ~[] => murder
+[witness1], ~[unreliable1] => intent
+[intent, kill], ~[] => murder
+[witness1], ~[] => intent
+[witness2], ~[] => unreliable1
+>>> delta.modified
+[]
+
+An argument which keeps its content under another ID is modified, since it
+may be weighed differently.
+
+>>> renamed = yesterday.fork()
+>>> old = renamed.remove_argument('k')
+>>> renamed.add_argument(Argument(kill, premises={witness2}), 'k2')
+>>> moved = diff(yesterday, renamed)
+>>> moved.added, moved.removed
+([], [])
+>>> [(before.arg_id, after.arg_id) for (before, after) in moved.modified]
+[('k', 'k2')]
+
+Only the propositions which may be affected are evaluated again.
+
+>>> weights = {'m': 0.6, 'i': 0.6, 'k': 0.6, 'u': 0.6}
+>>> audience = Audience({witness2}, weights)
+>>> before = CAES(yesterday, audience, ProofStandard([]))
+>>> sorted(before.acceptable_many([murder, kill, intent, unreliable1]).items())
+[(intent, False), (kill, True), (murder, True), (unreliable1, False)]
+>>> after = CAES(today, audience, ProofStandard([]))
+>>> after.relabel(before, delta)
+{murder: False, unreliable1: True}
+>>> kill in after._labels, after.acceptable(intent)
+(True, False)
+
+Labels can only be taken over from a CAES with the same audience and the
+same proof standards.
+
+>>> other = CAES(today, Audience({witness1}, weights), ProofStandard([]))
+>>> other.relabel(before, delta)
+Traceback (most recent call last):
+...
+ValueError: The older CAES has other assumptions
+>>> stricter = ProofStandard([(murder, 'clear_and_convincing')])
+>>> other = CAES(today, audience, stricter)
+>>> other.relabel(before, delta)
+Traceback (most recent call last):
+...
+ValueError: The older CAES has other proof standards
+
+Minimal assumption sets
++++++++++++++++++++++++
+
+Which of the facts assumed by an audience are needed for `murder` to be
+acceptable? Each set found is minimal: no smaller set of the assumptions
+would do, and the smallest sets come first.
+
+>>> case = ArgumentSet()
+>>> case.add_argument(Argument(murder, premises={kill, intent}), 'm')
+>>> case.add_argument(Argument(kill, premises={witness1}), 'k1')
+>>> case.add_argument(Argument(kill, premises={witness2}), 'k2')
+>>> case.add_argument(Argument(intent, premises={witness1},
+...                            exceptions={unreliable1}), 'i')
+>>> weights = {'m': 0.6, 'k1': 0.6, 'k2': 0.6, 'i': 0.6}
+>>> audience = Audience({witness1, witness2, unreliable1, intent}, weights)
+>>> jury = CAES(case, audience, ProofStandard([]))
+>>> found = jury.minimal_assumptions(murder)
+>>> [sorted(s) for s in found.sets], found.complete
+([[witness1], [intent, witness2]], True)
+
+The sets which make a proposition unacceptable can be found as well, and the
+search can be limited in the number of sets and the time it takes.
+
+>>> [sorted(s) for s in jury.minimal_assumptions(intent, False).sets]
+[[]]
+>>> found = jury.minimal_assumptions(murder, limit=1)
+>>> [sorted(s) for s in found.sets], found.complete
+([[witness1]], False)
+
+Weights on demand
++++++++++++++++++
+
+When weights are expensive to compute, the audience can be given a
+:class:`WeightProvider`, which only scores the arguments that turn out to be
+applicable, a batch at a time, and remembers the results.
+
+>>> requests = []
+>>> def score(arg_ids):
+...     requests.append(sorted(arg_ids))
+...     return {arg_id: 0.6 for arg_id in arg_ids}
+>>> provider = WeightProvider(score)
+>>> lazy = CAES(case, Audience({witness1, witness2}, provider),
+...             ProofStandard([(kill, 'preponderance')]))
+>>> lazy.acceptable_many([murder, kill])
+{kill: True, murder: True}
+>>> requests
+[['k1', 'k2']]
+>>> lazy.acceptable_many([murder, kill])
+{murder: True, kill: True}
+>>> len(requests), sorted(provider)
+(1, ['k1', 'k2'])
+
+The arguments pro and con a proposition are scored in the same batch, and
+the scoring function may itself look up weights.
+
+>>> alibi = case.fork()
+>>> alibi.add_argument(Argument(kill.negate(), premises={witness2}), 'a')
+>>> requests = []
+>>> def score(arg_ids):
+...     requests.append(sorted(arg_ids))
+...     if arg_ids == ['default']:
+...         return {'default': 0.6}
+...     return {arg_id: provider['default'] for arg_id in arg_ids}
+>>> provider = WeightProvider(score)
+>>> lazy = CAES(alibi, Audience({witness1, witness2}, provider),
+...             ProofStandard([(kill, 'preponderance')]))
+>>> lazy.acceptable(kill)
+False
+>>> requests
+[['a', 'k1', 'k2'], ['default']]
+
+A coroutine function can be used for scoring instead.
+
+>>> import asyncio
+>>> async def score_async(arg_ids):
+...     return {arg_id: 0.6 for arg_id in arg_ids}
+>>> async def ask():
+...     provider = AsyncWeightProvider(score_async)
+...     audience = Audience({witness1, witness2}, provider)
+...     caes = CAES(case, audience, ProofStandard([(kill, 'preponderance')]))
+...     return await caes.acceptable_async([murder])
+>>> asyncio.run(ask())
+{murder: True}
+
+Argument schemes
+++++++++++++++++
+
+A rule such as "a witness who is not unreliable gives testimony" can be
+added once as an argument scheme, whose propositions contain variables.
+Instances of the scheme are only added to the graph when a proposition that
+matches its conclusion is evaluated.
+
+>>> court = ArgumentSet()
+>>> court.add_scheme(Argument(PropLiteral('testimony(?x)'),
+...                           premises={PropLiteral('witness(?x)')},
+...                           exceptions={PropLiteral('unreliable(?x)')}),
+...                  'testimony')
+>>> court.add_scheme(Argument(PropLiteral('corroborated(?x)'),
+...                           premises={PropLiteral('testimony(?x)'),
+...                                     PropLiteral('agrees(?x, ?y)'),
+...                                     PropLiteral('testimony(?y)')}),
+...                  'corroboration')
+>>> facts = {PropLiteral('witness(ann)'), PropLiteral('witness(bob)'),
+...          PropLiteral('witness(cat)'), PropLiteral('unreliable(cat)'),
+...          PropLiteral('agrees(ann, bob)'), PropLiteral('agrees(ann, cat)')}
+>>> judge = CAES(court, Audience(facts, {'testimony': 0.6,
+...                                      'corroboration': 0.7}),
+...              ProofStandard([]))
+>>> judge.acceptable(PropLiteral('corroborated(ann)'))
+True
+
+The variable ``?y``, which is not in the conclusion, is bound by the facts
+assumed by the audience, and only the instances needed are grounded.
+
+>>> judge.acceptable(PropLiteral('testimony(cat)'))
+False
+
+The instances are kept by the CAES, and the argument set itself is left
+unchanged, unless they are added to it explicitly with ``ground``.
+
+>>> court.arguments
+()
+>>> court.ground(PropLiteral('testimony(bob)'), facts)
+['testimony[?x=bob]']
+>>> court.scheme_of('testimony[?x=bob]')
+'testimony'
 """
 
 if __name__ == '__main__':
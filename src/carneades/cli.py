@@ -0,0 +1,342 @@
+# Carneades Argument Evaluation Structure
+#
+# Copyright (C) 2014 Ewan Klein
+# Author: Ewan Klein <ewan@inf.ed.ac.uk>
+#
+# For license information, see LICENSE
+
+"""
+Batch evaluation of argument sets from the command line, which is run as
+``python -m carneades``; ``python -m carneades --help`` lists the options.
+
+An argument set is read from an AIF JSON file (see :mod:`carneades.aif`),
+or from a database made by :class:`~carneades.sqlstore.SQLiteArgumentSet`
+if its name ends in ``.db``, ``.sqlite`` or ``.sqlite3``. An audience is a
+JSON object with a list of ``assumptions`` and an object of ``weights`` by
+argument ID, and proof standards are a JSON object from propositions to the
+names of their standards. A negative proposition is written with a leading
+``-``. The labelling is written as by
+:func:`~carneades.caes.write_labelling_csv` or
+:func:`~carneades.caes.write_labelling_jsonl`, with a further ``audience``
+field if there is more than one audience.
+
+>>> import json, os, tempfile
+>>> tmp = tempfile.mkdtemp()
+>>> def save(name, value):
+...     path = os.path.join(tmp, name)
+...     with open(path, 'w') as f:
+...         json.dump(value, f)
+...     return path
+>>> case = save('case.json', {
+...     'nodes': [{'nodeID': '1', 'text': 'kill', 'type': 'I'},
+...               {'nodeID': '2', 'text': 'intent', 'type': 'I'},
+...               {'nodeID': '3', 'text': 'murder', 'type': 'I'},
+...               {'nodeID': 'arg1', 'text': 'arg1', 'type': 'RA'}],
+...     'edges': [{'edgeID': '1', 'fromID': '1', 'toID': 'arg1'},
+...               {'edgeID': '2', 'fromID': '2', 'toID': 'arg1'},
+...               {'edgeID': '3', 'fromID': 'arg1', 'toID': '3'}]})
+>>> jury = save('jury.json', {'assumptions': ['kill', 'intent'],
+...                           'weights': {'arg1': 0.8}})
+>>> standards = save('standards.json', {'murder': 'clear_and_convincing'})
+>>> main([case, '--audience', jury, '--standards', standards,
+...       '--proposition', 'murder', '--engine', 'iterative'])
+... # doctest: +NORMALIZE_WHITESPACE
+proposition,standard,acceptable,max_pro,max_con,pro_args,con_args
+murder,clear_and_convincing,True,0.8,0.0,arg1,
+0
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+import time
+
+# fix to ensure that package is loaded properly on system path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from carneades.aif import read_aif
+from carneades.caes import (CAES, LABEL_FIELDS, Audience, ProofStandard,
+                            _parse, write_labelling_csv,
+                            write_labelling_jsonl)
+from carneades.sqlstore import SQLiteArgumentSet
+from carneades.tracecalls import TraceCalls
+
+
+ENGINES = ('recursive', 'iterative', 'vectorized')
+"""
+The engines which can evaluate an argument set:
+
+- ``recursive``, :meth:`~carneades.caes.CAES.acceptable`, which only visits\
+the propositions on which those evaluated depend;
+- ``iterative``, :meth:`~carneades.caes.EvaluationPlan.evaluate`, which\
+evaluates every proposition in turn without recursion;
+- ``vectorized``, :meth:`~carneades.caes.EvaluationPlan.evaluate_many`,\
+which evaluates all the audiences at once.
+"""
+
+DATABASE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+
+def load_argset(path):
+    """
+    Load an argument set from an AIF JSON file or an SQLite database.
+
+    :param path: The name of the file.
+    :type path: str
+    :raises ValueError: if the file does not exist.
+    """
+    if not os.path.exists(path):
+        raise ValueError("No such file: '{}'".format(path))
+    if os.path.splitext(path)[1] in DATABASE_EXTENSIONS:
+        return SQLiteArgumentSet(path)
+    with open(path) as f:
+        return read_aif(f)
+
+
+def load_audience(path):
+    """
+    Load an audience from a JSON file.
+
+    :param path: The name of the file.
+    :type path: str
+    :rtype: :class:`~carneades.caes.Audience`
+    """
+    with open(path) as f:
+        record = json.load(f)
+    return Audience({_parse(p) for p in record.get('assumptions', [])},
+                    dict(record.get('weights', {})))
+
+
+def load_proofstandard(path=None, default='scintilla'):
+    """
+    Load proof standards from a JSON file.
+
+    :param path: The name of the file, or :class:`None` to give every\
+    proposition the default standard.
+    :type path: str or None
+    :param default: The standard of propositions not in the file.
+    :type default: str
+    :rtype: :class:`~carneades.caes.ProofStandard`
+    """
+    standards = {}
+    if path is not None:
+        with open(path) as f:
+            standards = json.load(f)
+    return ProofStandard([(_parse(p), standard)
+                          for (p, standard) in standards.items()],
+                         default=default)
+
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        prog='carneades',
+        description='Evaluate the propositions of an argument set for one or '
+        'more audiences, and write out their labelling.')
+    parser.add_argument('argset', help='an AIF JSON file, or an SQLite '
+                        'database ending in {}'.format(
+                            ', '.join(DATABASE_EXTENSIONS)))
+    parser.add_argument('-a', '--audience', action='append', required=True,
+                        help='a JSON file of assumptions and weights; may be '
+                        'given more than once')
+    parser.add_argument('-s', '--standards',
+                        help='a JSON file of proof standards by proposition')
+    parser.add_argument('--default-standard', default='scintilla',
+                        help='the proof standard of other propositions '
+                        '(default: %(default)s)')
+    parser.add_argument('-p', '--proposition', action='append', default=[],
+                        help='a proposition to evaluate; may be given more '
+                        'than once (default: all)')
+    parser.add_argument('--propositions', metavar='FILE',
+                        help='a file of propositions to evaluate, one a line')
+    parser.add_argument('-o', '--output',
+                        help='the file for the labelling (default: stdout)')
+    parser.add_argument('-f', '--format', choices=('csv', 'jsonl'),
+                        default='csv', help='(default: %(default)s)')
+    parser.add_argument('-e', '--engine', choices=ENGINES, default='recursive',
+                        help='(default: %(default)s)')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help='threads for evaluating propositions with the '
+                        'recursive engine, or audiences with the others '
+                        '(default: %(default)s)')
+    parser.add_argument('--alpha', type=float, default=0.4)
+    parser.add_argument('--beta', type=float, default=0.3)
+    parser.add_argument('--gamma', type=float, default=0.2)
+    parser.add_argument('--profile', nargs='?', const='cprofile',
+                        choices=('cprofile', 'counters'),
+                        help='report where evaluation spends its time, with '
+                        'cProfile (the default) or with counts of the work '
+                        'done, on stderr')
+    parser.add_argument('--timing', action='store_true',
+                        help='report the time taken by each stage on stderr')
+    parser.add_argument('--trace', action='store_true',
+                        help='trace the calls of the recursive engine')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='log debugging messages')
+    return parser
+
+
+def _chunks(items, n):
+    return [chunk for chunk in (items[i::n] for i in range(n)) if chunk]
+
+
+def _evaluate(args, argset, audiences, standards, propositions, counters):
+    """
+    Evaluate the propositions for each audience with the chosen engine.
+
+    :return: A CAES for each audience, and the acceptability decided for it,\
+    which holds that of the propositions.
+    """
+    params = dict(alpha=args.alpha, beta=args.beta, gamma=args.gamma)
+    caeses = [CAES(argset, audience, standards, **params)
+              for audience in audiences]
+    workers = max(1, args.workers)
+    if args.engine == 'recursive':
+        labellings = []
+        for caes in caeses:
+            if workers > 1:
+                labellings.append(caes.evaluate_threaded(propositions,
+                                                         workers))
+            else:
+                labellings.append(caes.acceptable_many(propositions))
+        counters['propositions visited'] = sum(len(caes.decided)
+                                               for caes in caeses)
+        return (caeses, labellings)
+
+    plan = CAES.compile(argset, standards)
+    counters['plan propositions'] = len(plan.propositions)
+    counters['plan arguments'] = len(plan.arg_ids)
+    counters['plan levels'] = len(plan.levels())
+    if args.engine == 'iterative':
+        def run(chunk):
+            return [plan.evaluate(audience, **params) for audience in chunk]
+    else:
+        def run(chunk):
+            return plan.evaluate_many(chunk, **params)
+    labellings = [None] * len(audiences)
+    order = _chunks(list(range(len(audiences))), workers)
+    with ThreadPoolExecutor(max_workers=len(order)) as pool:
+        results = pool.map(run, [[audiences[n] for n in chunk]
+                                 for chunk in order])
+        for (chunk, labels) in zip(order, results):
+            for (n, acceptability) in zip(chunk, labels):
+                labellings[n] = acceptability
+    return (caeses, labellings)
+
+
+def _write(args, names, caeses, labellings, propositions, f):
+    """
+    Write the labelling for each audience, from the acceptability decided
+    for it.
+    """
+    if len(caeses) == 1:
+        writer = write_labelling_jsonl if args.format == 'jsonl' else \
+            write_labelling_csv
+        writer(caeses[0].labelling_from(labellings[0], propositions), f)
+        return
+    buffers = []
+    for (name, caes, acceptability) in zip(names, caeses, labellings):
+        labelling = caes.labelling_from(acceptability, propositions)
+        buf = io.StringIO()
+        if args.format == 'jsonl':
+            write_labelling_jsonl(labelling, buf)
+            for line in buf.getvalue().splitlines():
+                record = {'audience': name}
+                record.update(json.loads(line))
+                f.write(json.dumps(record) + '\n')
+        else:
+            write_labelling_csv(labelling, buf)
+            buffers.append((name, buf.getvalue().splitlines()[1:]))
+    if args.format == 'csv':
+        f.write(','.join(['audience'] + LABEL_FIELDS) + '\r\n')
+        for (name, lines) in buffers:
+            for line in lines:
+                f.write('{},{}\r\n'.format(name, line))
+
+
+def main(argv=None):
+    """
+    Run the command-line evaluator.
+
+    :param argv: The command-line arguments, after the name of the program;\
+    by default, those of the process.
+    :type argv: list(str) or None
+    :return: The exit status.
+    :rtype: int
+    """
+    parser = _parser()
+    args = parser.parse_args(argv)
+    root = logging.getLogger()
+    (level, enabled) = (root.level, TraceCalls.enabled)
+    root.setLevel(logging.DEBUG if args.verbose else logging.WARNING)
+    TraceCalls.enabled = args.trace
+    try:
+        return _run(args)
+    except (OSError, ValueError) as e:
+        sys.stderr.write('carneades: error: {}\n'.format(e))
+        return 1
+    finally:
+        root.setLevel(level)
+        TraceCalls.enabled = enabled
+
+
+def _run(args):
+    timings = []
+    counters = {}
+    start = time.perf_counter()
+    argset = load_argset(args.argset)
+    audiences = [load_audience(path) for path in args.audience]
+    names = [os.path.splitext(os.path.basename(path))[0]
+             for path in args.audience]
+    standards = load_proofstandard(args.standards, args.default_standard)
+    propositions = [_parse(p) for p in args.proposition]
+    if args.propositions:
+        with open(args.propositions) as f:
+            propositions.extend(_parse(line.strip()) for line in f
+                                if line.strip())
+    if not propositions:
+        propositions = list(argset.iter_propositions())
+    timings.append(('load', time.perf_counter() - start))
+
+    start = time.perf_counter()
+    profiler = cProfile.Profile() if args.profile == 'cprofile' else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        (caeses, labellings) = _evaluate(args, argset, audiences, standards,
+                                         propositions, counters)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+    timings.append(('evaluate', time.perf_counter() - start))
+
+    start = time.perf_counter()
+    if args.output:
+        with open(args.output, 'w', newline='') as f:
+            _write(args, names, caeses, labellings, propositions, f)
+    else:
+        _write(args, names, caeses, labellings, propositions, sys.stdout)
+    timings.append(('write', time.perf_counter() - start))
+
+    if profiler is not None:
+        stats = pstats.Stats(profiler, stream=sys.stderr)
+        stats.sort_stats('cumulative').print_stats(25)
+    elif args.profile == 'counters':
+        counters['audiences'] = len(audiences)
+        counters['propositions'] = len(propositions)
+        counters['acceptable'] = sum(acceptability.get(p, False)
+                                     for acceptability in labellings
+                                     for p in propositions)
+        for (name, value) in counters.items():
+            sys.stderr.write('{}: {}\n'.format(name, value))
+    if args.timing:
+        for (stage, seconds) in timings:
+            sys.stderr.write('{}: {:.3f}s\n'.format(stage, seconds))
+        sys.stderr.write('total: {:.3f}s\n'.format(
+            sum(seconds for (_, seconds) in timings)))
+    return 0
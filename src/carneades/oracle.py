@@ -0,0 +1,375 @@
+# Carneades Argument Evaluation Structure
+#
+# Copyright (C) 2014 Ewan Klein
+# Author: Ewan Klein <ewan@inf.ed.ac.uk>
+#
+# For license information, see LICENSE
+
+"""
+Cross-checking of faster ways of evaluating a CAES against the reference
+evaluator, :meth:`~carneades.caes.CAES.acceptable`.
+
+An *engine* is a function which takes an argument set, an audience and
+proof standards, and returns a function from propositions to their
+acceptability. :func:`reference_engine` is the reference evaluator itself,
+and :func:`compiled_engine` evaluates a
+:class:`~carneades.caes.EvaluationPlan`.
+
+An :class:`Oracle` answers queries with an engine, but checks a random
+sample of the answers against the reference evaluator. A disagreement is
+logged together with the smallest set of arguments found to reproduce it.
+
+>>> import random
+>>> from carneades.caes import (Argument, ArgumentSet, Audience,
+...                             ProofStandard, PropLiteral)
+>>> argset = ArgumentSet()
+>>> (kill, intent, murder) = (PropLiteral('kill'), PropLiteral('intent'),
+...                           PropLiteral('murder'))
+>>> (witness, unreliable) = (PropLiteral('witness'), PropLiteral('unreliable'))
+>>> argset.add_argument(Argument(murder, premises={kill, intent}), 'arg1')
+>>> argset.add_argument(Argument(intent, premises={witness},
+...                              exceptions={unreliable}), 'arg2')
+>>> argset.add_argument(Argument(unreliable, premises={kill}), 'arg3')
+>>> audience = Audience({kill, witness}, {'arg1': 0.8, 'arg2': 0.6,
+...                                       'arg3': 0.5})
+>>> oracle = Oracle(argset, audience, ProofStandard([]), compiled_engine,
+...                 rate=1.0)
+>>> oracle.acceptable(murder), oracle.checked, oracle.disagreements
+(False, 1, [])
+
+An engine which ignores exceptions is caught out, and the disagreement is
+reduced to the arguments which are needed to show it.
+
+>>> def careless_engine(argset, audience, proofstandard):
+...     bare = ArgumentSet()
+...     for argument in argset.arguments:
+...         bare.add_argument(Argument(argument.conclusion, argument.premises),
+...                           argument.arg_id)
+...     for p in argset.propset():
+...         bare.add_proposition(p)
+...     return compiled_engine(bare, audience, proofstandard)
+>>> oracle = Oracle(argset, audience, ProofStandard([]), careless_engine,
+...                 rate=1.0)
+>>> oracle.acceptable(murder)
+True
+>>> [d] = oracle.disagreements
+>>> (d.proposition, d.outcome, d.expected)
+(murder, True, False)
+>>> for argument in d.arguments:
+...     print(argument.arg_id, argument)
+arg1 [intent, kill], ~[] => murder
+arg2 [witness], ~[unreliable] => intent
+arg3 [kill], ~[] => unreliable
+
+:func:`check_engine` compares an engine with the reference evaluator on
+every proposition of a series of random cases, made by :func:`random_case`.
+
+>>> check_engine(compiled_engine, cases=25, rng=random.Random(0))
+[]
+>>> len(check_engine(careless_engine, cases=25, rng=random.Random(0))) > 0
+True
+"""
+
+from collections import namedtuple
+import logging
+import os
+import random
+import sys
+import threading
+
+# fix to ensure that package is loaded properly on system path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from carneades.caes import (Argument, ArgumentSet, Audience, CAES,
+                            ProofStandard, PropLiteral, UNDECIDED)
+
+
+Disagreement = namedtuple('Disagreement', ['proposition', 'outcome',
+                                           'expected', 'arguments',
+                                           'assumptions'])
+"""
+A proposition on whose acceptability an engine disagrees with the
+reference evaluator.
+
+:param proposition: The proposition.
+:param outcome: The acceptability according to the engine.
+:param expected: The acceptability according to the reference evaluator.
+:param arguments: A minimal list of arguments on which the two disagree.
+:param assumptions: The assumptions of the audience which bear on the\
+arguments.
+"""
+
+
+def reference_engine(argset, audience, proofstandard):
+    """
+    The reference evaluator, :meth:`~carneades.caes.CAES.acceptable`.
+    """
+    return CAES(argset, audience, proofstandard).acceptable
+
+
+def compiled_engine(argset, audience, proofstandard):
+    """
+    Evaluate a compiled :class:`~carneades.caes.EvaluationPlan` for the
+    audience once, and look up the acceptability of each proposition.
+    """
+    labels = CAES.compile(argset, proofstandard).evaluate(audience)
+    return labels.__getitem__
+
+
+def _cone(argset, proposition):
+    """
+    The arguments on which the acceptability of a proposition may depend,
+    in order of discovery.
+    """
+    seen = set()
+    arguments = []
+    stack = [proposition]
+    while stack:
+        p = stack.pop()
+        for q in (p, p.negate()):
+            if q in seen:
+                continue
+            seen.add(q)
+            try:
+                found = argset.get_arguments(q)
+            except ValueError:
+                continue
+            for argument in found:
+                arguments.append(argument)
+                stack.extend(argument.premises | argument.exceptions)
+    return arguments
+
+
+class Oracle(object):
+    """
+    Answer queries with an engine, while checking a random sample of the
+    answers against the reference evaluator.
+
+    The engine is built once, from the argument set as it is when the
+    oracle is created. The reference evaluator keeps its own cache of
+    acceptability, so that the cost of the checks falls as they go on;
+    each check can further be limited to a number of steps or a time, as in
+    :meth:`~carneades.caes.CAES.evaluate`, and is skipped if it runs out.
+    """
+    def __init__(self, argset, audience, proofstandard, engine, rate=0.01,
+                 max_steps=None, timeout=None, rng=None):
+        """
+        :param argset: The argument set.
+        :param audience: The audience.
+        :param proofstandard: The proof standards.
+        :param engine: The engine to check.
+        :param rate: The fraction of queries to check.
+        :type rate: float in interval [0, 1]
+        :param max_steps: The maximum number of steps for a check.
+        :type max_steps: int or None
+        :param timeout: The maximum time for a check, in seconds.
+        :type timeout: float or None
+        :param rng: The source of randomness for sampling.
+        :type rng: :class:`random.Random` or None
+        """
+        self.argset = argset
+        self.audience = audience
+        self.proofstandard = proofstandard
+        self.engine = engine
+        self.rate = rate
+        self.max_steps = max_steps
+        self.timeout = timeout
+        self.rng = random.Random() if rng is None else rng
+        self.checked = 0
+        self.skipped = 0
+        self.disagreements = []
+        self._fast = engine(argset, audience, proofstandard)
+        self._reference = CAES(argset, audience, proofstandard)
+        self._lock = threading.Lock()
+
+    def acceptable(self, proposition):
+        """
+        Determine the acceptability of a proposition with the engine, and
+        check it against the reference evaluator if it is sampled.
+
+        :param proposition: The proposition.
+        :type proposition: :class:`~carneades.caes.PropLiteral`
+        :rtype: bool
+        """
+        outcome = self._fast(proposition)
+        with self._lock:
+            sampled = self.rng.random() < self.rate
+        if sampled:
+            self.check(proposition, outcome)
+        return outcome
+
+    def check(self, proposition, outcome):
+        """
+        Check the acceptability of a proposition according to the engine
+        against the reference evaluator, and record any disagreement.
+
+        :param proposition: The proposition.
+        :type proposition: :class:`~carneades.caes.PropLiteral`
+        :param outcome: The acceptability according to the engine.
+        :type outcome: bool
+        :return: The disagreement, if there is one.
+        :rtype: :class:`Disagreement` or None
+        """
+        try:
+            expected = self._reference.evaluate(
+                proposition, self.max_steps, self.timeout).outcome
+        except ValueError as e:
+            expected = UNDECIDED
+            logging.debug("Reference failed on '{}': {}".format(proposition, e))
+        if expected is UNDECIDED:
+            with self._lock:
+                self.skipped += 1
+            return None
+        with self._lock:
+            self.checked += 1
+        if expected == outcome:
+            return None
+        disagreement = self.reduce(proposition)
+        if disagreement is None:
+            # the engine only disagrees on the whole argument set
+            disagreement = Disagreement(proposition, outcome, expected,
+                                        _cone(self.argset, proposition),
+                                        set(self.audience.assumptions))
+        with self._lock:
+            self.disagreements.append(disagreement)
+        logging.warning("Engine disagrees with the reference on '{}': {} "
+                        "instead of {}; reproduced by {} and assumptions {}".\
+                        format(proposition, outcome, expected,
+                               ['{}: {}'.format(a.arg_id, a)
+                                for a in disagreement.arguments],
+                               sorted(disagreement.assumptions)))
+        return disagreement
+
+    def _outcomes(self, arguments, proposition):
+        """
+        The acceptability of a proposition according to the engine and the
+        reference evaluator, in an argument set made of some arguments, or
+        :class:`None` if either fails.
+        """
+        argset = ArgumentSet()
+        weight = {}
+        for argument in arguments:
+            argset.add_argument(Argument(argument.conclusion,
+                                         set(argument.premises),
+                                         set(argument.exceptions)),
+                                argument.arg_id)
+            try:
+                weight[argument.arg_id] = self._reference.weight_of(argument)
+            except ValueError:
+                pass
+        for p in list(argset.propset()) + [proposition]:
+            argset.add_proposition(p)
+            argset.add_proposition(p.negate())
+        propset = argset.propset()
+        assumptions = {p for p in self.audience.assumptions if p in propset}
+        audience = Audience(assumptions, weight)
+        try:
+            outcome = self.engine(argset, audience,
+                                  self.proofstandard)(proposition)
+            expected = CAES(argset, audience,
+                            self.proofstandard).acceptable(proposition)
+        except (ValueError, KeyError):
+            return None
+        return (outcome, expected, assumptions)
+
+    def reduce(self, proposition):
+        """
+        Find a minimal list of the arguments on which the acceptability of a
+        proposition depends, for which the engine and the reference
+        evaluator disagree.
+
+        Arguments are dropped one at a time, for as long as the two still
+        disagree without them.
+
+        :param proposition: The proposition.
+        :type proposition: :class:`~carneades.caes.PropLiteral`
+        :rtype: :class:`Disagreement` or None
+        """
+        arguments = _cone(self.argset, proposition)
+        result = self._outcomes(arguments, proposition)
+        if result is None or result[0] == result[1]:
+            return None
+        i = 0
+        while i < len(arguments):
+            fewer = arguments[:i] + arguments[i + 1:]
+            trial = self._outcomes(fewer, proposition)
+            if trial is not None and trial[0] != trial[1]:
+                (arguments, result) = (fewer, trial)
+            else:
+                i += 1
+        (outcome, expected, assumptions) = result
+        arguments.sort(key=lambda argument: argument.arg_id)
+        return Disagreement(proposition, outcome, expected, arguments,
+                            assumptions)
+
+
+def random_case(rng, propositions=12, arguments=18):
+    """
+    Make a random acyclic argument set, with an audience and proof
+    standards.
+
+    Each argument concludes a proposition, or its negation, from premises
+    and exceptions among the propositions that come before it, so that
+    there are no cycles. Every proposition and its negation are in the
+    argument set, and every argument has a weight.
+
+    :param rng: The source of randomness.
+    :type rng: :class:`random.Random`
+    :param propositions: The number of atoms.
+    :type propositions: int
+    :param arguments: The number of arguments.
+    :type arguments: int
+    :rtype: tuple(:class:`~carneades.caes.ArgumentSet`,\
+    :class:`~carneades.caes.Audience`, :class:`~carneades.caes.ProofStandard`)
+    """
+    props = [PropLiteral('p{}'.format(i)) for i in range(propositions)]
+
+    def literals(candidates, most):
+        chosen = rng.sample(candidates, min(len(candidates),
+                                            rng.randrange(most + 1)))
+        return {p if rng.random() < 0.8 else p.negate() for p in chosen}
+
+    argset = ArgumentSet()
+    weight = {}
+    for k in range(1, arguments + 1):
+        i = rng.randrange(1, propositions)
+        conclusion = props[i] if rng.random() < 0.6 else props[i].negate()
+        argset.add_argument(Argument(conclusion, literals(props[:i], 2),
+                                     literals(props[:i], 1)),
+                            'arg{}'.format(k))
+        weight['arg{}'.format(k)] = round(rng.random(), 1)
+    for p in props:
+        argset.add_proposition(p)
+        argset.add_proposition(p.negate())
+    assumptions = literals(props, propositions // 2)
+    standards = ProofStandard([]).proof_standards
+    proofstandard = ProofStandard([(p, rng.choice(standards))
+                                   for p in argset.propset()])
+    return (argset, Audience(assumptions, weight), proofstandard)
+
+
+def check_engine(engine, cases=100, rng=None, **kwargs):
+    """
+    Compare an engine with the reference evaluator on every proposition of
+    a number of random cases.
+
+    :param engine: The engine.
+    :param cases: The number of cases.
+    :type cases: int
+    :param rng: The source of randomness.
+    :type rng: :class:`random.Random` or None
+    :param kwargs: Further arguments for :func:`random_case`.
+    :return: The disagreements found, each reduced to a minimal argument\
+    set.
+    :rtype: list(:class:`Disagreement`)
+    """
+    if rng is None:
+        rng = random.Random()
+    disagreements = []
+    for _ in range(cases):
+        (argset, audience, proofstandard) = random_case(rng, **kwargs)
+        oracle = Oracle(argset, audience, proofstandard, engine, rate=1.0)
+        for proposition in sorted(argset.propset()):
+            oracle.acceptable(proposition)
+        disagreements.extend(oracle.disagreements)
+    return disagreements
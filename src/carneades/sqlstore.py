@@ -0,0 +1,485 @@
+# Carneades Argument Evaluation Structure
+#
+# Copyright (C) 2014 Ewan Klein
+# Author: Ewan Klein <ewan@inf.ed.ac.uk>
+#
+# For license information, see LICENSE
+
+"""
+An argument set kept in an SQLite database, for case bases which are too
+large to be held in memory as an :class:`~carneades.caes.ArgumentSet`.
+
+A :class:`SQLiteArgumentSet` supports the methods of an ``ArgumentSet`` that
+a :class:`~carneades.caes.CAES` relies on, so that it can be evaluated in the
+same way. Propositions are identified in the database by their print string,
+which is what determines equality of :class:`~carneades.caes.PropLiteral`\ s.
+
+The methods supported are those for adding and reading propositions and
+arguments, :meth:`~SQLiteArgumentSet.find_propositions`,
+:meth:`~SQLiteArgumentSet.dependents`, :meth:`~SQLiteArgumentSet.profile`
+and :meth:`~SQLiteArgumentSet.fork`, together with ``merge_weights``. A
+database never merges arguments and holds no argument schemes, and
+arguments cannot be removed from it; nor can it be drawn.
+
+>>> argset = SQLiteArgumentSet()
+>>> kill = PropLiteral('kill')
+>>> intent = PropLiteral('intent')
+>>> murder = PropLiteral('murder')
+>>> witness = PropLiteral('witness')
+>>> unreliable = PropLiteral('unreliable')
+>>> argset.add_arguments([
+...     (Argument(murder, premises={kill, intent}), 'arg1'),
+...     (Argument(intent, premises={witness}, exceptions={unreliable}), 'arg2')])
+>>> for arg in argset.get_arguments(murder):
+...     print(arg.arg_id, arg)
+arg1 [intent, kill], ~[] => murder
+>>> sorted(argset.propset())
+[-intent, -murder, intent, kill, murder, unreliable, witness]
+>>> argset.find_propositions(glob='*i*')
+[intent, -intent, kill, unreliable, witness]
+
+>>> audience = Audience({kill, witness}, {'arg1': 0.8, 'arg2': 0.6})
+>>> caes = CAES(argset, audience, ProofStandard([]))
+>>> caes.acceptable(murder)
+True
+
+A what-if branch evaluates a copy of the database, and a transaction which
+fails leaves both the database and its change log as they were.
+
+>>> branch = caes.fork()
+>>> branch.argset.add_argument(Argument(unreliable), 'arg3')
+>>> branch.acceptable(murder), caes.acceptable(murder)
+(False, True)
+>>> version = argset._version
+>>> argset.add_arguments([(Argument(unreliable), 'arg4'),
+...                       (Argument(kill), 'arg1')])
+Traceback (most recent call last):
+...
+ValueError: Argument 'arg1' is already in the current graph
+>>> argset._version == version, argset.changed_since(version)
+(True, set())
+>>> argset.profile().arguments
+2
+"""
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from fnmatch import fnmatchcase
+import logging
+import os
+import sqlite3
+import sys
+import threading
+
+# fix to ensure that package is loaded properly on system path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from carneades.caes import (Argument, Audience, CAES, ProofStandard,
+                            PropLiteral, _ChangeLog, _atom_prefix, _parse,
+                            _profile)
+from carneades.store import LRUCache
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS proposition (
+    id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS argument (
+    id INTEGER PRIMARY KEY,
+    arg_id TEXT NOT NULL UNIQUE,
+    conclusion INTEGER NOT NULL REFERENCES proposition(id)
+);
+CREATE INDEX IF NOT EXISTS argument_conclusion ON argument(conclusion);
+CREATE TABLE IF NOT EXISTS link (
+    argument INTEGER NOT NULL REFERENCES argument(id),
+    proposition INTEGER NOT NULL REFERENCES proposition(id),
+    exception INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS link_argument ON link(argument);
+CREATE INDEX IF NOT EXISTS link_proposition ON link(proposition);
+"""
+
+
+def _successor(prefix):
+    """
+    The least string which is greater than every string that starts with a
+    prefix, or :class:`None` if there is none.
+    """
+    while prefix and prefix[-1] == chr(0x10ffff):
+        prefix = prefix[:-1]
+    if not prefix:
+        return None
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class SQLiteArgumentSet(_ChangeLog):
+    """
+    An argument set stored in an indexed SQLite database.
+
+    The arguments for the most recently used propositions, and the database
+    IDs of propositions, are kept in bounded in-memory caches.
+
+    The database connection and the caches are guarded by a lock, so that
+    the set may be shared between threads.
+    """
+    def __init__(self, path=':memory:', cache_size=10000, merge_weights=max):
+        """
+        :parameter path: The database file, which is created if it does not\
+        exist.
+        :type path: str
+        :parameter cache_size: The maximum number of propositions for which\
+        arguments are cached, and of cached proposition IDs.
+        :type cache_size: int
+        :parameter merge_weights: A function which combines the weights of\
+        merged arguments, for an :class:`~carneades.caes.EvaluationPlan`\
+        compiled from the database; since a database never merges\
+        arguments, it is never called.
+        :type merge_weights: function from list(float) to float
+        """
+        _ChangeLog.__init__(self)
+        self.merge_weights = merge_weights
+        # a database holds no argument schemes to be grounded
+        self._schemes = {}
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.RLock()
+        self.conn.executescript(SCHEMA)
+        self.arg_count = 1 + self.conn.execute(
+            'SELECT COUNT(*) FROM argument').fetchone()[0]
+        self._prop_ids = LRUCache(cache_size)
+        self._arguments = LRUCache(cache_size)
+        self._batch = False
+
+    def close(self):
+        """
+        Close the database.
+        """
+        self.conn.close()
+
+    @contextmanager
+    def transaction(self):
+        """
+        A context in which updates are committed all at once, or not at all
+        if an exception is raised.
+
+        The change log is rolled back together with the database, so a
+        :class:`~carneades.caes.CAES` should not evaluate the set inside a
+        transaction which may fail.
+        """
+        with self._lock:
+            if self._batch:
+                yield
+                return
+            self._batch = True
+            saved = (self.arg_count, self._version, self._log_base,
+                     len(self._log))
+            try:
+                with self.conn:
+                    yield
+            except Exception:
+                # the caches may include updates which were rolled back
+                self._arguments.clear()
+                self._prop_ids.clear()
+                (self.arg_count, self._version, self._log_base, n) = saved
+                del self._log[n:]
+                raise
+            finally:
+                self._batch = False
+
+    def _prop_id(self, proposition, create=False):
+        """
+        The database ID of a proposition, or :class:`None` if it is not in
+        the database and ``create`` is false.
+        """
+        text = str(proposition)
+        prop_id = self._prop_ids.get(text)
+        if prop_id is None:
+            row = self.conn.execute('SELECT id FROM proposition WHERE text = ?',
+                                    (text,)).fetchone()
+            if row is not None:
+                prop_id = row[0]
+            elif create:
+                prop_id = self.conn.execute(
+                    'INSERT INTO proposition (text) VALUES (?)',
+                    (text,)).lastrowid
+                logging.debug("Added proposition '{}' to database".\
+                              format(proposition))
+            else:
+                return None
+            self._prop_ids.put(text, prop_id)
+        return prop_id
+
+    def propset(self):
+        """
+        The set of :class:`PropLiteral`\ s in the database.
+        """
+        return set(self.iter_propositions())
+
+    def iter_propositions(self):
+        """
+        Iterate over the propositions in the database, in order of addition.
+        """
+        last = 0
+        while True:
+            with self._lock:
+                rows = self.conn.execute(
+                    'SELECT id, text FROM proposition WHERE id > ? '
+                    'ORDER BY id LIMIT 1000', (last,)).fetchall()
+            if not rows:
+                return
+            for (last, text) in rows:
+                yield _parse(text)
+
+    def find_propositions(self, prefix=None, namespace=None, glob=None,
+                          polarity=None):
+        """
+        Find the propositions in the database whose atoms satisfy a query,
+        as :meth:`~carneades.caes.ArgumentSet.find_propositions` does, by a
+        range scan of the index of proposition texts.
+        """
+        start = _atom_prefix(prefix, namespace, glob)
+        if start is None:
+            return []
+        found = []
+        for positive in (True, False):
+            if polarity not in (None, positive):
+                continue
+            text = start if positive else '-' + start
+            query = 'SELECT text FROM proposition WHERE text >= ?'
+            params = [text]
+            upper = _successor(text)
+            if upper is not None:
+                query += ' AND text < ?'
+                params.append(upper)
+            with self._lock:
+                rows = self.conn.execute(query, params).fetchall()
+            for (text,) in rows:
+                proposition = _parse(text)
+                # without a prefix, the range of positive texts includes the
+                # negative ones
+                if proposition.polarity == positive and \
+                        (glob is None or fnmatchcase(proposition._string, glob)):
+                    found.append(proposition)
+        found.sort(key=lambda p: (p._string, not p.polarity))
+        return found
+
+    @property
+    def arguments(self):
+        """
+        Iterate over the arguments in the database, in order of addition.
+        """
+        last = 0
+        while True:
+            with self._lock:
+                rows = self.conn.execute(
+                    'SELECT id FROM argument WHERE id > ? '
+                    'ORDER BY id LIMIT 1000', (last,)).fetchall()
+                if not rows:
+                    return
+                (first, last) = (rows[0][0], rows[-1][0])
+                arguments = self._load('a.id BETWEEN ? AND ?', (first, last))
+            for argument in arguments:
+                yield argument
+
+    def add_proposition(self, proposition):
+        """
+        Add a proposition to the database if it is not already present.
+
+        :param proposition: The proposition to be added.
+        :type proposition: :class:`PropLiteral`
+        :raises TypeError: if the input is not a :class:`PropLiteral`.
+        """
+        if not isinstance(proposition, PropLiteral):
+            raise TypeError('Input {} should be PropLiteral'.\
+                            format(proposition))
+        with self.transaction():
+            self._prop_id(proposition, create=True)
+
+    def add_argument(self, argument, arg_id=None):
+        """
+        Add an argument to the database.
+
+        :parameter argument: The argument to be added.
+        :type argument: :class:`Argument`
+        :parameter arg_id: The ID of the argument
+        :type arg_id: str or None
+        :raises ValueError: if an argument with the same ID is already in\
+        the database.
+        """
+        with self.transaction():
+            self._insert(argument, arg_id)
+
+    def add_arguments(self, arguments):
+        """
+        Add arguments to the database in a single transaction.
+
+        :parameter arguments: Pairs of an argument and its ID, which may be\
+        :class:`None`.
+        :type arguments: iterable(tuple(:class:`Argument`, str))
+        :raises ValueError: if an argument with the same ID as one of the\
+        arguments is already in the database, in which case none of them are\
+        added.
+        """
+        with self.transaction():
+            for (argument, arg_id) in arguments:
+                self._insert(argument, arg_id)
+
+    def _insert(self, argument, arg_id):
+        if arg_id is None:
+            arg_id = 'arg{}'.format(self.arg_count)
+        conclusion = self._prop_id(argument.conclusion, create=True)
+        self._prop_id(argument.conclusion.negate(), create=True)
+        try:
+            row = self.conn.execute(
+                'INSERT INTO argument (arg_id, conclusion) VALUES (?, ?)',
+                (arg_id, conclusion)).lastrowid
+        except sqlite3.IntegrityError:
+            raise ValueError("Argument '{}' is already in the current graph".\
+                             format(arg_id))
+        argument.arg_id = arg_id
+        self.arg_count += 1
+        links = [(row, self._prop_id(p, create=True), 0)
+                 for p in sorted(argument.premises)]
+        links += [(row, self._prop_id(e, create=True), 1)
+                  for e in sorted(argument.exceptions)]
+        self.conn.executemany(
+            'INSERT INTO link (argument, proposition, exception) '
+            'VALUES (?, ?, ?)', links)
+        self._arguments.discard(str(argument.conclusion))
+        self._touch(argument.conclusion)
+
+    def _load(self, condition, parameters):
+        """
+        Load the arguments that satisfy a condition on the ``argument``
+        table, which is aliased as ``a``.
+        """
+        query = ('SELECT a.id, a.arg_id, c.text, p.text, l.exception '
+                 'FROM argument a '
+                 'JOIN proposition c ON c.id = a.conclusion '
+                 'LEFT JOIN link l ON l.argument = a.id '
+                 'LEFT JOIN proposition p ON p.id = l.proposition '
+                 'WHERE ' + condition + ' ORDER BY a.id')
+        arguments = OrderedDict()
+        for (row, arg_id, conclusion, text, exception) in \
+                self.conn.execute(query, parameters):
+            if row not in arguments:
+                argument = Argument(_parse(conclusion))
+                argument.arg_id = arg_id
+                arguments[row] = argument
+            if text is not None:
+                if exception:
+                    arguments[row].exceptions.add(_parse(text))
+                else:
+                    arguments[row].premises.add(_parse(text))
+        return list(arguments.values())
+
+    def get_arguments(self, proposition):
+        """
+        Find the arguments for a proposition in the database.
+
+        :param proposition: The proposition to be checked.
+        :type proposition: :class:`PropLiteral`
+        :return: A list of the arguments pro the proposition
+        :rtype: list(:class:`Argument`)
+
+        :raises ValueError: if the input :class:`PropLiteral` isn't present\
+        in the database.
+        """
+        text = str(proposition)
+        with self._lock:
+            arguments = self._arguments.get(text)
+            if arguments is None:
+                prop_id = self._prop_id(proposition)
+                if prop_id is None:
+                    raise ValueError("Proposition '{}' is not in the current graph".\
+                                     format(proposition))
+                arguments = self._load('a.conclusion = ?', (prop_id,))
+                self._arguments.put(text, arguments)
+        return list(arguments)
+
+    def fork(self):
+        """
+        Take a snapshot of the database, as a new set held in memory.
+
+        Unlike :meth:`~carneades.caes.ArgumentSet.fork`, the snapshot is a
+        full copy, made with the SQLite backup API.
+
+        :rtype: :class:`SQLiteArgumentSet`
+        """
+        with self._lock:
+            branch = SQLiteArgumentSet(cache_size=self._arguments.maxsize,
+                                       merge_weights=self.merge_weights)
+            self.conn.backup(branch.conn)
+            branch.arg_count = self.arg_count
+            branch._version = branch._log_base = self._version
+        return branch
+
+    def profile(self):
+        """
+        Measure the size and shape of the argument set; see
+        :meth:`~carneades.caes.ArgumentSet.profile`.
+
+        The propositions and links are read from the database in order,
+        and only their numbers are held in memory.
+
+        :rtype: :class:`~carneades.caes.GraphProfile`
+        """
+        with self._lock:
+            props = []
+            number = {}
+            for (prop_id, text) in self.conn.execute(
+                    'SELECT id, text FROM proposition ORDER BY id'):
+                number[prop_id] = len(props)
+                props.append(_parse(text))
+            rows = OrderedDict()
+            for (row, conclusion) in self.conn.execute(
+                    'SELECT id, conclusion FROM argument ORDER BY id'):
+                rows[row] = (number[conclusion], [], [])
+            for (row, prop_id, exception) in self.conn.execute(
+                    'SELECT argument, proposition, exception FROM link'):
+                rows[row][2 if exception else 1].append(number[prop_id])
+        index = {p: i for (i, p) in enumerate(props)}
+        negation = {i: index.get(p.negate()) for (i, p) in enumerate(props)}
+        return _profile(props, range(len(props)), negation, rows.values())
+
+    def sources(self, arg_id):
+        """
+        The IDs of the arguments merged into an argument, which is just the
+        argument itself, since arguments are never merged in a database.
+        """
+        return [arg_id]
+
+    def scheme_of(self, arg_id):
+        """
+        The ID of the scheme that an argument is an instance of, which is
+        always :class:`None`, since a database holds no schemes.
+        """
+        return None
+
+    def dependents(self, propositions):
+        """
+        The propositions whose acceptability may depend on the arguments for
+        any of the given propositions; see
+        :meth:`~carneades.caes.ArgumentSet.dependents`.
+
+        :param propositions: The propositions to start from.
+        :type propositions: iterable(:class:`PropLiteral`)
+        :rtype: set(:class:`PropLiteral`)
+        """
+        query = ('SELECT c.text FROM link l '
+                 'JOIN proposition p ON p.id = l.proposition '
+                 'JOIN argument a ON a.id = l.argument '
+                 'JOIN proposition c ON c.id = a.conclusion '
+                 'WHERE p.text = ?')
+        result = set()
+        stack = list(propositions)
+        while stack:
+            prop = stack.pop()
+            for p in (prop, prop.negate()):
+                if p in result:
+                    continue
+                result.add(p)
+                with self._lock:
+                    rows = self.conn.execute(query, (str(p),)).fetchall()
+                stack.extend(_parse(text) for (text,) in rows)
+        return result
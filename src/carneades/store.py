@@ -0,0 +1,904 @@
+# Carneades Argument Evaluation Structure
+#
+# Copyright (C) 2014 Ewan Klein
+# Author: Ewan Klein <ewan@inf.ed.ac.uk>
+#
+# For license information, see LICENSE
+
+"""
+Columnar storage for the arguments of an :class:`~carneades.caes.ArgumentSet`.
+
+Rather than keeping a Python object with two sets for every argument, an
+:class:`ArgumentStore` keeps each field of the arguments in a column of
+machine integers. Propositions are interned in a :class:`PropTable` and
+referred to by number; the premises and exceptions of all arguments are
+concatenated in a single index array, in the manner of the *compressed
+sparse row* format, with each argument recording where its own premises
+and exceptions start and end. The IDs of the arguments are kept in an
+:class:`IdTable`, a single string of bytes with a hash table over it.
+
+>>> props = PropTable()
+>>> [props.intern(p) for p in ['a', 'b', 'a']]
+[0, 1, 0]
+>>> props[1]
+'b'
+
+>>> store = ArgumentStore()
+>>> store.append('arg1', 0, [1], [])
+0
+>>> store.append('arg2', 1, [], [0])
+1
+>>> list(store.premises(0)), list(store.exceptions(1))
+([1], [0])
+>>> list(store.pro_rows(1)), list(store.user_rows(1))
+([1], [0])
+>>> store.kill(store.find('arg1'))
+>>> [store.ids[row] for row in store.rows()], 'arg1' in store
+(['arg2'], False)
+
+A copy of a store shares its columns with the original, and keeps what it
+changes afterwards in an :class:`ArrayOverlay` over each of them; the
+original keeps its plain columns, and only copies one before its first
+change to it.
+
+>>> other = store.copy()
+>>> other.append('arg3', 0, [1], [])
+2
+>>> other.update(1, 0, [], [])
+>>> [other.ids[row] for row in other.pro_rows(0)], list(store.pro_rows(0))
+(['arg3', 'arg2'], [])
+>>> other.conclusion._base is store.conclusion, other.conclusion.size()
+(True, 2)
+>>> store.append('arg4', 1, [], [])
+2
+>>> other.conclusion._base is store.conclusion, list(other.conclusion)
+(False, [0, 0, 0])
+
+An :class:`LRUCache` holds a bounded number of items, discarding the least
+recently used.
+
+>>> cache = LRUCache(2)
+>>> cache.put('a', 1); cache.put('b', 2)
+>>> cache.get('a')
+1
+>>> cache.put('c', 3)
+>>> cache.get('b'), len(cache)
+(None, 2)
+
+A :class:`PrefixIndex` finds numbers by the prefix of a string key, or by a
+glob pattern, without scanning every key.
+
+>>> index = PrefixIndex()
+>>> for (n, key) in enumerate(['case1/kill', 'case2/kill', 'case1/intent']):
+...     index.add(key, n)
+>>> list(index.find('case1/'))
+[('case1/intent', [2]), ('case1/kill', [0])]
+>>> list(index.find('case', '*/kill'))
+[('case1/kill', [0]), ('case2/kill', [1])]
+>>> copied = index.copy()
+>>> copied.add('case1/kill', 3)
+>>> list(copied.find('case1/k')), list(index.find('case1/k'))
+([('case1/kill', [0, 3])], [('case1/kill', [0])])
+"""
+
+from array import array
+import bisect
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from fnmatch import fnmatchcase
+import heapq
+import threading
+
+
+# An overlay keeps the entries which a copy changes or adds, over the array or
+# dict that it shares with the original; it is folded into an array or
+# dict of the owner's own once it holds at least OVERLAY_MIN entries, and more
+# than OVERLAY_RATIO times as many as it shares.
+OVERLAY_MIN = 64
+OVERLAY_RATIO = 0.25
+
+# marks a missing key
+_MISSING = object()
+
+
+class ArrayOverlay(object):
+    """
+    An array, ``bytearray`` or list which shares a base with the object it
+    was copied from, and others, and keeps its own changes to the base, and the items appended to it,
+    apart from the base.
+    """
+    def __init__(self, base):
+        self._base = base
+        self._n = len(base)
+        self._changed = {}
+        self._tail = base[:0]
+
+    def __len__(self):
+        return self._n + len(self._tail)
+
+    def __getitem__(self, i):
+        if i.__class__ is int and 0 <= i < self._n:
+            if self._changed:
+                value = self._changed.get(i, _MISSING)
+                if value is not _MISSING:
+                    return value
+            return self._base[i]
+        if isinstance(i, slice):
+            return self._slice(i)
+        if i < 0:
+            if i + len(self) < 0:
+                raise IndexError(i)
+            return self[i + len(self)]
+        return self._tail[i - self._n]
+
+    def _slice(self, s):
+        (start, stop, step) = s.indices(len(self))
+        n = self._n
+        if step == 1 and start >= n:
+            return self._tail[start - n:stop - n]
+        if step == 1 and stop <= n and not self._changed:
+            return self._base[start:stop]
+        result = self._tail[:0]
+        result.extend(self[i] for i in range(start, stop, step))
+        return result
+
+    def __setitem__(self, i, value):
+        if i < 0:
+            i += len(self)
+        if i >= self._n:
+            self._tail[i - self._n] = value
+        elif 0 <= i:
+            self._changed[i] = value
+        else:
+            raise IndexError(i)
+
+    def __iter__(self):
+        changed = self._changed
+        if changed:
+            for (i, value) in enumerate(self._base):
+                yield changed.get(i, value)
+        else:
+            yield from self._base
+        yield from self._tail
+
+    def append(self, value):
+        self._tail.append(value)
+
+    def extend(self, values):
+        self._tail.extend(values)
+
+    def size(self):
+        """
+        The number of items which the overlay keeps of its own.
+        """
+        return len(self._changed) + len(self._tail)
+
+    def flatten(self):
+        """
+        A plain array, ``bytearray`` or list with the same items.
+        """
+        result = self._base[:]
+        for (i, value) in self._changed.items():
+            result[i] = value
+        result.extend(self._tail)
+        return result
+
+    def copy(self):
+        overlay = ArrayOverlay.__new__(ArrayOverlay)
+        overlay._base = self._base
+        overlay._n = self._n
+        overlay._changed = dict(self._changed)
+        overlay._tail = self._tail[:]
+        return overlay
+
+
+class DictOverlay(MutableMapping):
+    """
+    A dict which shares a base with the object it was copied from, and
+    others, and keeps the keys that it sets or deletes apart from the base.
+    """
+    def __init__(self, base):
+        self._base = base
+        self._local = {}
+        self._deleted = set()
+        self._len = len(base)
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        value = self._local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if key in self._deleted:
+            return default
+        return self._base.get(key, default)
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __setitem__(self, key, value):
+        if key not in self:
+            self._len += 1
+        self._local[key] = value
+        self._deleted.discard(key)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._local.pop(key, None)
+        if key in self._base:
+            self._deleted.add(key)
+        self._len -= 1
+
+    def __iter__(self):
+        deleted = self._deleted
+        for key in self._base:
+            if key not in deleted:
+                yield key
+        for key in self._local:
+            if key not in self._base:
+                yield key
+
+    def __len__(self):
+        return self._len
+
+    def size(self):
+        """
+        The number of keys which the overlay keeps of its own.
+        """
+        return len(self._local) + len(self._deleted)
+
+    def flatten(self):
+        """
+        A plain dict with the same items.
+        """
+        return {key: self[key] for key in self}
+
+    def copy(self):
+        overlay = DictOverlay(self._base)
+        overlay._local = dict(self._local)
+        overlay._deleted = set(self._deleted)
+        overlay._len = self._len
+        return overlay
+
+
+def share(owner, other, names):
+    """
+    Share the arrays, lists and dicts held by some attributes of an object
+    with a copy of it. The copy gets overlays over them, while the object
+    keeps them as they are, lent to the copy until :func:`settle` gives it
+    arrays, lists and dicts of its own to change.
+    """
+    lent = set()
+    for name in names:
+        value = getattr(owner, name)
+        if isinstance(value, (ArrayOverlay, DictOverlay)):
+            setattr(other, name, value.copy())
+        else:
+            overlay = DictOverlay if isinstance(value, dict) else ArrayOverlay
+            setattr(other, name, overlay(value))
+            lent.add(name)
+    owner._lent = lent
+    other._lent = set()
+
+
+def settle(owner, names):
+    """
+    Prepare some attributes of an object for a change: copy the arrays,
+    lists and dicts that it has lent to copies of it, and fold the overlays
+    which have grown too large into plain arrays, lists and dicts.
+
+    :return: :class:`True` if any overlays are left.
+    :rtype: bool
+    """
+    left = False
+    lent = getattr(owner, '_lent', None)
+    for name in names:
+        value = getattr(owner, name)
+        if lent and name in lent:
+            setattr(owner, name, value.copy() if isinstance(value, dict)
+                    else value[:])
+        elif isinstance(value, (ArrayOverlay, DictOverlay)):
+            size = value.size()
+            if size >= OVERLAY_MIN and \
+               size > OVERLAY_RATIO * len(value._base):
+                setattr(owner, name, value.flatten())
+            else:
+                left = True
+    if lent:
+        owner._lent = set()
+    return left
+
+
+class PropTable(object):
+    """
+    An interning table which numbers propositions in order of arrival.
+
+    A copy shares the propositions of the original, and keeps those it
+    interns afterwards in overlays over them.
+    """
+    _SHARED = ('_ids', '_props')
+
+    def __init__(self):
+        self._ids = {}
+        self._props = []
+        # True if _ids or _props may be overlays, or lent to a copy
+        self._overlaid = False
+
+    def intern(self, proposition):
+        """
+        The number of a proposition, which is added to the table if it is
+        not there already.
+
+        :rtype: int
+        """
+        i = self._ids.get(proposition)
+        if i is None:
+            if self._overlaid:
+                self._overlaid = settle(self, self._SHARED)
+            i = len(self._props)
+            self._ids[proposition] = i
+            self._props.append(proposition)
+        return i
+
+    def get(self, proposition):
+        """
+        The number of a proposition, or :class:`None` if it is not in the
+        table.
+        """
+        return self._ids.get(proposition)
+
+    def __getitem__(self, i):
+        return self._props[i]
+
+    def __len__(self):
+        return len(self._props)
+
+    def copy(self):
+        table = PropTable()
+        share(self, table, self._SHARED)
+        self._overlaid = table._overlaid = True
+        return table
+
+
+class IdTable(object):
+    """
+    String IDs filed under consecutive numbers, which are kept encoded in a
+    single byte array rather than as a Python string each, and looked up
+    through an open-addressing hash table of their numbers.
+
+    Renaming or removing an ID leaves its old bytes behind; they are only
+    reclaimed when the owner of the table builds a new one. A copy shares
+    the arrays of the original, as a :class:`PropTable` does.
+    """
+    _SHARED = ('_bytes', '_start', '_end', '_slots')
+
+    def __init__(self):
+        self._bytes = bytearray()
+        self._start = array('q')
+        self._end = array('q')
+        # one more than the number filed in each slot, 0 for an empty slot
+        # and -1 for a slot whose ID was removed
+        self._slots = array('q', [0]) * 8
+        self._filled = 0
+        self._count = 0
+        # True if any of the arrays may be overlays, or lent to a copy
+        self._overlaid = False
+
+    def __len__(self):
+        return len(self._start)
+
+    def __getitem__(self, number):
+        return self._bytes[self._start[number]:self._end[number]].decode()
+
+    def find(self, key):
+        """
+        The number of an ID, or :class:`None` if it is not in the table.
+        """
+        encoded = key.encode()
+        slots = self._slots
+        mask = len(slots) - 1
+        i = hash(key) & mask
+        while True:
+            s = slots[i]
+            if s == 0:
+                return None
+            if s > 0 and \
+               self._bytes[self._start[s - 1]:self._end[s - 1]] == encoded:
+                return s - 1
+            i = (i + 1) & mask
+
+    def append(self, key):
+        """
+        File an ID, which must not be in the table, under the next number.
+
+        :rtype: int
+        """
+        if self._overlaid:
+            self._overlaid = settle(self, self._SHARED)
+        number = len(self._start)
+        self._start.append(0)
+        self._end.append(0)
+        self.rename(number, key, new=True)
+        return number
+
+    def rename(self, number, key, new=False):
+        """
+        File a different ID under a number.
+        """
+        if not new:
+            self.remove(number)
+        self._start[number] = len(self._bytes)
+        self._bytes.extend(key.encode())
+        self._end[number] = len(self._bytes)
+        if 2 * (self._filled + 1) > len(self._slots):
+            self._resize()
+        self._insert(hash(key), number)
+
+    def remove(self, number):
+        """
+        Remove the ID filed under a number.
+        """
+        if self._overlaid:
+            self._overlaid = settle(self, self._SHARED)
+        slots = self._slots
+        mask = len(slots) - 1
+        i = hash(self[number]) & mask
+        while slots[i] != number + 1:
+            i = (i + 1) & mask
+        slots[i] = -1
+        self._count -= 1
+
+    def _insert(self, h, number):
+        slots = self._slots
+        mask = len(slots) - 1
+        i = h & mask
+        while slots[i] > 0:
+            i = (i + 1) & mask
+        if slots[i] == 0:
+            self._filled += 1
+        slots[i] = number + 1
+        self._count += 1
+
+    def _resize(self):
+        numbers = [s - 1 for s in self._slots if s > 0]
+        size = 8
+        while size < 4 * (len(numbers) + 1):
+            size *= 2
+        self._slots = array('q', [0]) * size
+        self._filled = self._count = 0
+        for number in numbers:
+            self._insert(hash(self[number]), number)
+
+    def copy(self):
+        table = IdTable.__new__(IdTable)
+        table.__dict__ = dict(self.__dict__)
+        share(self, table, self._SHARED)
+        self._overlaid = table._overlaid = True
+        return table
+
+
+class _RowLists(object):
+    """
+    A list of rows for each proposition number, kept as linked lists in
+    arrays so that there is no Python object per proposition or per row.
+
+    Entries are never unlinked: each records the generation of its row when
+    it was made, and is skipped once the row has been updated or killed.
+    """
+    _SHARED = ('head', 'tail', 'row', 'gen', 'next')
+
+    def __init__(self):
+        # first and last entry for each proposition number, or -1
+        self.head = array('i')
+        self.tail = array('i')
+        # row, generation and next entry of each entry
+        self.row = array('i')
+        self.gen = array('i')
+        self.next = array('i')
+        # True if any of the arrays may be overlays, or lent to a copy
+        self._overlaid = False
+
+    def add(self, prop, row, gen):
+        if self._overlaid:
+            self._overlaid = settle(self, self._SHARED)
+        if prop >= len(self.head):
+            grow = array('i', [-1]) * (prop + 1 - len(self.head))
+            self.head.extend(grow)
+            self.tail.extend(grow)
+        entry = len(self.row)
+        self.row.append(row)
+        self.gen.append(gen)
+        self.next.append(-1)
+        last = self.tail[prop]
+        if last < 0:
+            self.head[prop] = entry
+        else:
+            self.next[last] = entry
+        self.tail[prop] = entry
+
+    def rows(self, prop, gens):
+        if prop >= len(self.head):
+            return
+        entry = self.head[prop]
+        while entry >= 0:
+            row = self.row[entry]
+            if self.gen[entry] == gens[row]:
+                yield row
+            entry = self.next[entry]
+
+    def copy(self):
+        lists = _RowLists()
+        share(self, lists, self._SHARED)
+        self._overlaid = lists._overlaid = True
+        return lists
+
+
+class ArgumentStore(object):
+    """
+    Arguments stored in columns of integers, one row per argument.
+
+    A row is never moved while the store is in use: rows of removed
+    arguments are merely marked as dead, and the premises and exceptions of
+    a row that is updated are appended to the index arrays, leaving their
+    old entries unused. Both kinds of garbage are collected by
+    :meth:`compact`.
+
+    The rows of the arguments for each proposition, and of the arguments
+    which use it as a premise or an exception, are kept in linked lists of
+    array entries, in order of addition or update.
+
+    A copy shares the columns of the original, and keeps the rows it adds
+    or changes afterwards in overlays over them, which are folded into
+    columns of its own once they outgrow a fraction of them. The original
+    reads its own columns as before, and copies them before it next changes
+    them.
+    """
+    _SHARED = ('live', 'gen', 'order', 'conclusion', 'prem_start', 'prem_end',
+               'exc_start', 'exc_end', 'prem_index', 'exc_index')
+
+    def __init__(self):
+        # arg_id of each row
+        self.ids = IdTable()
+        self.live = bytearray()
+        # incremented whenever a row is updated or killed
+        self.gen = array('i')
+        # a key by which the owner of the store orders rows
+        self.order = array('q')
+        self.conclusion = array('i')
+        self.prem_start = array('i')
+        self.prem_end = array('i')
+        self.exc_start = array('i')
+        self.exc_end = array('i')
+        self.prem_index = array('i')
+        self.exc_index = array('i')
+        # rows by conclusion, and by premise or exception
+        self._pro = _RowLists()
+        self._use = _RowLists()
+        # number of dead and updated rows, and of unused entries in the
+        # index arrays
+        self._dead = 0
+        self._updated = 0
+        self._garbage = 0
+        # True if any of the columns may be overlays, or lent to a copy
+        self._overlaid = False
+
+    def __len__(self):
+        return len(self.live) - self._dead
+
+    def __contains__(self, arg_id):
+        return self.ids.find(arg_id) is not None
+
+    def find(self, arg_id):
+        """
+        The row of an argument, or :class:`None` if it is not in the store.
+        """
+        return self.ids.find(arg_id)
+
+    def append(self, arg_id, conclusion, premises, exceptions, order=-1):
+        """
+        Add a row for an argument.
+
+        :param arg_id: The ID of the argument.
+        :param conclusion: The number of the conclusion.
+        :param premises: The numbers of the premises.
+        :param exceptions: The numbers of the exceptions.
+        :param order: A key by which the owner of the store orders rows.
+        :return: The new row.
+        :rtype: int
+        """
+        row = self._add(arg_id, conclusion, premises, exceptions, order)
+        self._link(row)
+        return row
+
+    def _add(self, arg_id, conclusion, premises, exceptions, order):
+        if self._overlaid:
+            self._overlaid = settle(self, self._SHARED)
+        row = len(self.live)
+        self.ids.append(arg_id)
+        self.live.append(1)
+        self.gen.append(0)
+        self.order.append(order)
+        self.conclusion.append(conclusion)
+        self.prem_start.append(0)
+        self.prem_end.append(0)
+        self.exc_start.append(0)
+        self.exc_end.append(0)
+        self._write(row, conclusion, premises, exceptions)
+        return row
+
+    def update(self, row, conclusion, premises, exceptions):
+        """
+        Overwrite the conclusion, premises and exceptions of a row.
+        """
+        if self._overlaid:
+            self._overlaid = settle(self, self._SHARED)
+        self._garbage += self._size(row)
+        self._updated += 1
+        self.gen[row] += 1
+        self._write(row, conclusion, premises, exceptions)
+        self._link(row)
+
+    def _write(self, row, conclusion, premises, exceptions):
+        self.conclusion[row] = conclusion
+        self.prem_start[row] = len(self.prem_index)
+        self.prem_index.extend(premises)
+        self.prem_end[row] = len(self.prem_index)
+        self.exc_start[row] = len(self.exc_index)
+        self.exc_index.extend(exceptions)
+        self.exc_end[row] = len(self.exc_index)
+
+    def _link(self, row):
+        gen = self.gen[row]
+        self._pro.add(self.conclusion[row], row, gen)
+        for i in self.premises(row) + self.exceptions(row):
+            self._use.add(i, row, gen)
+
+    def rename(self, row, arg_id):
+        """
+        Change the arg_id of a row.
+        """
+        self.ids.rename(row, arg_id)
+
+    def kill(self, row):
+        """
+        Mark a row as dead.
+        """
+        if self._overlaid:
+            self._overlaid = settle(self, self._SHARED)
+        self.ids.remove(row)
+        self.live[row] = 0
+        self.gen[row] += 1
+        self._dead += 1
+        self._garbage += self._size(row)
+
+    def _size(self, row):
+        return (self.prem_end[row] - self.prem_start[row] +
+                self.exc_end[row] - self.exc_start[row])
+
+    def premises(self, row):
+        return self.prem_index[self.prem_start[row]:self.prem_end[row]]
+
+    def exceptions(self, row):
+        return self.exc_index[self.exc_start[row]:self.exc_end[row]]
+
+    def rows(self):
+        """
+        Iterate over the live rows, in order of addition.
+        """
+        live = self.live
+        return (row for row in range(len(live)) if live[row])
+
+    def pro_rows(self, prop):
+        """
+        Iterate over the live rows whose conclusion is a proposition, in
+        order of addition or update.
+        """
+        return self._pro.rows(prop, self.gen)
+
+    def user_rows(self, prop):
+        """
+        Iterate over the live rows which have a proposition as a premise or
+        an exception; a row which has it as both is visited twice.
+        """
+        return self._use.rows(prop, self.gen)
+
+    def waste(self):
+        """
+        The number of dead and updated rows whose old entries
+        :meth:`compact` would reclaim.
+        """
+        return self._dead + self._updated
+
+    def compact(self):
+        """
+        Remove dead rows, and unused entries in the index arrays and lists.
+
+        Rows are renumbered, but keep their relative order; the lists of
+        rows follow the order keys of the rows.
+        """
+        if not self._dead and not self._updated:
+            return
+        old = ArgumentStore.__new__(ArgumentStore)
+        old.__dict__ = dict(self.__dict__)
+        self.__init__()
+        for row in old.rows():
+            self._add(old.ids[row], old.conclusion[row], old.premises(row),
+                      old.exceptions(row), old.order[row])
+        for row in sorted(range(len(self.live)), key=self.order.__getitem__):
+            self._link(row)
+
+    def copy(self):
+        store = ArgumentStore.__new__(ArgumentStore)
+        store.__dict__ = dict(self.__dict__)
+        store.ids = self.ids.copy()
+        store._pro = self._pro.copy()
+        store._use = self._use.copy()
+        share(self, store, self._SHARED)
+        self._overlaid = store._overlaid = True
+        return store
+
+
+class LRUCache(object):
+    """
+    A mapping which holds at most ``maxsize`` items, discarding the least
+    recently used.
+    """
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+
+    def get(self, key, default=None):
+        try:
+            self._items.move_to_end(key)
+        except KeyError:
+            return default
+        return self._items[key]
+
+    def put(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        if len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def discard(self, key):
+        self._items.pop(key, None)
+
+    def clear(self):
+        self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+    def copy(self):
+        cache = LRUCache(self.maxsize)
+        cache._items = OrderedDict(self._items)
+        return cache
+
+
+# Keys added since the last lookup of a PrefixIndex are inserted one at a
+# time if there are at most INSORT_MAX of them, and sorted in together
+# otherwise.
+INSORT_MAX = 32
+
+
+class PrefixIndex(object):
+    """
+    Numbers filed under string keys, which are kept in sorted order so that
+    the keys with a given prefix can be found by bisection.
+
+    Keys added since the last lookup are only sorted into place by the next
+    lookup: a few at a time are inserted by bisection, and any more are
+    merged in with a single sort, so that adding many keys in a row takes
+    linear time overall. Lookups may run in several threads at once, but not
+    alongside :meth:`add`.
+
+    A copy shares the keys and numbers of the original. Each of the two
+    then sorts the keys it adds into a list of its own, which lookups merge
+    with the shared keys, and files numbers in an overlay, until these
+    outgrow a fraction of what is shared.
+    """
+    def __init__(self):
+        self._keys = []
+        # keys sorted in since _keys was shared with a copy
+        self._extra = []
+        self._added = []
+        self._numbers = {}
+        # whether _keys is shared with a copy, and _numbers may be an overlay
+        self._shared = False
+        self._overlaid = False
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._numbers)
+
+    def add(self, key, number):
+        """
+        File a number under a key.
+        """
+        if self._overlaid:
+            self._overlaid = settle(self, ('_numbers',))
+        numbers = self._numbers.get(key)
+        if numbers is None:
+            self._numbers[key] = [number]
+            self._added.append(key)
+        else:
+            # the list may be shared with a copy
+            self._numbers[key] = numbers + [number]
+
+    def _sorted(self):
+        """
+        The keys, as a sorted list which may be shared with copies, and a
+        sorted list of the keys added since it was shared.
+        """
+        if self._added:
+            with self._lock:
+                added = self._added
+                if added:
+                    (keys, extra) = (self._keys, self._extra)
+                    if len(added) > INSORT_MAX:
+                        # the keys already sorted form runs, which sort
+                        # merges with the new ones
+                        keys = sorted(keys + extra + added)
+                        extra = []
+                        self._shared = False
+                    else:
+                        for key in added:
+                            bisect.insort(extra if self._shared else keys,
+                                          key)
+                        if len(extra) >= OVERLAY_MIN and \
+                           len(extra) > OVERLAY_RATIO * len(keys):
+                            keys = sorted(keys + extra)
+                            extra = []
+                            self._shared = False
+                    (self._keys, self._extra) = (keys, extra)
+                    self._added = []
+        return (self._keys, self._extra)
+
+    def find(self, prefix='', pattern=None):
+        """
+        Generate the keys which start with a prefix, and match a glob
+        pattern if one is given, in sorted order.
+
+        :param prefix: The prefix.
+        :type prefix: str
+        :param pattern: A pattern in the syntax of :mod:`fnmatch`, which is\
+        case-sensitive.
+        :type pattern: str or None
+        :return: Pairs of a key and the numbers filed under it.
+        :rtype: iter(tuple(str, list(int)))
+        """
+        (keys, extra) = self._sorted()
+        found = _starting(keys, prefix)
+        if extra:
+            found = heapq.merge(found, _starting(extra, prefix))
+        for key in found:
+            if pattern is None or fnmatchcase(key, pattern):
+                yield (key, self._numbers[key])
+
+    def copy(self):
+        """
+        Copy the index, sharing its keys and numbers with the original.
+        """
+        index = PrefixIndex()
+        (index._keys, extra) = self._sorted()
+        index._extra = list(extra)
+        share(self, index, ('_numbers',))
+        self._shared = index._shared = True
+        self._overlaid = index._overlaid = True
+        return index
+
+
+def _starting(keys, prefix):
+    """
+    Generate the keys in a sorted list which start with a prefix.
+    """
+    for i in range(bisect.bisect_left(keys, prefix), len(keys)):
+        key = keys[i]
+        if not key.startswith(prefix):
+            break
+        yield key
@@ -14,14 +14,41 @@ The class :class:`TraceCalls` is called as a decorator :func:`@TraceCalls`.
 import sys
 from functools import wraps
 import logging
+import threading
+
+
+class _CurrentIndent(object):
+    """
+    The current indentation in the calling thread, which can be read from
+    the class :class:`TraceCalls` as well as from its instances.
+    """
+    def __get__(self, obj, cls=None):
+        return getattr(TraceCalls._local, 'indent', 0)
+
 
 class TraceCalls(object):
     """ 
     Use as a decorator on functions that should be traced. Several functions
     can be decorated; they will all be indented according to their call
     depth.
-        
+
+    The call depth is kept separately for each thread, so that calls traced
+    in different threads are indented independently, and is given by
+    ``TraceCalls.cur_indent``. Each line of the trace is written whole, and
+    the lines written by any thread other than the main one start with its
+    name, so that the traces of several threads can be told apart.
+
+    Setting ``TraceCalls.enabled`` to ``False`` turns tracing off for all
+    decorated functions.
+
+    >>> TraceCalls.cur_indent
+    0
     """
+    _local = threading.local()
+    _lock = threading.Lock()
+    enabled = True
+    cur_indent = _CurrentIndent()
+
     def __init__(self, stream=sys.stdout, indent_step=2, show_ret=True):
         """
         :param stream: The output stream
@@ -31,23 +58,41 @@ class TraceCalls(object):
         """
         self.indent_step = indent_step
         self.show_ret = show_ret
-        TraceCalls.cur_indent = 0
         self.stream = stream
 
+    def _write(self, line):
+        """
+        Write a line of the trace, after any blank lines that precede it.
+        """
+        thread = threading.current_thread()
+        if thread is not threading.main_thread():
+            text = line.lstrip('\n')
+            line = '{}[{}] {}'.format(line[:len(line) - len(text)],
+                                      thread.name, text)
+        with TraceCalls._lock:
+            self.stream.write(line)
+
     def __call__(self, fn):
         @wraps(fn)
         def wrapper(*args, **kwargs):
-            indent = ' ' * TraceCalls.cur_indent
+            if not TraceCalls.enabled:
+                return fn(*args, **kwargs)
+            local = TraceCalls._local
+            depth = getattr(local, 'indent', 0)
+            indent = ' ' * depth
             argstr = ', '.join(
                 [str(a) for a in args][1:])
-            self.stream.write("\n{}Calling {}({})\n".format(indent, fn.__name__, argstr))
+            self._write("\n{}Calling {}({})\n".format(indent, fn.__name__,
+                                                      argstr))
 
-            TraceCalls.cur_indent += self.indent_step
-            ret = fn(*args, **kwargs)
-            TraceCalls.cur_indent -= self.indent_step
+            local.indent = depth + self.indent_step
+            try:
+                ret = fn(*args, **kwargs)
+            finally:
+                local.indent = depth
 
-            if self.show_ret:
-                self.stream.write("{}{}({})-->{}\n".format(indent, fn.__name__,
-                                                      argstr, ret))
-                return ret
+            if self.show_ret and TraceCalls.enabled:
+                self._write("{}{}({})-->{}\n".format(indent, fn.__name__,
+                                                     argstr, ret))
+            return ret
         return wrapper
\ No newline at end of file